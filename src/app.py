@@ -8,32 +8,41 @@ Main GUI application using customtkinter for cross-platform compatibility
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
+import copy
 import json
 import os
 import threading
+import time
 from pathlib import Path
 import subprocess
 import sys
 import platform
 
-from audio_utils import AudioProcessor
-from yt_downloader import YouTubeDownloader
-from metadata_utils import MetadataUtils
 from version import __version__, get_version_string, get_build_info
 
-# Fast processor import
-try:
-    from fast_processor import FastAudioProcessor
-    fast_processor_available = True
-except ImportError:
-    fast_processor_available = False
+# Only light modules are imported here so the window appears quickly; the
+# audio stack (librosa, scipy, yt_dlp, mutagen) and the processors are
+# loaded in the background by SunoReadyApp._load_backends
+from batch_failures import write_failure_report
+from batch_manifest import BatchManifest
+from content_store import ContentStore
+from folder_ingest import FolderIngest, format_probe
+from file_list_view import FileListModel, VirtualFileList, QUEUED, RUNNING, DONE, SKIPPED, FAILED
+from job_queue import JobQueue
+from perf_monitor import PerfMonitor, format_bytes
+from terminal_buffer import TerminalBuffer, TerminalView
+from ui_event_bus import UIEventBus
+from warmup import WarmupService, configure_jit_cache
 
-# Lightning processor import
-try:
-    from lightning_processor import LightningProcessor
-    lightning_processor_available = True
-except ImportError:
-    lightning_processor_available = False
+# Terminal line prefixes by message type
+TERMINAL_PREFIXES = {
+    "info": "[INFO]",
+    "warning": "[WARN]",
+    "error": "[ERROR]",
+    "success": "[SUCCESS]",
+    "youtube": "[YOUTUBE]",
+    "download": "[DOWNLOAD]",
+}
 
 # Set appearance and theme
 ctk.set_appearance_mode("dark")
@@ -106,6 +115,21 @@ class SunoReadyApp:
         self.root = ctk.CTk()
         self.root.title("SunoReady - Audio Processing Tool")
         
+        # Worker threads never touch widgets: their logs and progress go through
+        # this bus and are applied on the Tk thread a frame at a time
+        self.ui_events = UIEventBus(self.root)
+        self.ui_events.on('log', self._write_terminal_lines)
+        self.ui_events.on('download_progress', self._set_download_progress)
+        self.ui_events.on('file_status', lambda _: self.update_files_display())
+        self.ui_events.on('thumbnails', lambda _: self.file_list.refresh(force=True))
+        
+        # Selected files and their status; the list view draws only visible rows
+        self.file_model = FileListModel()
+        self.selected_files = self.file_model.paths
+        # Durations probed while adding folders, reused when scheduling a batch
+        self.file_durations = {}
+        self.folder_ingest = None
+        
         # Responsive window sizing for different screen sizes
         self.setup_responsive_window()
         
@@ -119,43 +143,141 @@ class SunoReadyApp:
         # Load configuration first
         self.config = self.load_config()
         
-        # Initialize utilities with config
-        self.audio_processor = AudioProcessor(config=self.config)
-        
-        # Initialize lightning processor (preferred)
-        if lightning_processor_available:
-            self.lightning_processor = LightningProcessor(config=self.config)
-            self.log_to_terminal("⚡ Lightning processor ready!", "info")
-        else:
-            self.lightning_processor = None
-        
-        # Initialize fast processor if available and enabled
-        if fast_processor_available and self.config.get('use_fast_processing', True):
-            self.fast_processor = FastAudioProcessor(config=self.config)
-            self.log_to_terminal("🚀 Fast processing mode enabled", "info")
-        else:
-            self.fast_processor = None
-            if not lightning_processor_available:
-                self.log_to_terminal("🐢 Standard processing mode (librosa)", "info")
-        
-        self.yt_downloader = YouTubeDownloader(log_callback=self.log_to_terminal, config=self.config)
-        self.metadata_utils = MetadataUtils(log_callback=self.log_to_terminal)
+        # Compiled numba kernels persist across sessions; set before librosa loads
+        configure_jit_cache(self.config)
+        self.warmup = WarmupService(self.config)
+        
+        # Processors and downloader are built by _load_backends in the background;
+        # work that needs them waits for backends_ready
+        self.audio_processor = None
+        self.lightning_processor = None
+        self.fast_processor = None
+        self.planner = None
+        self.worker_pool = None
+        self.yt_downloader = None
+        self.metadata_utils = None
+        self.backends_ready = threading.Event()
+        self.backend_error = None
+        # Waveform thumbnails for the files list, set up by the loader too
+        self.waveforms = None
+        # Excerpt previews, created on first use
+        self.preview_renderer = None
+        self.preview_player = None
+        # Throughput, queue and stage timings of batches, shown in the Performance tab
+        self.perf_monitor = PerfMonitor(self.config)
+        
+        # Terminal history exists from the start; the Terminal tab renders it when first shown
+        self.terminal_buffer = TerminalBuffer(
+            capacity=self.config.get('terminal_buffer_lines', 20000),
+            spill_path=self.config.get('terminal_log_path', 'logs/terminal.log') or None
+        )
+        self.loading_animation_active = False
         
         # Create output directories
         os.makedirs(self.config.get('processed_output_folder', 'output/processed'), exist_ok=True)
         os.makedirs(self.config.get('downloaded_output_folder', 'output/downloads'), exist_ok=True)
         
-        # Check DLL performance status
-        self.check_dll_performance_status()
-        
         # Initialize UI
         self.setup_ui()
         
         # Synchronize UI with loaded configuration
         self.sync_ui_with_config()
+        self.ui_events.interval_ms = int(self.config.get('ui_frame_ms', 33))
+        self.ui_events.start()
+        
+        # Batches go through a durable queue; resume what a crash or kill left behind
+        self.job_queue = JobQueue(self.config)
+        self.root.after(1000, self._resume_queued_jobs)
         
-        # Current files list
-        self.selected_files = []
+        # Load the audio stack once the window is up
+        threading.Thread(target=self._load_backends, daemon=True, name="backend-loader").start()
+    
+    def _load_backends(self):
+        """Import the audio stack and build the processors (runs in a background thread)"""
+        start = time.time()
+        try:
+            from audio_utils import AudioProcessor
+            from metadata_utils import MetadataUtils
+            from yt_downloader import YouTubeDownloader
+            
+            self.audio_processor = AudioProcessor(config=self.config)
+            
+            # Initialize lightning processor (preferred); it shares the AudioProcessor
+            try:
+                from lightning_processor import LightningProcessor
+                self.lightning_processor = LightningProcessor(config=self.config,
+                                                              audio_processor=self.audio_processor)
+                self.log_to_terminal("⚡ Lightning processor ready!", "info")
+            except ImportError:
+                self.lightning_processor = None
+            
+            # Initialize fast processor if available and enabled
+            fast_processor_available = False
+            try:
+                from fast_processor import FastAudioProcessor
+                fast_processor_available = True
+            except ImportError:
+                pass
+            if fast_processor_available and self.config.get('use_fast_processing', True):
+                self.fast_processor = FastAudioProcessor(config=self.config)
+                self.log_to_terminal("🚀 Fast processing mode enabled", "info")
+            elif not self.lightning_processor:
+                self.log_to_terminal("🐢 Standard processing mode (librosa)", "info")
+            
+            # Route each job to the cheapest processor that supports its options
+            if self.config.get('auto_select_processor', True):
+                try:
+                    from processor_planner import ProcessorPlanner
+                    self.planner = ProcessorPlanner(config=self.config, backends={
+                        'lightning': self.lightning_processor,
+                        'fast': self.fast_processor,
+                        'standard': self.audio_processor,
+                    })
+                    self.log_to_terminal("🧭 Automatic processor selection enabled", "info")
+                except ImportError:
+                    self.planner = None
+            
+            self.yt_downloader = YouTubeDownloader(log_callback=self.log_to_terminal, config=self.config)
+            self.metadata_utils = MetadataUtils(log_callback=self.log_to_terminal)
+            
+            # Batch modules are imported now so the first batch doesn't pay for them
+            import batch_executor
+            import batch_scheduler
+            
+            if self.config.get('waveform_thumbnails', True):
+                from waveform_cache import ThumbnailLoader, WaveformCache
+                self.waveforms = ThumbnailLoader(WaveformCache(self.config),
+                                                 on_ready=lambda path: self.ui_events.post('thumbnails'))
+                self.ui_events.post('thumbnails')
+            
+            self.check_dll_performance_status()
+            self.log_to_terminal(f"✅ Audio engine ready ({time.time() - start:.1f}s)", "success")
+            
+            # Compile librosa's pitch/tempo/resample kernels at idle instead of in the first job
+            self.warmup.start(self.audio_processor, callback=lambda seconds: self.log_to_terminal(
+                f"🔥 Pitch and tempo paths warmed up ({seconds:.1f}s)", "info"))
+        except Exception as e:
+            self.backend_error = e
+            self.log_to_terminal(f"❌ Audio engine failed to load: {str(e)}", "error")
+        finally:
+            self.backends_ready.set()
+        
+        # Start batch workers now so their imports and JIT warm-up are done
+        # before the first batch; the pool is reused for every batch after
+        batch_workers = int(self.config.get('batch_workers') or os.cpu_count() or 1)
+        if self.backend_error is None and batch_workers > 1 and self.config.get('persistent_worker_pool', True):
+            from worker_pool import get_worker_pool
+            self.worker_pool = get_worker_pool(self.config)
+            self._warm_worker_pool()
+    
+    def _wait_for_backends(self):
+        """Block a worker thread until the audio stack is loaded"""
+        if not self.backends_ready.is_set():
+            self.update_status("Loading audio engine...")
+            self.log_to_terminal("⏳ Waiting for the audio engine to finish loading...", "info")
+            self.backends_ready.wait()
+        if self.backend_error is not None:
+            raise Exception(f"Audio engine failed to load: {str(self.backend_error)}")
     
     def apply_modern_theme(self):
         """Apply modern theme with custom colors and fonts"""
@@ -391,15 +513,37 @@ class SunoReadyApp:
             segmented_button_selected_hover_color=THEME_COLORS["accent_hover"],
             text_color=THEME_COLORS["text_primary"],
             segmented_button_unselected_color=THEME_COLORS["bg_primary"],
-            segmented_button_unselected_hover_color=THEME_COLORS["border"]
+            segmented_button_unselected_hover_color=THEME_COLORS["border"],
+            command=lambda: self._build_tab(self.notebook.get())
         )
         self.notebook.pack(fill="both", expand=True, padx=3, pady=(0, 5))
         
         # Audio Processing Tab
         self.setup_audio_tab()
         
-        # YouTube Downloader Tab
-        self.setup_youtube_tab()
+        # YouTube Downloader Tab - widgets are built the first time it is shown
+        self.youtube_tab = self.notebook.add("YouTube Downloader")
+        self._lazy_tabs = {"YouTube Downloader": self.setup_youtube_tab}
+        
+        # Performance Tab - live batch figures, also built when first shown
+        self.performance_tab = self.notebook.add("Performance")
+        self._lazy_tabs["Performance"] = self.setup_performance_tab
+    
+    def _build_tab(self, name):
+        """Build a lazily constructed tab the first time it is shown"""
+        builder = self._lazy_tabs.pop(name, None)
+        if builder is not None:
+            builder()
+    
+    def show_tab(self, notebook_name, tab_name):
+        """Switch to a tab, building it (and its parent tab) first if needed"""
+        if notebook_name == "yt_notebook":
+            self._build_tab("YouTube Downloader")
+        notebook = getattr(self, notebook_name, None)
+        if notebook is None:
+            return
+        self._build_tab(tab_name)
+        notebook.set(tab_name)
     
     def setup_audio_tab(self):
         """Setup compact audio processing tab"""
@@ -431,6 +575,13 @@ class SunoReadyApp:
             width=110
         ).pack(side="left", padx=(0, 8))
         
+        self.create_modern_button(
+            button_frame, 
+            text="Add Folder", 
+            command=self.add_folder,
+            width=110
+        ).pack(side="left", padx=(0, 8))
+        
         self.create_modern_button(
             button_frame, 
             text="Clear All", 
@@ -440,17 +591,20 @@ class SunoReadyApp:
             hover_color="#E67E22"
         ).pack(side="left")
         
-        # Compact files display
-        self.files_text = ctk.CTkTextbox(
-            file_frame, 
-            height=60,
-            corner_radius=6,
+        # Compact files display (virtualised: only visible rows are drawn)
+        self.file_list = VirtualFileList(
+            file_frame,
+            self.file_model,
+            row_height=18,
+            visible_rows=4,
             font=self.font_small,
+            corner_radius=6,
             fg_color=THEME_COLORS["bg_primary"],
-            border_color=THEME_COLORS["border"],
-            text_color=THEME_COLORS["text_primary"]
+            canvas_color=THEME_COLORS["bg_primary"],
+            text_color=THEME_COLORS["text_primary"],
+            thumbnail=self._file_thumbnail
         )
-        self.files_text.pack(fill="x", padx=pad_x, pady=(5, 8))
+        self.file_list.pack(fill="x", padx=pad_x, pady=(5, 8))
         
         # Compact processing options
         options_frame = self.create_modern_frame(audio_tab)
@@ -610,23 +764,52 @@ class SunoReadyApp:
         )
         clean_metadata_cb.pack(side="left", padx=8)
         
+        # Process every file even when an earlier run's output is still valid
+        self.force_reprocess_var = ctk.BooleanVar(value=self.config.get("force_reprocess", False))
+        force_reprocess_cb = ctk.CTkCheckBox(
+            checkbox_row, 
+            text="Reprocess All", 
+            variable=self.force_reprocess_var,
+            font=self.font_regular,
+            text_color=THEME_COLORS["text_primary"],
+            fg_color=THEME_COLORS["accent"],
+            hover_color=THEME_COLORS["accent_hover"]
+        )
+        force_reprocess_cb.pack(side="left", padx=8)
+        
         # Compact process button
         process_frame = ctk.CTkFrame(audio_tab, fg_color="transparent")
         process_frame.pack(fill="x", padx=pad_x, pady=(5, 8))
         
+        process_buttons = ctk.CTkFrame(process_frame, fg_color="transparent")
+        process_buttons.pack(pady=8)
+        
         self.process_btn = self.create_modern_button(
-            process_frame, 
+            process_buttons, 
             text="🎵 Process Files", 
             command=self.process_audio_files,
             height=32,
             font=self.font_regular,
             width=160
         )
-        self.process_btn.pack(pady=8)
+        self.process_btn.pack(side="left", padx=(0, 8))
+        
+        # Excerpt with the current settings, without a full render
+        self.preview_btn = self.create_modern_button(
+            process_buttons, 
+            text="▶ Preview", 
+            command=self.preview_audio,
+            height=32,
+            font=self.font_regular,
+            width=110,
+            fg_color=THEME_COLORS["bg_primary"],
+            hover_color=THEME_COLORS["border"]
+        )
+        self.preview_btn.pack(side="left")
     
     def setup_youtube_tab(self):
         """Setup compact YouTube downloader tab"""
-        yt_tab = self.notebook.add("YouTube Downloader")
+        yt_tab = self.youtube_tab
         
         # Create compact YouTube sub-tabs
         self.yt_notebook = ctk.CTkTabview(
@@ -636,18 +819,17 @@ class SunoReadyApp:
             segmented_button_fg_color=THEME_COLORS["bg_primary"],
             segmented_button_selected_color=THEME_COLORS["accent"],
             segmented_button_selected_hover_color=THEME_COLORS["accent_hover"],
-            text_color=THEME_COLORS["text_primary"]
+            text_color=THEME_COLORS["text_primary"],
+            command=lambda: self._build_tab(self.yt_notebook.get())
         )
         self.yt_notebook.pack(fill="both", expand=True, padx=8, pady=8)
         
         # Create Download tab
         self.setup_download_tab()
         
-        # Create Terminal tab
-        self.setup_terminal_tab()
-        
-        # Initialize loading animation variables
-        self.loading_animation_active = False
+        # Terminal tab - built when first shown
+        self.terminal_tab = self.yt_notebook.add("Terminal")
+        self._lazy_tabs["Terminal"] = self.setup_terminal_tab
     
     def setup_download_tab(self):
         """Setup compact download tab"""
@@ -796,9 +978,102 @@ class SunoReadyApp:
         self.status_text.pack(fill="both", expand=True)
         self.status_text.insert("1.0", "✨ Ready to download\n\nPaste a YouTube URL above and click Download Audio to get started.")
         
+    def setup_performance_tab(self):
+        """Setup the live performance dashboard tab"""
+        perf_tab = self.performance_tab
+        
+        header = ctk.CTkFrame(perf_tab, fg_color="transparent")
+        header.pack(fill="x", padx=10, pady=(8, 0))
+        
+        self.create_modern_label(
+            header, 
+            text="📊 Batch Performance", 
+            font=self.font_heading
+        ).pack(side="left")
+        
+        self.create_modern_button(
+            header, 
+            text="Reset", 
+            command=self.perf_monitor.reset,
+            width=70,
+            height=28,
+            font=self.font_small
+        ).pack(side="right")
+        
+        # Headline figures, one label per line
+        figures_frame = self.create_modern_frame(perf_tab)
+        figures_frame.pack(fill="x", padx=10, pady=8)
+        self.perf_labels = {}
+        for key in ("throughput", "queue", "workers", "totals", "system"):
+            label = self.create_modern_label(figures_frame, text="", font=self.font_small, anchor="w")
+            label.pack(fill="x", padx=12, pady=2)
+            self.perf_labels[key] = label
+        
+        # Share of processing time per stage (rows are added as stages appear)
+        stages_frame = self.create_modern_frame(perf_tab)
+        stages_frame.pack(fill="both", expand=True, padx=10, pady=(0, 8))
+        self.create_modern_label(
+            stages_frame, 
+            text="Time per stage", 
+            font=self.font_regular
+        ).pack(anchor="w", padx=12, pady=(8, 4))
+        self.perf_stages_frame = stages_frame
+        self.perf_stage_rows = {}
+        
+        self._refresh_performance()
+    
+    def _refresh_performance(self):
+        """Redraw the Performance tab once a second while it is visible"""
+        try:
+            if self.notebook.get() == "Performance":
+                self._render_performance(self.perf_monitor.snapshot())
+        except Exception as e:
+            print(f"Warning: performance refresh failed: {e}")
+        self.root.after(int(self.config.get('perf_refresh_ms', 1000)), self._refresh_performance)
+    
+    def _render_performance(self, snapshot):
+        """Show a PerfMonitor snapshot"""
+        try:
+            pending = self.job_queue.counts()['pending']
+        except Exception:
+            pending = 0
+        cpu = snapshot['cpu']
+        self.perf_labels["throughput"].configure(
+            text=f"⚡ Throughput: {snapshot['files_per_min']:.1f} files/min, "
+                 f"{snapshot['realtime']:.1f}× realtime")
+        self.perf_labels["queue"].configure(
+            text=f"📥 Queue: {snapshot['queue_depth']} waiting in batch, {pending} pending in job queue")
+        self.perf_labels["workers"].configure(
+            text=f"🧵 Workers: {snapshot['active_workers']} active of {snapshot['workers']}")
+        self.perf_labels["totals"].configure(
+            text=f"✅ Processed: {snapshot['processed']}   ❌ Failed: {snapshot['failed']}")
+        self.perf_labels["system"].configure(
+            text=f"🖥️ CPU: {'n/a' if cpu is None else f'{cpu * 100:.0f}%'}   "
+                 f"RAM (app + workers): {format_bytes(snapshot['rss'])}")
+        
+        for name, stage in snapshot['stages'].items():
+            row = self.perf_stage_rows.get(name)
+            if row is None:
+                frame = ctk.CTkFrame(self.perf_stages_frame, fg_color="transparent")
+                frame.pack(fill="x", padx=12, pady=2)
+                label = self.create_modern_label(frame, text="", font=self.font_small, width=220, anchor="w")
+                label.pack(side="left")
+                bar = ctk.CTkProgressBar(frame, height=8, corner_radius=4,
+                                         progress_color=THEME_COLORS["accent"], fg_color="#374151")
+                bar.pack(side="left", fill="x", expand=True, padx=(8, 0))
+                row = self.perf_stage_rows[name] = (frame, label, bar)
+            _, label, bar = row
+            average = stage['seconds'] / stage['count'] if stage['count'] else 0.0
+            label.configure(text=f"{name}: {stage['seconds']:.1f}s ({stage['share'] * 100:.0f}%, "
+                                 f"{average:.2f}s/file)")
+            bar.set(stage['share'])
+        for name in [name for name in self.perf_stage_rows if name not in snapshot['stages']]:
+            # Stages dropped by a reset
+            self.perf_stage_rows.pop(name)[0].destroy()
+    
     def setup_terminal_tab(self):
         """Setup compact terminal tab"""
-        terminal_tab = self.yt_notebook.add("Terminal")
+        terminal_tab = self.terminal_tab
         
         # Compact terminal header
         terminal_header = self.create_modern_frame(terminal_tab)
@@ -836,6 +1111,15 @@ class SunoReadyApp:
             border_color=THEME_COLORS["border"]
         )
         self.terminal_text.pack(fill="both", expand=True, padx=20, pady=(10, 20))
+        
+        # Bounded history: the widget only ever holds a window of recent lines,
+        # and lines pushed out of memory go to a rotating log file
+        self.terminal_view = TerminalView(
+            self.terminal_text,
+            self.terminal_buffer,
+            view_lines=self.config.get('terminal_view_lines', 1000)
+        )
+        self.terminal_view.render()
         self.loading_dots = 0
     
     def select_files(self):
@@ -854,27 +1138,77 @@ class SunoReadyApp:
         )
         
         if files:
-            self.selected_files.extend(files)
+            self.file_model.extend(files)
             self.update_files_display()
             
             # Auto-detect duration from first file for smart controls
             if files and hasattr(self, 'original_duration_var'):
                 self.auto_detect_duration(files[0])
     
+    def add_folder(self):
+        """Add every audio file under a folder, scanning in the background"""
+        folder = filedialog.askdirectory(title="Select Folder with Audio Files")
+        if not folder:
+            return
+        if self.folder_ingest is not None and not self.folder_ingest.done.is_set():
+            messagebox.showinfo("Scan in Progress", "A folder is still being scanned, please wait.")
+            return
+        
+        self.log_to_terminal(f"📂 Scanning {folder}...", "info")
+        ingest = FolderIngest(self.config)
+        
+        def on_files(batch):
+            # Files can be processed as soon as they are listed
+            self.ui_events.call(self._add_ingested_files, ingest, batch)
+        
+        def on_probed(path, info):
+            if info.get('duration'):
+                self.file_durations[path] = info['duration']
+            self.file_model.set_details(path, format_probe(info))
+            self.ui_events.post('file_status')
+        
+        def on_done(ingest):
+            state = "stopped" if ingest.cancelled.is_set() else "done"
+            self.log_to_terminal(
+                f"📁 Folder scan {state}: {ingest.found} audio files found, "
+                f"{ingest.probed} probed ({ingest.seconds:.1f}s)", "success")
+            for path, error in ingest.errors[:5]:
+                self.log_to_terminal(f"⚠️ Could not read {path}: {error}", "warning")
+        
+        self.folder_ingest = ingest.start(folder, on_files, on_probed, on_done)
+    
+    def _add_ingested_files(self, ingest, batch):
+        """Append a batch found by the folder scan (runs on the Tk thread)"""
+        if ingest.cancelled.is_set():
+            # The list was cleared after this batch was found
+            return
+        added = self.file_model.extend(batch)
+        if added:
+            self.update_files_display()
+            self.update_status(f"{len(self.file_model)} files selected")
+    
     def clear_files(self):
         """Clear selected files"""
-        self.selected_files = []
+        if self.folder_ingest is not None:
+            self.folder_ingest.cancel()
+        self.file_model.clear()
+        self.file_durations.clear()
         self.update_files_display()
     
     def update_files_display(self):
-        """Update the files display text box"""
-        self.files_text.delete("1.0", "end")
-        if self.selected_files:
-            for i, file_path in enumerate(self.selected_files, 1):
-                filename = os.path.basename(file_path)
-                self.files_text.insert("end", f"{i}. {filename}\n")
-        else:
-            self.files_text.insert("1.0", "No files selected")
+        """Redraw the visible rows of the files list (coalesced to one redraw per idle)"""
+        self.file_list.refresh()
+    
+    def _file_thumbnail(self, path, pixels):
+        """Waveform columns for a file row, or None until its overview is built"""
+        if self.waveforms is None:
+            return None
+        return self.waveforms.thumbnail(path, pixels)
+    
+    def set_file_status(self, path, status):
+        """Record a file's status from any thread; the list redraws at the next UI frame"""
+        if self.file_model.set_status(path, status):
+            self.ui_events.post('file_status')
     
     def update_status(self, message):
         """Update status label - thread safe (status section removed)"""
@@ -935,7 +1269,9 @@ class SunoReadyApp:
         """Toggle lightning processing mode"""
         lightning_mode = self.lightning_mode_var.get()
         
-        if lightning_mode and self.lightning_processor:
+        if not self.backends_ready.is_set():
+            self.log_to_terminal("⏳ Audio engine still loading - the setting applies once it is ready", "info")
+        elif lightning_mode and self.lightning_processor:
             self.log_to_terminal("⚡ Lightning Mode activated - ultra-fast processing!", "info")
         elif lightning_mode and not self.lightning_processor:
             self.log_to_terminal("⚠️ Lightning processor not available, using standard mode", "warning")
@@ -957,12 +1293,22 @@ class SunoReadyApp:
             self.config["add_noise"] = self.noise_var.get()
             self.config["apply_highpass"] = self.highpass_var.get()
             self.config["clean_metadata"] = self.clean_metadata_var.get()
+            self.config["force_reprocess"] = self.force_reprocess_var.get()
             
             self.save_config()
         except ValueError:
             messagebox.showerror("Invalid Input", "Please enter valid numeric values.")
             return
         
+        # Queue the batch first so it survives a crash or restart
+        try:
+            self.job_queue.enqueue(self.selected_files, self._planner_options())
+        except Exception as e:
+            messagebox.showerror("Queue Error", f"Could not queue files: {str(e)}")
+            return
+        self.file_model.set_all(QUEUED)
+        self.update_files_display()
+        
         # Disable process button
         self.process_btn.configure(state="disabled")
         
@@ -971,64 +1317,259 @@ class SunoReadyApp:
         thread.daemon = True
         thread.start()
     
+    def preview_audio(self):
+        """Render and play an excerpt of the selected file with the current settings"""
+        if not self.selected_files:
+            messagebox.showwarning("No Files", "Please select audio files to preview.")
+            return
+        selected = self.file_list.selected
+        if selected is None or selected >= len(self.selected_files):
+            selected = 0
+        path = self.selected_files[selected]
+        try:
+            options = {
+                'tempo_change': float(self.tempo_var.get()),
+                'pitch_semitones': float(self.pitch_var.get()),
+                'normalize': self.normalize_var.get(),
+                'apply_highpass': self.highpass_var.get(),
+            }
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Please enter valid numeric values.")
+            return
+        
+        self.preview_btn.configure(state="disabled")
+        thread = threading.Thread(target=self._preview_thread, args=(path, options), daemon=True)
+        thread.start()
+    
+    def _preview_thread(self, path, options):
+        """Render a preview (runs in a background thread)"""
+        name = os.path.basename(path)
+        try:
+            self._wait_for_backends()
+            from preview_renderer import PreviewPlayer, PreviewRenderer
+            from processor_planner import probe_duration
+            if self.preview_renderer is None:
+                self.preview_renderer = PreviewRenderer(self.config, self.lightning_processor)
+                self.preview_player = PreviewPlayer()
+            duration = self.file_durations.get(path) or probe_duration(path)
+            preview = self.preview_renderer.render(path, options, duration=duration)
+            self.log_to_terminal(
+                f"🎧 Preview of {name} from {preview.start:.0f}s rendered in "
+                f"{preview.render_seconds * 1000:.0f} ms", "info")
+            if not self.preview_player.play(preview):
+                self.log_to_terminal(f"💾 No audio output available; preview saved to {preview.path}", "info")
+        except Exception as e:
+            self.log_to_terminal(f"❌ Preview failed for {name}: {str(e)}", "error")
+        finally:
+            self.ui_events.call(lambda: self.preview_btn.configure(state="normal"))
+    
+    def _resume_queued_jobs(self):
+        """Pick up jobs left pending or running by an earlier session"""
+        try:
+            recovered = self.job_queue.recover()
+            pending = self.job_queue.counts()['pending']
+        except Exception as e:
+            print(f"Warning: could not read job queue: {e}")
+            return
+        if not pending or not self.config.get('resume_queued_jobs', True):
+            return
+        if str(self.process_btn.cget("state")) == "disabled":
+            return
+        self.log_to_terminal(
+            f"♻️ Resuming {pending} queued files from the last session"
+            + (f" ({recovered} were interrupted)" if recovered else ""), "info")
+        self.process_btn.configure(state="disabled")
+        thread = threading.Thread(target=self._process_files_thread)
+        thread.daemon = True
+        thread.start()
+    
     def _process_files_thread(self):
-        """Process files in separate thread"""
+        """Drain the job queue in a separate thread"""
         try:
-            total_files = len(self.selected_files)
+            self._wait_for_backends()
+            total_files = self.job_queue.counts()['pending']
             self.update_status(f"Starting to process {total_files} files...")
             
-            for i, file_path in enumerate(self.selected_files):
-                base_progress = i / total_files
-                self.update_status(f"Processing {os.path.basename(file_path)} ({i+1}/{total_files})...")
-                print(f"DEBUG: Processing file: {file_path}")
-                
-                # Define progress callback for individual file processing
-                def file_progress_callback(sub_progress, sub_message=""):
-                    overall_progress = base_progress + (sub_progress / total_files)
-                    status_msg = f"Processing {os.path.basename(file_path)} ({i+1}/{total_files}): {sub_message}"
-                    self.update_status(status_msg)
-                    self.update_progress(overall_progress)
-                
-                # Process the file - always use lightning-fast processing
-                if self.lightning_processor:
-                    output_path = self.lightning_processor.process_lightning_fast(
-                        file_path,
-                        progress_callback=file_progress_callback,
-                        tempo_change=self.config["tempo_change"],
-                        pitch_semitones=self.config["pitch_semitones"],
-                        normalize=self.config["normalize_volume"],
-                        apply_highpass=self.config["apply_highpass"],
-                        clean_metadata=self.config["clean_metadata"]
-                    )
-                    self.log_to_terminal(f"⚡ Lightning processed: {os.path.basename(file_path)}", "info")
-                else:
-                    # Fallback to basic processing
-                    self.log_to_terminal(f"❌ Lightning processor not available", "error")
-                
-                print(f"DEBUG: Output file created: {output_path}")
-                
-                # Update progress to next file
-                progress = (i + 1) / total_files
-                self.update_progress(progress)
+            if not self.planner and not self.lightning_processor:
+                raise Exception("Lightning processor not available")
+            
+            # Jobs are claimed and run in groups that share options
+            processed = self.job_queue.drain(self._run_batch)
+            results = [result for _, result in processed]
+            total_files = len(results)
+            self.update_progress(1.0)
+            
+            # Refine the cost tables with this batch's measured timings
+            if self.planner:
+                try:
+                    self.planner.fit()
+                    self.planner.save()
+                except Exception as e:
+                    print(f"Warning: could not update cost model: {e}")
+            
+            # Finished jobs have nothing left to resume; failed ones stay for a retry
+            try:
+                self.job_queue.clear()
+            except Exception as e:
+                print(f"Warning: could not clean up job queue: {e}")
             
-            self.update_status(f"Successfully processed {total_files} files!")
             processed_folder = self.config.get('processed_output_folder', 'output/processed')
-            messagebox.showinfo("Success", f"Processed {total_files} files. Check the '{processed_folder}' folder.")
+            failures = [result.failure for result in results if result.failure]
+            if failures:
+                report_path = write_failure_report(failures, processed_folder)
+                self.log_to_terminal(f"📋 Failure report: {report_path}", "warning")
+                self.update_status(f"Processed {total_files - len(failures)} of {total_files} files, "
+                                   f"{len(failures)} failed")
+                self.ui_events.call(
+                    messagebox.showwarning,
+                    "Finished with errors",
+                    f"Processed {total_files - len(failures)} of {total_files} files.\n"
+                    f"{len(failures)} failed - see {report_path} for details.")
+            else:
+                self.update_status(f"Successfully processed {total_files} files!")
+                self.ui_events.call(messagebox.showinfo, "Success", f"Processed {total_files} files. Check the '{processed_folder}' folder.")
             
         except Exception as e:
             error_msg = f"An error occurred: {str(e)}"
-            print(f"DEBUG: Error during processing: {error_msg}")
+            self.log_to_terminal(f"❌ {error_msg}", "error")
             import traceback
             traceback.print_exc()
             self.update_status("Error occurred during processing")
-            messagebox.showerror("Error", error_msg)
+            self.ui_events.call(messagebox.showerror, "Error", error_msg)
         finally:
             # Re-enable the process button - thread safe
             def _enable_button():
                 self.process_btn.configure(state="normal")
                 self.update_progress(0)  # Reset progress bar
                 self.update_status("Ready to process files")
-            self.root.after(0, _enable_button)
+            self.ui_events.call(_enable_button)
+    
+    def _run_batch(self, files, options, output_paths, file_callback):
+        """
+        Process one group of queued files that share options
+        
+        Args:
+            files (list): Input paths
+            options (dict): Processing options in the planner's naming
+            output_paths (list): Optional explicit output path per file
+            file_callback (callable): Called with each BatchResult (index into files)
+        
+        Returns:
+            list: BatchResult per file
+        """
+        from batch_executor import BatchExecutor, BatchResult
+        from batch_scheduler import BatchScheduler, format_eta
+        
+        def batch_progress_callback(overall_progress, status_msg=""):
+            self.update_status(f"Processing {status_msg}")
+            self.update_progress(overall_progress)
+        
+        def file_done(result):
+            name = os.path.basename(result.input_path)
+            self.set_file_status(result.input_path,
+                                 FAILED if result.failure else SKIPPED if result.skipped else DONE)
+            if result.failure:
+                self.log_to_terminal(
+                    f"❌ Failed at {result.failure.stage}: {name} - {result.failure.message}", "error")
+            elif not result.skipped:
+                self.log_to_terminal(
+                    f"⚡ Processed with {result.backend} ({result.seconds:.1f}s): {name} -> "
+                    f"{os.path.basename(result.output_path)}", "info")
+            file_callback(result)
+        
+        # Skip files whose output from an earlier run is still valid
+        results = [None] * len(files)
+        todo = list(range(len(files)))
+        manifest = None
+        force = self.config.get('force_reprocess', False)
+        if self.config.get('skip_unchanged', True):
+            self.update_status(f"Checking {len(files)} files for changes...")
+            manifest = BatchManifest(self.config)
+            if not force:
+                up_to_date = manifest.find_current(files, options, output_paths)
+                if up_to_date:
+                    self.log_to_terminal(
+                        f"⏭️ Skipping {len(up_to_date)} unchanged files (outputs are up to date)", "info")
+                for index, output_path in up_to_date.items():
+                    result = BatchResult(index, files[index], None)
+                    result.output_path = output_path
+                    result.skipped = True
+                    results[index] = result
+                    file_done(result)
+                todo = [i for i in todo if i not in up_to_date]
+        if not todo:
+            return results
+        
+        # Identical inputs with identical settings are processed only once
+        store = ContentStore(self.config) if self.config.get('content_store', True) else None
+        
+        # Probe durations and order the batch before anything starts
+        batch = [files[i] for i in todo]
+        batch_outputs = [output_paths[i] for i in todo] if output_paths else None
+        executor = BatchExecutor(config=self.config, planner=self.planner, pool=self.worker_pool,
+                                 monitor=self.perf_monitor)
+        workers = max(1, min(executor.max_workers, len(batch)))
+        self.update_status(f"Analyzing {len(batch)} files...")
+        schedule = BatchScheduler(config=self.config, planner=self.planner).schedule(
+            batch, options, workers=workers, known_durations=self.file_durations)
+        eta = schedule.eta()
+        self.log_to_terminal(
+            f"🧵 Processing {len(batch)} files with {workers} workers "
+            f"({schedule.policy.upper()} order)", "info")
+        if eta is not None:
+            self.log_to_terminal(
+                f"⏱️ Predicted batch time: ~{format_eta(eta)} "
+                f"(first result in ~{format_eta(schedule.first_result_eta())})", "info")
+            self.update_status(f"Starting {len(batch)} files, ETA ~{format_eta(eta)}...")
+        
+        def batch_file_done(result):
+            # Executor indices are positions in batch; report them against files
+            result = copy.copy(result)
+            result.index = todo[result.index]
+            results[result.index] = result
+            file_done(result)
+        
+        def file_started(index):
+            self.set_file_status(batch[index], RUNNING)
+        
+        # Files are spread over worker processes; results come back as each file finishes.
+        # A failing file is retried or reported without stopping the others
+        executor.run(
+            batch,
+            options,
+            progress_callback=batch_progress_callback,
+            file_callback=batch_file_done,
+            output_paths=batch_outputs,
+            schedule=schedule,
+            # Unchanged files were skipped above; the executor only records new outputs
+            manifest=manifest,
+            force=True,
+            store=store,
+            start_callback=file_started
+        )
+        return results
+    
+    def _warm_worker_pool(self):
+        """Start and warm the batch worker pool (runs in a background thread)"""
+        try:
+            start = time.time()
+            self.worker_pool.start(wait_ready=True)
+            self.log_to_terminal(
+                f"🔥 {self.worker_pool.max_workers} batch workers ready "
+                f"({time.time() - start:.1f}s warm-up)", "info")
+        except Exception as e:
+            print(f"Warning: could not start batch workers: {e}")
+    
+    def _planner_options(self):
+        """Current processing options in the planner's (config) naming"""
+        return {
+            'tempo_change': self.config["tempo_change"],
+            'pitch_semitones': self.config["pitch_semitones"],
+            'normalize': self.config["normalize_volume"],
+            'apply_highpass': self.config["apply_highpass"],
+            'add_noise': self.config.get("add_noise", False),
+            'clean_metadata': self.config["clean_metadata"],
+        }
     
     def download_youtube(self):
         """Download YouTube video as MP3"""
@@ -1053,28 +1594,25 @@ class SunoReadyApp:
         self.status_text.insert("1.0", f"🚀 Starting download...\n\n🔗 URL: {url}\n📊 Quality: {selected_quality} kbps\n\n⏳ Please wait...")
         
         # Start download in separate thread
-        thread = threading.Thread(target=self._download_youtube_thread, args=(url,))
+        thread = threading.Thread(target=self._download_youtube_thread, args=(url, selected_quality))
         thread.daemon = True
         thread.start()
     
-    def _download_youtube_thread(self, url):
-        """Download YouTube video in separate thread"""
+    def _download_youtube_thread(self, url, selected_quality):
+        """Download YouTube video in separate thread (widgets are only touched through ui_events)"""
         try:
+            self._wait_for_backends()
             self.log_to_terminal("=" * 50, "info")
             self.log_to_terminal("🎵 SunoReady - YouTube Downloader", "info")
             self.log_to_terminal("=" * 50, "info")
-            
-            # Get selected quality
-            selected_quality = self.quality_var.get()
             self.log_to_terminal(f"🎵 Audio quality: {selected_quality} kbps", "info")
             
             # Update status display with modern styling
-            self.status_text.delete("1.0", "end")
-            self.status_text.insert("1.0", f"⚡ Processing download...\n\n📊 Quality: {selected_quality} kbps\n🎥 Extracting video information...\n\n⏳ This may take a moment...")
+            self._show_download_status(f"⚡ Processing download...\n\n📊 Quality: {selected_quality} kbps\n🎥 Extracting video information...\n\n⏳ This may take a moment...")
             
             # Simulate download progress steps
             self.update_download_progress(0.3)
-            self.root.after(500, lambda: self.update_download_progress(0.6))
+            self.ui_events.call(self.root.after, 500, lambda: self.update_download_progress(0.6))
             
             output_path = self.yt_downloader.download_audio(url, quality=selected_quality)
             
@@ -1083,93 +1621,81 @@ class SunoReadyApp:
             if output_path:
                 # Clean metadata with progress indication
                 self.log_to_terminal("Cleaning metadata...", "info")
-                self.root.after(200, lambda: self.loading_label.configure(text="Cleaning metadata..."))
-                self.status_text.insert("end", "\n\n🧹 Cleaning metadata...")
+                self.ui_events.call(self.loading_label.configure, text="Cleaning metadata...")
+                self._show_download_status("\n\n🧹 Cleaning metadata...", append=True)
                 self.metadata_utils.clean_metadata(output_path)
                 self.log_to_terminal("Metadata cleaned successfully!", "success")
                 
                 # Complete the animation
-                self.root.after(300, lambda: [
-                    self.update_download_progress(1.0),
-                    self.stop_loading_animation(),
-                    self.update_status("Download completed successfully!"),
-                    self.log_to_terminal("✅ Download process completed!", "success"),
-                    self.status_text.delete("1.0", "end"),
-                    self.status_text.insert("1.0", f"✅ Download completed successfully!\n\n📁 File saved to:\n{output_path}\n\n🎉 Ready for your next download!"),
-                    messagebox.showinfo("Success", f"Downloaded to: {output_path}")
-                ])
+                self.update_download_progress(1.0)
+                self.ui_events.call(self.stop_loading_animation)
+                self.update_status("Download completed successfully!")
+                self.log_to_terminal("✅ Download process completed!", "success")
+                self._show_download_status(f"✅ Download completed successfully!\n\n📁 File saved to:\n{output_path}\n\n🎉 Ready for your next download!")
+                self.ui_events.call(messagebox.showinfo, "Success", f"Downloaded to: {output_path}")
             else:
-                self.stop_loading_animation()
+                self.ui_events.call(self.stop_loading_animation)
                 self.update_download_progress(0)
                 self.update_status("Download failed")
                 self.log_to_terminal("❌ Download failed - file not found", "error")
-                self.status_text.delete("1.0", "end")
-                self.status_text.insert("1.0", "❌ Download failed - file not found\n\n🔍 Please check the URL and try again.\n💡 Make sure the video is public and accessible.")
-                messagebox.showerror("Error", "Failed to download the video.")
+                self._show_download_status("❌ Download failed - file not found\n\n🔍 Please check the URL and try again.\n💡 Make sure the video is public and accessible.")
+                self.ui_events.call(messagebox.showerror, "Error", "Failed to download the video.")
                 
         except Exception as e:
-            self.stop_loading_animation()
+            self.ui_events.call(self.stop_loading_animation)
             self.update_download_progress(0)
             self.update_status("Download failed")
             self.log_to_terminal(f"❌ Download failed: {str(e)}", "error")
-            self.status_text.delete("1.0", "end")
-            self.status_text.insert("1.0", f"❌ Download failed!\n\n🚨 Error: {str(e)}\n\n💡 Please check the URL and try again.\n🔧 If issue persists, check your internet connection.")
-            messagebox.showerror("Download Error", f"Failed to download: {str(e)}")
+            self._show_download_status(f"❌ Download failed!\n\n🚨 Error: {str(e)}\n\n💡 Please check the URL and try again.\n🔧 If issue persists, check your internet connection.")
+            self.ui_events.call(messagebox.showerror, "Download Error", f"Failed to download: {str(e)}")
+    
+    def _show_download_status(self, text, append=False):
+        """Replace (or append to) the download status text - thread safe"""
+        def show():
+            if not append:
+                self.status_text.delete("1.0", "end")
+            self.status_text.insert("end" if append else "1.0", text)
+        self.ui_events.call(show)
     
     def update_download_progress(self, value):
-        """Update download progress bar"""
+        """Update download progress bar - thread safe"""
+        self.ui_events.progress(value, 'download_progress')
+    
+    def _set_download_progress(self, value):
         if hasattr(self, 'download_progress'):
             self.download_progress.set(value)
-            self.root.update_idletasks()
     
     def clear_terminal(self):
         """Clear terminal console"""
-        self.terminal_text.delete("1.0", "end")
+        self.terminal_view.clear()
         self.log_to_terminal("Terminal cleared.", "info")
     
     def log_to_terminal(self, message, msg_type="normal"):
-        """Log message to terminal with color coding"""
-        timestamp = threading.current_thread().name
-        
-        # Color coding based on message type
-        if msg_type == "info":
-            color = "#8be9fd"  # Dracula cyan
-            prefix = "[INFO]"
-        elif msg_type == "warning":
-            color = "#ffb86c"  # Dracula orange  
-            prefix = "[WARN]"
-        elif msg_type == "error":
-            color = "#ff5555"  # Dracula red
-            prefix = "[ERROR]"
-        elif msg_type == "success":
-            color = "#50fa7b"  # Dracula green
-            prefix = "[SUCCESS]"
-        elif msg_type == "youtube":
-            color = "#ff79c6"  # Dracula pink
-            prefix = "[YOUTUBE]"
-        elif msg_type == "download":
-            color = "#bd93f9"  # Dracula purple
-            prefix = "[DOWNLOAD]"
+        """Log message to terminal - thread safe"""
+        self.ui_events.log(message, msg_type)
+    
+    def _write_terminal_lines(self, entries):
+        """Append a frame's worth of log messages to the terminal (Tk thread)"""
+        lines = []
+        switch_tab = False
+        for message, msg_type in entries:
+            prefix = TERMINAL_PREFIXES.get(msg_type, "")
+            lines.extend(f"{prefix} {message}".splitlines() or [""])
+            switch_tab = switch_tab or msg_type in ["error", "download", "youtube"]
+        
+        # One insert and one scroll per frame, however many messages arrived
+        if hasattr(self, 'terminal_view'):
+            self.terminal_view.append(lines)
         else:
-            color = "#f8f8f2"  # Dracula foreground
-            prefix = ""
-        
-        # Insert message with timestamp
-        current_time = threading.current_thread().name if hasattr(threading.current_thread(), 'name') else "Main"
-        
-        # Check if terminal exists and add message
-        if hasattr(self, 'terminal_text'):
-            self.terminal_text.insert("end", f"{prefix} {message}\n")
-            self.terminal_text.see("end")
-            
-            # Auto-switch to terminal tab for important messages
-            if msg_type in ["error", "download", "youtube"] and hasattr(self, 'yt_notebook'):
-                try:
-                    self.yt_notebook.set("Terminal")
-                except:
-                    pass  # Ignore if tab switching fails
-                    
-            self.root.update_idletasks()
+            # Terminal tab not built yet; it shows the buffer when it is
+            self.terminal_buffer.append(lines)
+        
+        # Auto-switch to terminal tab for important messages
+        if switch_tab and hasattr(self, 'yt_notebook'):
+            try:
+                self.show_tab("yt_notebook", "Terminal")
+            except:
+                pass  # Ignore if tab switching fails
 
     def run(self):
         """Start the application"""
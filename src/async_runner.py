@@ -0,0 +1,240 @@
+"""
+asyncio orchestration for SunoReady child processes
+Runs FFmpeg/ffprobe/yt-dlp work concurrently under per-tool limits, streams
+their output incrementally and chains stages through bounded queues
+"""
+
+import asyncio
+import os
+import subprocess
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _default_limits(config):
+    cores = os.cpu_count() or 1
+    return {
+        'ffmpeg': int(config.get('max_concurrent_ffmpeg', cores)),
+        'ffprobe': int(config.get('max_concurrent_ffprobe', cores * 2)),
+        'yt-dlp': int(config.get('max_concurrent_downloads', 3)),
+        'cpu': int(config.get('max_concurrent_dsp', cores)),
+        # Waits for scratch admission: blocked on the quota, not on the CPU
+        'scratch': cores * 2,
+    }
+
+
+class AsyncSubprocessRunner:
+    """Run child processes and blocking work from one event loop with bounded concurrency"""
+
+    def __init__(self, config=None, limits=None):
+        self.config = config or {}
+        self.limits = _default_limits(self.config)
+        self.limits.update(limits or {})
+        self.default_limit = max(self.limits.values())
+        # Semaphores are bound to a loop; entries go away with their loop
+        self._semaphores = weakref.WeakKeyDictionary()
+        # One thread pool per blocking tool, sized by that tool's limit
+        self._executors = {}
+        self._executors_lock = threading.Lock()
+
+    def _tool_name(self, cmd):
+        name = os.path.basename(str(cmd[0])).lower()
+        for suffix in ('.exe', '.bat', '.cmd'):
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+        return name
+
+    def semaphore(self, tool):
+        """Concurrency gate for a tool ('ffmpeg', 'ffprobe', 'yt-dlp', 'cpu', ...)"""
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if tool not in semaphores:
+            semaphores[tool] = asyncio.Semaphore(self.limits.get(tool, self.default_limit))
+        return semaphores[tool]
+
+    async def run(self, cmd, on_stdout=None, on_stderr=None, input_data=None, tail_lines=200):
+        """
+        Run a child process and stream its output line by line
+
+        Callbacks may be plain functions or coroutines. A slow coroutine
+        callback stops the pipe from being read, so the child blocks on a full
+        pipe instead of output piling up in memory.
+
+        Args:
+            cmd (list): Command and arguments
+            on_stdout (callable): Called with each decoded stdout line
+            on_stderr (callable): Called with each decoded stderr line
+            input_data (bytes): Data written to the child's stdin
+            tail_lines (int): Lines of each stream kept for the result
+
+        Returns:
+            subprocess.CompletedProcess: returncode plus stdout/stderr text
+                (the last tail_lines lines of each stream)
+        """
+        async with self.semaphore(self._tool_name(cmd)):
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE if input_data is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout_tail = deque(maxlen=tail_lines)
+            stderr_tail = deque(maxlen=tail_lines)
+
+            async def feed():
+                if input_data is None:
+                    return
+                try:
+                    proc.stdin.write(input_data)
+                    await proc.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    proc.stdin.close()
+
+            try:
+                await asyncio.gather(
+                    feed(),
+                    self._pump(proc.stdout, stdout_tail, on_stdout),
+                    self._pump(proc.stderr, stderr_tail, on_stderr),
+                )
+                returncode = await proc.wait()
+            except asyncio.CancelledError:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                raise
+
+        return subprocess.CompletedProcess(
+            list(cmd), returncode, "".join(stdout_tail), "".join(stderr_tail)
+        )
+
+    async def _pump(self, stream, tail, callback):
+        """Read a pipe incrementally, keeping a bounded tail"""
+        pending = b""
+        while True:
+            chunk = await stream.read(4096)
+            pending += chunk
+            # FFmpeg progress lines end in '\r', so split on both
+            lines = pending.replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n")
+            pending = lines.pop() if chunk else b""
+            for line in lines if chunk else lines + [pending]:
+                if not line:
+                    continue
+                text = line.decode(errors='replace') + "\n"
+                tail.append(text)
+                if callback is not None:
+                    outcome = callback(text)
+                    if asyncio.iscoroutine(outcome):
+                        await outcome
+            if not chunk:
+                break
+
+    def _executor_for(self, tool):
+        with self._executors_lock:
+            executor = self._executors.get(tool)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.limits.get(tool, self.default_limit),
+                    thread_name_prefix=f'sunoready-{tool}'
+                )
+                self._executors[tool] = executor
+            return executor
+
+    async def run_blocking(self, func, *args, tool='cpu'):
+        """
+        Run a blocking function (librosa DSP, file I/O) without blocking the loop
+
+        Each tool has its own threads, so a slow download or a job waiting
+        for scratch space ('scratch') never holds a CPU slot.
+        """
+        async with self.semaphore(tool):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor_for(tool), lambda: func(*args))
+
+    async def download_audio(self, downloader, url, **kwargs):
+        """Run YouTubeDownloader.download_audio under the yt-dlp limit"""
+        return await self.run_blocking(lambda: downloader.download_audio(url, **kwargs), tool='yt-dlp')
+
+    def shutdown(self):
+        """Release the worker threads used by run_blocking"""
+        with self._executors_lock:
+            executors, self._executors = list(self._executors.values()), {}
+        for executor in executors:
+            executor.shutdown(wait=False)
+
+
+class AsyncPipeline:
+    """
+    Chain coroutine stages through bounded queues
+
+    Each stage is (name, coroutine_function, workers). When a stage falls
+    behind, the queue in front of it fills up and upstream workers wait on
+    put(), so no stage runs more than queue_size items ahead of the next.
+    """
+
+    def __init__(self, stages, queue_size=4):
+        self.stages = stages
+        self.queue_size = queue_size
+
+    async def run(self, items):
+        """
+        Push items through all stages
+
+        Returns:
+            list: Final results in input order; an item whose stage raised
+                holds the exception instead
+        """
+        items = list(items)
+        results = [None] * len(items)
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        done = object()
+
+        async def produce():
+            for index, item in enumerate(items):
+                await queues[0].put((index, item))
+            for _ in range(self.stages[0][2]):
+                await queues[0].put(done)
+
+        async def worker(stage_index):
+            _, func, _ = self.stages[stage_index]
+            inbox = queues[stage_index]
+            outbox = queues[stage_index + 1] if stage_index + 1 < len(queues) else None
+            while True:
+                entry = await inbox.get()
+                if entry is done:
+                    return
+                index, value = entry
+                if not isinstance(value, BaseException):
+                    try:
+                        value = await func(value)
+                    except Exception as e:
+                        value = e
+                if outbox is None:
+                    results[index] = value
+                else:
+                    await outbox.put((index, value))
+
+        async def run_stage(stage_index):
+            workers = self.stages[stage_index][2]
+            await asyncio.gather(*(worker(stage_index) for _ in range(workers)))
+            if stage_index + 1 < len(queues):
+                for _ in range(self.stages[stage_index + 1][2]):
+                    await queues[stage_index + 1].put(done)
+
+        await asyncio.gather(produce(), *(run_stage(i) for i in range(len(self.stages))))
+        return results
+
+
+_default_runner = None
+_default_runner_lock = threading.Lock()
+
+
+def get_default_runner(config=None):
+    """Shared runner used by the processors' async entry points"""
+    global _default_runner
+    with _default_runner_lock:
+        if _default_runner is None:
+            _default_runner = AsyncSubprocessRunner(config)
+        return _default_runner
@@ -8,8 +8,8 @@ import numpy as np
 import os
 import subprocess
 from pathlib import Path
-import tempfile
 import shutil
+import time
 
 # Critical imports with error handling
 try:
@@ -58,6 +58,62 @@ except ImportError as e:
     MP4 = None
     mutagen_available = False
 
+try:
+    import mp3_utils
+    mp3_utils_available = True
+except ImportError:
+    mp3_utils = None
+    mp3_utils_available = False
+
+from concurrency_controller import ffmpeg_thread_args
+from perf_monitor import record_stage, stage_timer
+from progress_utils import flush_progress, rate_limited
+from scratch_space import get_scratch_space
+
+try:
+    from parallel_encoder import ParallelMP3Encoder
+    parallel_encoder_available = True
+except ImportError:
+    ParallelMP3Encoder = None
+    parallel_encoder_available = False
+
+class EnhancedJobState:
+    """Per-file state passed between the stages of process_audio_enhanced"""
+    
+    def __init__(self, input_path, output_path, options, progress_callback=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.options = options
+        self.progress_callback = progress_callback
+        self.current_file = input_path
+        self.job = None
+        self.y = None
+        self.sr = None
+    
+    @property
+    def needs_effects(self):
+        """Whether the librosa decode/effects/encode steps are needed"""
+        options = self.options
+        return any([
+            options.get('pitch_shift', 0) != 0,
+            options.get('tempo_change', 1.0) != 1.0,
+            options.get('normalize', False),
+            options.get('add_noise', False),
+            options.get('apply_highpass', False)
+        ])
+    
+    def update_progress(self, step, total_steps, message=""):
+        if self.progress_callback:
+            self.progress_callback(step / total_steps, message)
+    
+    def close(self):
+        """Drop decoded audio and remove the scratch directory"""
+        flush_progress(self.progress_callback)
+        self.y = None
+        if self.job is not None:
+            self.job.close()
+            self.job = None
+
 class AudioProcessor:
     def __init__(self, config=None):
         self.sample_rate = 44100
@@ -95,6 +151,15 @@ class AudioProcessor:
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
+            # Long outputs: encode segments in parallel FFmpeg processes
+            if parallel_encoder_available and output_path.endswith('.mp3'):
+                encoder = ParallelMP3Encoder(self.config)
+                if encoder.should_use(np.shape(y)[-1], sr):
+                    try:
+                        return encoder.encode(y, sr, output_path)
+                    except Exception as e:
+                        print(f"Warning: parallel encode failed ({e}), using single encoder")
+            
             # Save as WAV first (high quality)
             temp_wav = output_path.replace('.mp3', '_temp.wav')
             sf.write(temp_wav, y, sr)
@@ -119,6 +184,7 @@ class AudioProcessor:
                 '-i', input_path,
                 '-codec:a', 'libmp3lame',
                 '-b:a', '320k',  # High quality MP3
+                *ffmpeg_thread_args(),
                 output_path
             ]
             
@@ -399,6 +465,7 @@ class AudioProcessor:
             
             # Optimized encoding settings for speed
             cmd.extend(['-c:a', 'libmp3lame', '-q:a', '2'])  # VBR quality 2 (fast & good)
+            cmd.extend(ffmpeg_thread_args())
             cmd.append(output_path)
             
             # Run ffmpeg
@@ -450,10 +517,17 @@ class AudioProcessor:
         Args:
             file_path (str): Path to audio file
         """
+        # MP3 tags can be dropped at the bitstream level without re-encoding
+        if mp3_utils_available and mp3_utils.is_mp3(file_path):
+            try:
+                mp3_utils.strip_tags(file_path)
+                return True
+            except mp3_utils.MP3FormatError as e:
+                print(f"Warning: bitstream tag stripping failed ({e}), re-encoding with ffmpeg")
+        
+        # Create temporary file
+        temp_file = file_path + '_temp_clean.mp3'
         try:
-            # Create temporary file
-            temp_file = file_path + '_temp_clean.mp3'
-            
             # Use ffmpeg to remove metadata
             input_stream = ffmpeg.input(file_path)
             output_stream = ffmpeg.output(
@@ -487,128 +561,176 @@ class AudioProcessor:
             progress_callback (callable): Callback for progress updates
             **options: Processing options
         """
+        state = self.enhanced_decode(input_path, output_path, progress_callback, **options)
+        state = self.enhanced_dsp(state)
+        return self.enhanced_encode(state)
+    
+    def enhanced_decode(self, input_path, output_path=None, progress_callback=None, **options):
+        """
+        First stage of process_audio_enhanced: scratch setup, tempo stretch and decoding
+        
+        Returns:
+            EnhancedJobState: State handed to enhanced_dsp
+        """
+        state = EnhancedJobState(input_path, output_path, options,
+                                 rate_limited(progress_callback, config=self.config))
+        start = time.perf_counter()
         try:
-            def update_progress(step, total_steps, message=""):
-                if progress_callback:
-                    progress = step / total_steps
-                    progress_callback(progress, message)
-                    
-            if output_path is None:
+            if state.output_path is None:
                 input_name = Path(input_path).stem
-                output_path = f"{self.processed_output_folder}/{input_name}_processed.mp3"
+                state.output_path = f"{self.processed_output_folder}/{input_name}_processed.mp3"
             
             # Ensure output directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            os.makedirs(os.path.dirname(state.output_path), exist_ok=True)
             
-            update_progress(1, 8, "Initializing...")
+            state.update_progress(1, 8, "Initializing...")
             
-            # Create temporary file for processing chain
-            temp_files = []
-            current_file = input_path
-            
-            # Store trim duration for final step
-            trim_duration = options.get('trim_duration')
+            # Private scratch directory for the processing chain
+            scratch = get_scratch_space(self.config)
+            state.job = scratch.open_job(Path(input_path).stem, scratch.estimate_bytes(input_path))
             
             # Step 1: Tempo stretch (if needed) - do before other processing
             tempo_stretch = options.get('tempo_stretch', 1.0)
             if tempo_stretch != 1.0:
-                update_progress(2, 8, "Applying tempo stretch...")
-                temp_tempo = tempfile.mktemp(suffix='.mp3')
-                temp_files.append(temp_tempo)
-                self.tempo_stretch_ffmpeg(current_file, temp_tempo, tempo_stretch)
-                current_file = temp_tempo
+                state.update_progress(2, 8, "Applying tempo stretch...")
+                temp_tempo = state.job.new_path('.mp3', 'tempo')
+                self.tempo_stretch_ffmpeg(state.current_file, temp_tempo, tempo_stretch)
+                state.current_file = temp_tempo
             else:
-                update_progress(2, 8, "Skipping tempo stretch...")
-            
-            # Step 2: Apply other processing (pitch, tempo change, normalize, etc.)
-            if any([
-                options.get('pitch_shift', 0) != 0,
-                options.get('tempo_change', 1.0) != 1.0,
-                options.get('normalize', False),
-                options.get('add_noise', False),
-                options.get('apply_highpass', False)
-            ]):
-                update_progress(3, 8, "Applying audio effects...")
-                temp_processed = tempfile.mktemp(suffix='.mp3')
-                temp_files.append(temp_processed)
-                
-                # Use existing process_audio method
-                self._process_with_librosa(current_file, temp_processed, options)
-                current_file = temp_processed
+                state.update_progress(2, 8, "Skipping tempo stretch...")
+            
+            # Step 2a: Decode for the librosa effects
+            if state.needs_effects:
+                state.update_progress(3, 8, "Applying audio effects...")
+                state.y, state.sr = self.load_audio(state.current_file)
+            return state
+            
+        except Exception as e:
+            state.close()
+            raise Exception(f"Failed to process audio with enhanced features: {str(e)}") from e
+        finally:
+            record_stage('decode', time.perf_counter() - start)
+    
+    def enhanced_dsp(self, state):
+        """Second stage of process_audio_enhanced: librosa effects on the decoded audio"""
+        start = time.perf_counter()
+        try:
+            # Step 2b: Apply other processing (pitch, tempo change, normalize, etc.)
+            if state.needs_effects:
+                state.y = self.apply_effects(state.y, state.options)
             else:
-                update_progress(3, 8, "Skipping audio effects...")
+                state.update_progress(3, 8, "Skipping audio effects...")
+            return state
+            
+        except Exception as e:
+            state.close()
+            raise Exception(f"Failed to process audio with enhanced features: {str(e)}") from e
+        finally:
+            record_stage('dsp', time.perf_counter() - start)
+    
+    def enhanced_encode(self, state):
+        """
+        Last stage of process_audio_enhanced: encode, fades, trim, metadata and publish
+        
+        Returns:
+            str: Output path
+        """
+        options = state.options
+        start = time.perf_counter()
+        try:
+            # Step 2c: Encode the processed audio
+            if state.y is not None:
+                temp_processed = state.job.new_path('.mp3', 'processed')
+                self.save_audio(state.y, state.sr, temp_processed)
+                state.current_file = temp_processed
+                state.y = None
             
             # Step 3: Apply fade effects
             fade_in = options.get('fade_in', False)
             fade_out = options.get('fade_out', False)
             if fade_in or fade_out:
-                update_progress(4, 8, "Applying fade effects...")
-                temp_fade = tempfile.mktemp(suffix='.mp3')
-                temp_files.append(temp_fade)
+                state.update_progress(4, 8, "Applying fade effects...")
+                temp_fade = state.job.new_path('.mp3', 'fade')
                 
                 self.apply_fade_effects(
-                    current_file, temp_fade,
+                    state.current_file, temp_fade,
                     fade_in=fade_in,
                     fade_out=fade_out,
                     fade_in_duration=options.get('fade_in_duration', 3.0),
                     fade_out_duration=options.get('fade_out_duration', 3.0),
                     total_duration=None  # Let function calculate actual duration
                 )
-                current_file = temp_fade
+                state.current_file = temp_fade
             else:
-                update_progress(4, 8, "Skipping fade effects...")
+                state.update_progress(4, 8, "Skipping fade effects...")
             
             # Step 4: FINAL TRIM - Guarantee exact duration requested by user
+            trim_duration = options.get('trim_duration')
             if trim_duration and trim_duration > 0:
-                update_progress(5, 8, f"Final trim to {trim_duration}s...")
-                temp_final_trim = tempfile.mktemp(suffix='.mp3')
-                temp_files.append(temp_final_trim)
+                state.update_progress(5, 8, f"Final trim to {trim_duration}s...")
+                temp_final_trim = state.job.new_path('.mp3', 'trim')
                 
-                # Use FFmpeg for final trimming to exact duration
-                import subprocess
-                cmd = ['ffmpeg', '-y', '-i', current_file, '-t', str(trim_duration), 
-                      '-c:a', 'libmp3lame', '-q:a', '2', temp_final_trim]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    current_file = temp_final_trim
+                if self._trim_mp3_bitstream(state.current_file, temp_final_trim, trim_duration):
+                    state.current_file = temp_final_trim
                 else:
-                    print(f"Warning: Final trimming failed, using previous result")
+                    # Use FFmpeg for final trimming to exact duration
+                    cmd = ['ffmpeg', '-y', '-i', state.current_file, '-t', str(trim_duration), 
+                          '-c:a', 'libmp3lame', '-q:a', '2', temp_final_trim]
+                    result = subprocess.run(cmd, capture_output=True, text=True)
+                    if result.returncode == 0:
+                        state.current_file = temp_final_trim
+                    else:
+                        print(f"Warning: Final trimming failed, using previous result")
             else:
-                update_progress(5, 8, "No final trimming needed...")
+                state.update_progress(5, 8, "No final trimming needed...")
             
-            # Step 5: Copy to final output
-            update_progress(6, 8, "Copying to output...")
-            if current_file != output_path:
-                shutil.copy2(current_file, output_path)
+            # Step 5: Make sure the result lives in scratch (never touch the input)
+            state.update_progress(6, 8, "Copying to output...")
+            if state.current_file == state.input_path:
+                temp_copy = state.job.new_path(Path(state.input_path).suffix, 'copy')
+                shutil.copy2(state.current_file, temp_copy)
+                state.current_file = temp_copy
+            
+            record_stage('encode', time.perf_counter() - start)
+            start = None
             
             # Step 6: Clean metadata (if requested)
             if options.get('clean_metadata', False):
-                update_progress(7, 8, "Cleaning metadata...")
-                self.clean_metadata(output_path)
+                state.update_progress(7, 8, "Cleaning metadata...")
+                with stage_timer('metadata'):
+                    self.clean_metadata(state.current_file)
             else:
-                update_progress(7, 8, "Skipping metadata cleaning...")
-            
-            # Clean up temporary files
-            update_progress(8, 8, "Cleaning up temporary files...")
-            for temp_file in temp_files:
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except:
-                    pass  # Ignore cleanup errors
-            
-            update_progress(8, 8, "Processing complete!")
-            return output_path
+                state.update_progress(7, 8, "Skipping metadata cleaning...")
+            
+            # Step 7: Atomically publish the finished file
+            state.job.commit(state.current_file, state.output_path)
+            
+            state.update_progress(8, 8, "Processing complete!")
+            return state.output_path
             
         except Exception as e:
-            # Clean up temporary files on error
-            for temp_file in temp_files:
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except:
-                    pass
-            raise Exception(f"Failed to process audio with enhanced features: {str(e)}")
+            raise Exception(f"Failed to process audio with enhanced features: {str(e)}") from e
+        finally:
+            if start is not None:
+                record_stage('encode', time.perf_counter() - start)
+            # Remove the job's scratch directory with all intermediates
+            state.close()
+    
+    def _trim_mp3_bitstream(self, input_path, output_path, duration):
+        """
+        Trim an MP3 on frame boundaries instead of re-encoding it
+        
+        Returns:
+            bool: True if the bitstream trim succeeded
+        """
+        if not (mp3_utils_available and mp3_utils.is_mp3(input_path)):
+            return False
+        try:
+            mp3_utils.trim(input_path, output_path, duration, keep_tags=True)
+            return True
+        except mp3_utils.MP3FormatError as e:
+            print(f"Warning: bitstream trim failed ({e}), re-encoding with ffmpeg")
+            return False
     
     def _process_with_librosa(self, input_path, output_path, options):
         """Helper method for librosa-based processing"""
@@ -616,6 +738,13 @@ class AudioProcessor:
         y, sr = self.load_audio(input_path)
         
         # Apply processing (trim is done earlier with FFmpeg)
+        y = self.apply_effects(y, options)
+        
+        # Save
+        self.save_audio(y, sr, output_path)
+    
+    def apply_effects(self, y, options):
+        """Apply pitch, tempo, normalize, noise and highpass to decoded audio"""
         if options.get('pitch_shift', 0) != 0:
             y = self.change_pitch(y, options['pitch_shift'])
         
@@ -632,5 +761,4 @@ class AudioProcessor:
         if options.get('apply_highpass', False):
             y = self.apply_highpass_filter(y)
         
-        # Save
-        self.save_audio(y, sr, output_path)
+        return y
@@ -0,0 +1,549 @@
+"""
+Parallel batch processing for SunoReady
+Sends files to a pool of worker processes, merges their progress into one
+overall callback and hands results back in input order. Each file runs in
+isolation: failures are retried when transient and reported otherwise,
+while the rest of the batch keeps going
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from batch_failures import BatchFailure, is_transient, retry_delay
+from batch_manifest import default_output_path, hash_file
+from concurrency_controller import ConcurrencyController, apply_thread_limits
+from perf_monitor import StageCollector
+from processor_planner import JobPlan, run_backend, translate_options, requested_features
+from progress_utils import flush_progress, rate_limited
+from stage_pipeline import StagePipeline
+from worker_pool import WarmWorkerPool, _WorkerState, current_worker
+
+# Backends whose work can be split into decode / DSP / encode stages
+STAGED_BACKENDS = ('standard',)
+
+
+def _run_job(job, token, threads=None):
+    """Process one file inside a worker; returns (index, output_path, seconds, stage seconds)"""
+    index, input_path, output_path, backend, options = job
+    worker = current_worker()
+    if threads:
+        apply_thread_limits(threads)
+
+    def progress(value, message=""):
+        worker.progress_queue.put((token, index, value, message))
+
+    start = time.perf_counter()
+    with StageCollector() as stages:
+        result = run_backend(worker.processor(backend), backend, input_path, output_path, progress, options)
+    seconds = time.perf_counter() - start
+    # Backends without stage timers count as one stage named after them
+    return index, result, seconds, stages.totals or {backend: seconds}
+
+
+class BatchResult:
+    """Outcome of one file in a batch"""
+
+    def __init__(self, index, input_path, backend):
+        self.index = index
+        self.input_path = input_path
+        self.backend = backend
+        self.output_path = None
+        self.seconds = None
+        # True when the existing output was still valid and nothing ran
+        self.skipped = False
+        # BatchFailure when the file could not be processed
+        self.failure = None
+
+    @property
+    def ok(self):
+        return self.failure is None
+
+    def __repr__(self):
+        if self.failure:
+            return f"BatchResult({os.path.basename(self.input_path)} failed: {self.failure.message})"
+        return f"BatchResult({os.path.basename(self.input_path)} -> {self.output_path})"
+
+
+class _StageError(Exception):
+    """A stage failure tagged with the stage it happened in"""
+
+    def __init__(self, stage, error):
+        super().__init__(str(error))
+        self.stage = stage
+        self.error = error
+
+
+class BatchExecutor:
+    """Process many files concurrently in worker processes"""
+
+    def __init__(self, config=None, max_workers=None, planner=None, pool=None, monitor=None):
+        """
+        Args:
+            config (dict): App configuration (sent to every worker)
+            max_workers (int): Worker processes (default: the pool's size,
+                batch_workers or core count)
+            planner (ProcessorPlanner): Chooses a backend per file; without
+                one every file goes to default_backend
+            pool (WarmWorkerPool): Long-lived pool to run on; without one a
+                pool is started for each batch and shut down afterwards
+            monitor (PerfMonitor): Receives completions, stage times, queue
+                depth and active workers
+        """
+        self.config = config or {}
+        self.pool = pool
+        self.max_workers = int(max_workers or (pool.max_workers if pool else 0)
+                               or self.config.get('batch_workers') or os.cpu_count() or 1)
+        self.planner = planner
+        self.monitor = monitor
+        self.default_backend = self.config.get('default_backend', 'lightning')
+        # Extra attempts for transient failures (resource exhaustion, worker crashes)
+        self.retries = int(self.config.get('batch_retries', 2))
+
+    def plan(self, files, options):
+        """Choose a backend and translated options for every file"""
+        plans = []
+        for file_path in files:
+            if self.planner:
+                plans.append(self.planner.plan(file_path, options))
+            else:
+                backend = self.default_backend
+                plans.append(JobPlan(backend, {backend: 0.0}, translate_options(backend, options),
+                                     0.0, requested_features(options)))
+        return plans
+
+    def run(self, files, options, progress_callback=None, file_callback=None, output_paths=None,
+            schedule=None, manifest=None, force=False, store=None, start_callback=None):
+        """
+        Process files and return their results in input order
+
+        Args:
+            files (list): Input paths
+            options (dict): App-level processing options
+            progress_callback (callable): progress_callback(overall, message)
+                with overall in 0..1 across the whole batch
+            file_callback (callable): Called with each BatchResult as soon
+                as that file is done (completion order; the returned list
+                keeps input order)
+            output_paths (list): Optional explicit output path per file
+            schedule (BatchSchedule): Plans and submission order from
+                BatchScheduler (default: plan here, run in input order)
+            manifest (BatchManifest): Skip files whose recorded output is
+                still valid and record every new output
+            force (bool): Process every file even if its output is current
+            store (ContentStore): Reuse stored results for inputs with the
+                same content and options, run duplicates in the batch once
+                and store every new output
+            start_callback (callable): Called with a file's index when it
+                reports its first progress (the file has started running)
+
+        Returns:
+            list: BatchResult per file, in input order; failed files carry a
+                BatchFailure in result.failure instead of raising
+        """
+        files = list(files)
+        if not files:
+            return []
+        if schedule is not None:
+            plans, order = schedule.plans, schedule.order
+        else:
+            plans, order = self.plan(files, options), list(range(len(files)))
+        results = [BatchResult(i, path, plan.backend) for i, (path, plan) in enumerate(zip(files, plans))]
+        up_to_date = {}
+        if manifest is not None and not force:
+            up_to_date = manifest.find_current(files, options, output_paths)
+        store_keys, reused, followers = {}, {}, {}
+        if store is not None:
+            pending = [i for i in order if i not in up_to_date]
+            store_keys, reused, followers = self._match_store(store, manifest, files, options, pending)
+        waiting = {i for indices in followers.values() for i in indices}
+        jobs = [
+            (i, files[i], output_paths[i] if output_paths else None, plans[i].backend, plans[i].options)
+            for i in order if i not in up_to_date and i not in reused and i not in waiting
+        ]
+
+        # Weight overall progress by predicted time (or duration) when known
+        weights = None
+        if schedule is not None:
+            weights = schedule.predicted_seconds or schedule.durations
+        # Per-step updates from many files are coalesced to a steady rate
+        progress_callback = rate_limited(progress_callback, config=self.config)
+        tracker = _ProgressTracker(files, progress_callback, weights, start_callback)
+        emitter = _CompletionEmitter(results, file_callback)
+
+        def record(index, output_path):
+            if manifest is not None:
+                try:
+                    manifest.record(files[index], output_path, options)
+                    manifest.save(min_interval=1.0)
+                except Exception as e:
+                    print(f"Warning: could not update batch manifest: {e}")
+
+        def skip(index, output_path, message):
+            results[index].output_path = output_path
+            results[index].seconds = 0.0
+            results[index].skipped = True
+            tracker.update(index, 1.0, message)
+            emitter.complete(index)
+
+        def reuse(index, stored_path):
+            target = output_paths[index] if output_paths and output_paths[index] else \
+                default_output_path(self.config, files[index])
+            store.link(stored_path, target)
+            record(index, target)
+            skip(index, target, "identical result reused")
+
+        def fail(index, stage, error, attempts):
+            failure = BatchFailure(files[index], plans[index].backend, stage, error, attempts)
+            results[index].failure = failure
+            if self.monitor:
+                self.monitor.file_finished(None, ok=False)
+            tracker.update(index, 1.0, f"failed: {failure.message}")
+            emitter.complete(index)
+            # Duplicates waiting for this job would fail the same way
+            for follower in followers.get(index, []):
+                results[follower].failure = BatchFailure(
+                    files[follower], plans[follower].backend, stage, error, 0)
+                tracker.update(follower, 1.0, f"failed: {failure.message}")
+                emitter.complete(follower)
+
+        def finish(index, output_path, seconds, stages=None):
+            if self.monitor:
+                self.monitor.file_finished(seconds, plans[index].duration, stages=stages)
+            stored_path = None
+            if index in store_keys:
+                try:
+                    stored_path = store.adopt(store_keys[index], output_path)
+                except Exception as e:
+                    print(f"Warning: could not add {output_path} to the content store: {e}")
+            results[index].output_path = output_path
+            results[index].seconds = seconds
+            tracker.update(index, 1.0, "done")
+            if self.planner:
+                self.planner.record_plan(plans[index], files[index], seconds)
+            record(index, output_path)
+            emitter.complete(index)
+            # Duplicates of this job get its result without any processing
+            for follower in followers.get(index, []):
+                reuse(follower, stored_path or output_path)
+
+        for index, output_path in up_to_date.items():
+            skip(index, output_path, "up to date")
+        for index, stored_path in reused.items():
+            reuse(index, stored_path)
+
+        try:
+            workers = min(self.max_workers, len(jobs))
+            if self.monitor and jobs:
+                self.monitor.batch_started(len(jobs), max(1, workers))
+            if jobs and workers <= 1:
+                self._run_inline(jobs, tracker, finish, fail)
+            elif jobs:
+                audio_seconds = [plan.duration for plan in plans]
+                self._run_pool(jobs, workers, tracker, finish, fail, audio_seconds)
+        finally:
+            flush_progress(progress_callback)
+            if self.monitor and jobs:
+                self.monitor.batch_finished()
+            # Keep what finished even if the batch failed part-way
+            if manifest is not None:
+                try:
+                    manifest.save()
+                except Exception as e:
+                    print(f"Warning: could not save batch manifest: {e}")
+            # Keep the store within its configured size
+            if store is not None:
+                try:
+                    store.prune(store.max_bytes)
+                except Exception as e:
+                    print(f"Warning: could not prune content store: {e}")
+        return results
+
+    def _match_store(self, store, manifest, files, options, indices):
+        """
+        Look up every job in the content store
+
+        Returns:
+            tuple: (store key per index, index -> stored path for results
+                already in the store, leader index -> indices of later
+                jobs in this batch with the same key)
+        """
+        hash_of = manifest.input_hash if manifest is not None else hash_file
+        with ThreadPoolExecutor(max_workers=max(1, int(self.config.get('hash_workers', 4)))) as executor:
+            digests = list(executor.map(lambda i: hash_of(files[i]), indices))
+
+        keys, reused, followers, leaders = {}, {}, {}, {}
+        for index, digest in zip(indices, digests):
+            key = store.key(digest, options)
+            stored_path = store.lookup(key)
+            if stored_path:
+                reused[index] = stored_path
+            elif key in leaders:
+                followers.setdefault(leaders[key], []).append(index)
+            else:
+                leaders[key] = index
+                keys[index] = key
+        return keys, reused, followers
+
+    def _retry_allowed(self, error, attempt):
+        return attempt <= self.retries and is_transient(error)
+
+    def _run_inline(self, jobs, tracker, finish, fail):
+        """
+        Run jobs in this process (single worker or single file)
+
+        librosa-backed jobs are split into decode, DSP and encode stages
+        that overlap across files; other backends run whole in the first
+        stage. Failed files drop out of the pipeline without stopping it;
+        transient failures get another pass after a backoff.
+        """
+        state = _WorkerState(self.config, None)
+        starts = {}
+        backends = {job[0]: job[3] for job in jobs}
+        # Stage seconds per file index, gathered from the stage threads
+        stage_times = {}
+        stage_lock = threading.Lock()
+
+        def processor_for(backend):
+            # Reuse the caller's processors when the planner has them
+            processor = self.planner.backends.get(backend) if self.planner else None
+            return processor or state.processor(backend)
+
+        def decode(job):
+            index, input_path, output_path, backend, options = job
+            starts[index] = time.perf_counter()
+            if self.monitor:
+                self.monitor.set_active(1, max(0, len(backends) - len(starts)))
+
+            def progress(value, message=""):
+                tracker.update(index, value, message)
+
+            processor = processor_for(backend)
+            if backend in STAGED_BACKENDS:
+                return index, processor, processor.enhanced_decode(input_path, output_path, progress, **options)
+            return index, None, run_backend(processor, backend, input_path, output_path, progress, options)
+
+        def dsp(item):
+            index, processor, value = item
+            if processor is not None:
+                value = processor.enhanced_dsp(value)
+            return index, processor, value
+
+        def encode(item):
+            index, processor, value = item
+            if processor is not None:
+                value = processor.enhanced_encode(value)
+            return index, value
+
+        def tagged(name, func):
+            def run_stage(item):
+                start = time.perf_counter()
+                with StageCollector() as collector:
+                    try:
+                        value = func(item)
+                    except Exception as e:
+                        raise _StageError(name, e)
+                index = item[0]
+                if not collector.totals:
+                    # Untimed backends run whole in the first stage
+                    label = name if backends[index] in STAGED_BACKENDS else backends[index]
+                    collector.add(label, time.perf_counter() - start)
+                with stage_lock:
+                    totals = stage_times.setdefault(index, {})
+                    for stage, seconds in collector.totals.items():
+                        totals[stage] = totals.get(stage, 0.0) + seconds
+                return value
+            return run_stage
+
+        pipeline = StagePipeline(
+            [(name, tagged(name, func)) for name, func in (('decode', decode), ('dsp', dsp), ('encode', encode))],
+            queue_size=self.config.get('pipeline_queue_size', 1),
+            stop_on_error=False
+        )
+
+        def on_result(position, value):
+            # position is the job's place in the pipeline, not the file index
+            if not isinstance(value, BaseException):
+                index, output_path = value
+                with stage_lock:
+                    stages = stage_times.pop(index, None)
+                finish(index, output_path, time.perf_counter() - starts[index], stages)
+
+        attempts = {}
+        while jobs:
+            outcomes = pipeline.run(jobs, on_result)
+            retry = []
+            for job, outcome in zip(jobs, outcomes):
+                if not isinstance(outcome, BaseException):
+                    continue
+                index = job[0]
+                attempts[index] = attempts.get(index, 0) + 1
+                error = outcome.error if isinstance(outcome, _StageError) else outcome
+                stage = outcome.stage if isinstance(outcome, _StageError) else 'decode'
+                if job[3] not in STAGED_BACKENDS:
+                    # The whole backend runs in the first stage; its last step says more
+                    stage = tracker.last_message(index) or 'processing'
+                if self._retry_allowed(error, attempts[index]):
+                    tracker.update(index, 0.0, f"retrying after {type(error).__name__}", step=False)
+                    retry.append(job)
+                else:
+                    fail(index, stage, error, attempts[index])
+            if retry:
+                time.sleep(retry_delay(max(attempts[job[0]] for job in retry), config=self.config))
+            jobs = retry
+
+    def _run_pool(self, jobs, workers, tracker, finish, fail, audio_seconds=None):
+        """
+        Run jobs on worker processes
+
+        With adaptive_concurrency (the default) a ConcurrencyController
+        decides how many jobs are in flight and how many threads each may
+        use; otherwise every worker runs a job with default threading.
+
+        A failing file is reported and the rest keep flowing. Transient
+        failures are resubmitted after an exponential backoff; a crashed
+        worker breaks the whole process pool, so the pool is restarted and
+        the jobs that were in flight are retried.
+        """
+        pool = self.pool
+        owns_pool = pool is None
+        if owns_pool:
+            pool = WarmWorkerPool(self.config, max_workers=workers, warm=False)
+        controller = None
+        if self.config.get('adaptive_concurrency', True):
+            controller = ConcurrencyController(self.config, max_jobs=workers)
+        token = pool.register(tracker.update)
+        queued = list(jobs)
+        running = {}
+        delayed = []  # heap of (ready_at, sequence, job)
+        sequence = itertools.count()
+        attempts = {}
+
+        def submit_more():
+            while delayed and delayed[0][0] <= time.monotonic():
+                queued.insert(0, heapq.heappop(delayed)[2])
+            limit = controller.jobs if controller else workers
+            threads = controller.threads_per_job() if controller else None
+            while queued and len(running) < limit:
+                job = queued.pop(0)
+                running[pool.submit(_run_job, job, token, threads)] = job
+            if self.monitor:
+                self.monitor.set_active(len(running), len(queued) + len(delayed))
+
+        def handle_failure(job, error):
+            index = job[0]
+            attempts[index] = attempts.get(index, 0) + 1
+            if self._retry_allowed(error, attempts[index]):
+                tracker.update(index, 0.0, f"retrying after {type(error).__name__}", step=False)
+                ready_at = time.monotonic() + retry_delay(attempts[index], config=self.config)
+                heapq.heappush(delayed, (ready_at, next(sequence), job))
+            else:
+                stage = 'worker' if isinstance(error, BrokenProcessPool) else tracker.last_message(index)
+                fail(index, stage or 'processing', error, attempts[index])
+
+        try:
+            submit_more()
+            while running or queued or delayed:
+                if not running:
+                    # Everything left is waiting out a retry backoff
+                    if delayed:
+                        time.sleep(max(0.0, delayed[0][0] - time.monotonic()))
+                    submit_more()
+                    continue
+                timeout = max(0.0, delayed[0][0] - time.monotonic()) if delayed else None
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job = running.pop(future)
+                    try:
+                        index, output_path, seconds, stages = future.result()
+                    except BrokenProcessPool as e:
+                        broken = True
+                        handle_failure(job, e)
+                    except Exception as e:
+                        handle_failure(job, e)
+                    else:
+                        finish(index, output_path, seconds, stages)
+                        if controller:
+                            controller.record(audio_seconds[index] if audio_seconds else None, seconds)
+                if broken:
+                    # Every other in-flight job died with the pool
+                    for future, job in list(running.items()):
+                        handle_failure(job, BrokenProcessPool("A worker process terminated abruptly"))
+                    running.clear()
+                    pool.restart()
+                submit_more()
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+        finally:
+            pool.unregister(token)
+            if owns_pool:
+                pool.shutdown(wait=True)
+
+
+class _ProgressTracker:
+    """Merges per-file progress into one overall value"""
+
+    def __init__(self, files, callback, weights=None, start_callback=None):
+        self.files = files
+        self.callback = callback
+        self.start_callback = start_callback
+        self.started = [False] * len(files)
+        self.progress = [0.0] * len(files)
+        if not weights or sum(weights) <= 0:
+            weights = [1.0] * len(files)
+        total = float(sum(weights))
+        self.weights = [w / total for w in weights]
+        self.messages = [""] * len(files)
+        self.overall = 0.0
+        self._lock = threading.Lock()
+
+    def last_message(self, index):
+        """Most recent progress message of a file (the step it was in)"""
+        return self.messages[index]
+
+    def update(self, index, value, message="", step=True):
+        if message and step:
+            self.messages[index] = message
+        if self.start_callback is not None and not self.started[index]:
+            self.started[index] = True
+            self.start_callback(index)
+        if self.callback is None:
+            return
+        with self._lock:
+            # Progress for a file never goes backwards
+            previous = self.progress[index]
+            self.progress[index] = max(previous, min(1.0, float(value)))
+            self.overall += (self.progress[index] - previous) * self.weights[index]
+            overall = self.overall
+        name = os.path.basename(self.files[index])
+        self.callback(overall, f"{name} ({index + 1}/{len(self.files)}): {message}")
+
+
+class _CompletionEmitter:
+    """
+    Releases each finished result once, as soon as it is done
+
+    Short files are not held back behind a longer one submitted earlier,
+    so their status, log line and queue completion are immediate.
+    """
+
+    def __init__(self, results, callback):
+        self.results = results
+        self.callback = callback
+        self.done = [False] * len(results)
+        self._lock = threading.Lock()
+
+    def complete(self, index):
+        with self._lock:
+            if self.done[index]:
+                return
+            self.done[index] = True
+            if self.callback:
+                self.callback(self.results[index])
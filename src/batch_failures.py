@@ -0,0 +1,117 @@
+"""
+Batch failure handling for SunoReady
+Classifies per-file errors as transient or permanent, keeps the useful end
+of FFmpeg's stderr and writes a report of everything that failed
+"""
+
+import errno
+import json
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from scratch_space import ScratchQuotaError
+
+# OS errors worth another attempt: resource exhaustion and interruptions
+TRANSIENT_ERRNOS = {
+    errno.EAGAIN, errno.EBUSY, errno.EINTR, errno.EMFILE, errno.ENFILE,
+    errno.ENOMEM, errno.ETIMEDOUT, errno.ENOSPC,
+}
+
+# FFmpeg / OS messages that point at the machine rather than the input
+TRANSIENT_MESSAGES = (
+    'resource temporarily unavailable', 'cannot allocate memory', 'too many open files',
+    'no space left on device', 'device or resource busy', 'timed out', 'broken pipe',
+)
+
+STDERR_TAIL_LINES = 12
+
+
+def is_transient(error):
+    """
+    True if retrying the same file could succeed
+
+    Errors wrapped with 'raise ... from' are judged by their causes too,
+    so a processor's "failed: ..." wrapper keeps e.g. a quota error retryable.
+    """
+    while error is not None:
+        if _is_transient(error):
+            return True
+        error = error.__cause__
+    return False
+
+
+def _is_transient(error):
+    if isinstance(error, (BrokenProcessPool, ScratchQuotaError, TimeoutError, MemoryError)):
+        return True
+    if isinstance(error, OSError) and error.errno in TRANSIENT_ERRNOS:
+        return True
+    message = str(error).lower()
+    return any(text in message for text in TRANSIENT_MESSAGES)
+
+
+def stderr_tail(error, lines=STDERR_TAIL_LINES):
+    """
+    Last lines of the tool output behind an error
+
+    Uses the error's stderr attribute when present (CalledProcessError),
+    otherwise the message, where the processors embed FFmpeg's stderr.
+    """
+    text = getattr(error, 'stderr', None) or str(error)
+    if isinstance(text, bytes):
+        text = text.decode('utf-8', errors='replace')
+    kept = [line.rstrip() for line in text.replace('\r', '\n').splitlines() if line.strip()]
+    return '\n'.join(kept[-lines:])
+
+
+class BatchFailure:
+    """What went wrong with one file"""
+
+    def __init__(self, input_path, backend, stage, error, attempts):
+        self.input_path = input_path
+        self.backend = backend
+        self.stage = stage
+        self.error_type = type(error).__name__
+        self.stderr_tail = stderr_tail(error)
+        # FFmpeg puts its banner first and the actual error last
+        lines = self.stderr_tail.splitlines()
+        self.message = lines[-1].strip() if lines else self.error_type
+        self.transient = is_transient(error)
+        self.attempts = attempts
+
+    def to_dict(self):
+        return {
+            'file': self.input_path,
+            'backend': self.backend,
+            'stage': self.stage,
+            'error': self.error_type,
+            'message': self.message,
+            'stderr_tail': self.stderr_tail,
+            'transient': self.transient,
+            'attempts': self.attempts,
+        }
+
+    def __repr__(self):
+        return f"BatchFailure({os.path.basename(self.input_path)} at {self.stage}: {self.message})"
+
+
+def retry_delay(attempt, base=None, config=None):
+    """Exponential backoff before retry number attempt (1-based)"""
+    base = base if base is not None else float((config or {}).get('retry_backoff', 1.0))
+    return base * (2 ** (attempt - 1))
+
+
+def write_failure_report(failures, output_folder):
+    """
+    Write failures as JSON into output_folder
+
+    Returns:
+        str: Report path, or None when nothing failed
+    """
+    if not failures:
+        return None
+    os.makedirs(output_folder, exist_ok=True)
+    path = os.path.join(output_folder, f"failed_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([failure.to_dict() for failure in failures], f, indent=2, ensure_ascii=False)
+    return path
@@ -0,0 +1,224 @@
+"""
+Batch manifest for SunoReady
+Records what produced every processed output so reruns can skip files whose
+output is still valid
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+MANIFEST_NAME = ".sunoready_manifest.json"
+MANIFEST_VERSION = 1
+
+# Modules whose code determines the processed audio
+PROCESSING_MODULES = (
+    'audio_utils.py', 'lightning_processor.py', 'fast_processor.py',
+    'mp3_utils.py', 'parallel_encoder.py', 'processor_planner.py',
+)
+
+_HASH_CHUNK = 1024 * 1024
+_code_version = None
+
+
+def code_version():
+    """
+    Version string of the processing code
+
+    Combines the app version with a hash of the processing modules, so a
+    code change invalidates earlier outputs even without a version bump.
+    """
+    global _code_version
+    if _code_version is None:
+        try:
+            from version import __version__
+        except ImportError:
+            __version__ = "unknown"
+        digest = hashlib.blake2b(digest_size=8)
+        src_dir = Path(__file__).parent
+        for name in PROCESSING_MODULES:
+            try:
+                digest.update((src_dir / name).read_bytes())
+            except OSError:
+                digest.update(name.encode())
+        _code_version = f"{__version__}+{digest.hexdigest()}"
+    return _code_version
+
+
+def normalize_options(options):
+    """Options in a canonical form: no None values, floats rounded, keys sorted"""
+    normalized = {}
+    for key in sorted(options or {}):
+        value = options[key]
+        if value is None:
+            continue
+        if isinstance(value, float):
+            value = round(value, 6)
+            if value == int(value):
+                value = int(value)
+        normalized[key] = value
+    return normalized
+
+
+def options_hash(options):
+    """Stable hash of the processing options"""
+    payload = json.dumps(normalize_options(options), sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def hash_file(path):
+    """Content hash of a file"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_output_path(config, input_path):
+    """Output path the processors use when none is given"""
+    output_folder = (config or {}).get('processed_output_folder', 'output/processed')
+    return f"{output_folder}/{Path(input_path).stem}_processed.mp3"
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class BatchManifest:
+    """Output records stored next to the processed files"""
+
+    def __init__(self, config=None, path=None, version=None):
+        """
+        Args:
+            config (dict): App configuration (processed_output_folder, hash_workers)
+            path (str): Manifest file (default: inside processed_output_folder)
+            version (str): Code version to record (default: code_version())
+        """
+        self.config = config or {}
+        self.output_folder = self.config.get('processed_output_folder', 'output/processed')
+        self.path = path or os.path.join(self.output_folder, MANIFEST_NAME)
+        self.version = version or code_version()
+        self.hash_workers = int(self.config.get('hash_workers', 4))
+        self.outputs = {}
+        # Input hashes cached by path, size and mtime
+        self.inputs = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.outputs = data.get('outputs', {})
+                self.inputs = data.get('inputs', {})
+        except (OSError, ValueError):
+            pass
+
+    def save(self, min_interval=0.0):
+        """
+        Write the manifest atomically
+
+        Args:
+            min_interval (float): Skip the write if the last one was more
+                recent than this (used for saves after every file)
+        """
+        with self._lock:
+            if not self._dirty or time.monotonic() - self._last_save < min_interval:
+                return
+            data = {'version': MANIFEST_VERSION, 'outputs': self.outputs, 'inputs': self.inputs}
+            self._dirty = False
+            self._last_save = time.monotonic()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".manifest_", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            os.replace(temp_path, self.path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except:
+                pass
+            raise
+
+    def _key(self, path):
+        return os.path.abspath(path)
+
+    def default_output_path(self, input_path):
+        """Output path the processors use when none is given"""
+        return default_output_path(self.config, input_path)
+
+    def input_hash(self, input_path):
+        """Content hash of an input, reusing the cached value while size and mtime match"""
+        key = self._key(input_path)
+        stat = _stat_key(input_path)
+        with self._lock:
+            cached = self.inputs.get(key)
+        if cached and cached['stat'] == stat:
+            return cached['hash']
+        digest = hash_file(input_path)
+        with self._lock:
+            self.inputs[key] = {'stat': stat, 'hash': digest}
+            self._dirty = True
+        return digest
+
+    def is_current(self, input_path, output_path, options, input_digest=None):
+        """True if output_path exists and was made from this input, options and code"""
+        entry = self.outputs.get(self._key(output_path))
+        if not entry:
+            return False
+        try:
+            if _stat_key(output_path) != entry['stat']:
+                return False
+            input_digest = input_digest or self.input_hash(input_path)
+        except OSError:
+            return False
+        return (entry['input_hash'] == input_digest
+                and entry['options_hash'] == options_hash(options)
+                and entry['code_version'] == self.version)
+
+    def record(self, input_path, output_path, options):
+        """Remember that output_path is the result of input_path with options"""
+        entry = {
+            'input': self._key(input_path),
+            'input_hash': self.input_hash(input_path),
+            'options_hash': options_hash(options),
+            'code_version': self.version,
+            'stat': _stat_key(output_path),
+        }
+        with self._lock:
+            self.outputs[self._key(output_path)] = entry
+            self._dirty = True
+
+    def find_current(self, files, options, output_paths=None):
+        """
+        Work out which files already have a valid output
+
+        Inputs are hashed on a few threads; unchanged inputs are not read
+        at all thanks to the size/mtime cache.
+
+        Returns:
+            dict: index -> existing output path for every file to skip
+        """
+        outputs = [output_paths[i] if output_paths and output_paths[i] else self.default_output_path(path)
+                   for i, path in enumerate(files)]
+        # Only inputs whose output has a record need hashing
+        candidates = [i for i, output in enumerate(outputs) if self._key(output) in self.outputs]
+
+        def check(index):
+            return index, self.is_current(files[index], outputs[index], options)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.hash_workers)) as executor:
+            checked = list(executor.map(check, candidates))
+        return {index: outputs[index] for index, current in checked if current}
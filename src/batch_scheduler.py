@@ -0,0 +1,151 @@
+"""
+Batch ordering for SunoReady
+Probes every input's duration up front, orders the batch by policy
+(shortest-first, longest-first or as given) and predicts the total batch time
+"""
+
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+from processor_planner import JobPlan, probe_duration, requested_features, translate_options
+
+POLICIES = ('sjf', 'ljf', 'fifo', 'auto')
+
+
+class BatchSchedule:
+    """Planned order and timing of a batch"""
+
+    def __init__(self, files, plans, durations, order, policy, workers):
+        self.files = files
+        self.plans = plans
+        self.durations = durations
+        self.order = order
+        self.policy = policy
+        self.workers = workers
+
+    @property
+    def predicted_seconds(self):
+        """Predicted wall time per file, or None without a cost model"""
+        if any(plan.estimates.get(plan.backend) is None for plan in self.plans):
+            return None
+        return [plan.predicted_seconds for plan in self.plans]
+
+    def eta(self, workers=None):
+        """
+        Predicted time until the whole batch is done
+
+        Simulates handing files out in schedule order to whichever worker
+        frees up first.
+
+        Returns:
+            float: Seconds, or None without a cost model
+        """
+        costs = self.predicted_seconds
+        if costs is None:
+            return None
+        workers = max(1, min(workers or self.workers, len(self.order) or 1))
+        free_at = [0.0] * workers
+        for index in self.order:
+            start = heapq.heappop(free_at)
+            heapq.heappush(free_at, start + costs[index])
+        return max(free_at)
+
+    def first_result_eta(self):
+        """Predicted time until the first file finishes"""
+        costs = self.predicted_seconds
+        if costs is None or not self.order:
+            return None
+        return min(costs[i] for i in self.order[:self.workers])
+
+
+class BatchScheduler:
+    """Order batches to cut time-to-first-result or total makespan"""
+
+    def __init__(self, config=None, planner=None):
+        """
+        Args:
+            config (dict): App configuration (batch_policy, probe_workers)
+            planner (ProcessorPlanner): Supplies per-file time predictions
+        """
+        self.config = config or {}
+        self.planner = planner
+        self.policy = self.config.get('batch_policy', 'auto')
+        self.probe_workers = int(self.config.get('probe_workers', 8))
+
+    def probe(self, files, known=None):
+        """
+        Read all durations concurrently (header reads only)
+
+        Args:
+            files (list): Input paths
+            known (dict): Durations already probed, by path; only the
+                other files are read
+        """
+        known = known or {}
+        durations = [known.get(path) for path in files]
+        missing = [i for i, duration in enumerate(durations) if duration is None]
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.probe_workers, len(missing)))) as executor:
+                for i, duration in zip(missing, executor.map(probe_duration, [files[i] for i in missing])):
+                    durations[i] = duration
+        return durations
+
+    def schedule(self, files, options, workers=1, policy=None, default_backend='lightning',
+                 known_durations=None):
+        """
+        Plan every file and choose the order to run them in
+
+        Args:
+            files (list): Input paths in the order the user gave them
+            options (dict): App-level processing options
+            workers (int): Number of parallel workers the batch will use
+            policy (str): 'sjf' (shortest first: best mean time to result),
+                'ljf' (longest first: best makespan on a pool), 'fifo' (as
+                given) or 'auto' (ljf on a pool, sjf otherwise)
+            default_backend (str): Backend used when there is no planner
+            known_durations (dict): Durations already probed, by path
+
+        Returns:
+            BatchSchedule: Plans, durations and the order to submit files in
+        """
+        files = list(files)
+        policy = (policy or self.policy).lower()
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown batch policy '{policy}' (expected one of {', '.join(POLICIES)})")
+        if policy == 'auto':
+            policy = 'ljf' if workers > 1 and len(files) > workers else 'sjf'
+
+        durations = self.probe(files, known_durations) if files else []
+        plans = []
+        for file_path, duration in zip(files, durations):
+            if self.planner:
+                plans.append(self.planner.plan(file_path, options, duration=duration))
+            else:
+                plans.append(JobPlan(default_backend, {default_backend: None},
+                                     translate_options(default_backend, options),
+                                     duration, requested_features(options)))
+
+        # Sort by predicted time when there is a cost model, else by duration
+        if plans and self.planner:
+            keys = [plan.predicted_seconds for plan in plans]
+        else:
+            keys = durations
+        order = list(range(len(files)))
+        if policy == 'sjf':
+            order.sort(key=lambda i: (keys[i], i))
+        elif policy == 'ljf':
+            order.sort(key=lambda i: (-keys[i], i))
+
+        return BatchSchedule(files, plans, durations, order, policy, workers)
+
+
+def format_eta(seconds):
+    """Format seconds as '1h 02m', '3m 05s' or '12s'"""
+    if seconds is None:
+        return "unknown"
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
@@ -0,0 +1,267 @@
+"""
+Adaptive concurrency for SunoReady batches
+Adjusts how many jobs run at once from CPU utilisation, load average and
+measured throughput, and gives each job a matching share of threads for
+FFmpeg, BLAS/OpenMP and numba so the machine is busy without being
+oversubscribed
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    import psutil
+    psutil_available = True
+except ImportError:
+    psutil = None
+    psutil_available = False
+
+try:
+    from threadpoolctl import threadpool_limits
+    threadpoolctl_available = True
+except ImportError:
+    threadpool_limits = None
+    threadpoolctl_available = False
+
+# Environment variables read by the BLAS/OpenMP/numba runtimes
+THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS', 'NUMBA_NUM_THREADS',
+)
+
+# Thread budget of this process's jobs, set by apply_thread_limits
+_thread_limit = None
+
+
+def thread_env(threads):
+    """Environment variables that cap native thread pools at threads"""
+    return {name: str(int(threads)) for name in THREAD_ENV_VARS}
+
+
+def apply_thread_limits(threads):
+    """
+    Cap the thread pools used by jobs in this process
+
+    Environment variables only take effect for libraries loaded afterwards,
+    so already-loaded BLAS/OpenMP runtimes are limited through threadpoolctl
+    and numba through set_num_threads. FFmpeg picks the value up through
+    ffmpeg_thread_args().
+
+    Args:
+        threads (int): Threads each job may use (None removes the cap)
+    """
+    global _thread_limit
+    if threads is None:
+        _thread_limit = None
+        return
+    threads = max(1, int(threads))
+    if threads == _thread_limit:
+        return
+    _thread_limit = threads
+
+    for name, value in thread_env(threads).items():
+        if name == 'NUMBA_NUM_THREADS' and 'numba' in sys.modules:
+            continue  # numba refuses changes to this after import
+        os.environ[name] = value
+
+    if threadpoolctl_available:
+        try:
+            threadpool_limits(limits=threads)
+        except Exception:
+            pass
+
+    numba = sys.modules.get('numba')
+    if numba is not None:
+        try:
+            numba.set_num_threads(min(threads, numba.config.NUMBA_NUM_THREADS))
+        except Exception:
+            pass
+
+
+def ffmpeg_thread_args():
+    """['-threads', N] for FFmpeg commands when a thread budget is set"""
+    if _thread_limit is None:
+        return []
+    return ['-threads', str(_thread_limit)]
+
+
+class CpuSampler:
+    """
+    CPU utilisation (0..1) since the previous call, and load per core
+
+    Load is the number of runnable tasks right now where the platform
+    reports it (Linux), so it describes the same moment as the other
+    measurements instead of the last minute; elsewhere it falls back to
+    the 1-minute load average.
+    """
+
+    def __init__(self, cpu_count):
+        self.cpu_count = cpu_count
+        self._last_stat = None
+        if psutil_available:
+            psutil.cpu_percent(interval=None)
+
+    def __call__(self):
+        return {'cpu': self._cpu(), 'load': self._load()}
+
+    def _cpu(self):
+        if psutil_available:
+            return psutil.cpu_percent(interval=None) / 100.0
+        try:
+            with open('/proc/stat') as f:
+                fields = [float(v) for v in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0.0)
+        total = sum(fields)
+        last, self._last_stat = self._last_stat, (idle, total)
+        if last is None or total <= last[1]:
+            return None
+        return 1.0 - (idle - last[0]) / (total - last[1])
+
+    def _load(self):
+        try:
+            with open('/proc/stat') as f:
+                for line in f:
+                    if line.startswith('procs_running'):
+                        # Not counting the thread reading this
+                        return max(0, int(line.split()[1]) - 1) / self.cpu_count
+        except (OSError, ValueError, IndexError):
+            pass
+        try:
+            return os.getloadavg()[0] / self.cpu_count
+        except (AttributeError, OSError):
+            return None
+
+
+class ConcurrencyController:
+    """
+    Additive-increase / multiplicative-decrease control of concurrent jobs
+
+    Throughput (audio seconds processed per wall second) and load are
+    averaged over the last few adjustment windows. The controller adds a
+    job while the CPU has headroom. After an increase it measures the new
+    level for a couple of windows and takes the job back if throughput fell
+    compared with the level before, then waits before probing again. It
+    halves the number of jobs when the smoothed load shows thrashing. A
+    throughput dip that no increase caused is left alone: it is usually
+    just a run of harder files.
+    """
+
+    def __init__(self, config=None, max_jobs=None, cpu_count=None, sampler=None, clock=time.monotonic):
+        """
+        Args:
+            config (dict): App configuration (target_cpu_utilisation,
+                max_load_per_core, concurrency_interval, initial_jobs,
+                concurrency_smoothing: windows averaged, concurrency_settle:
+                windows measured after an increase before judging it)
+            max_jobs (int): Upper bound on concurrent jobs (e.g. pool size)
+            cpu_count (int): Cores to share out (default: os.cpu_count())
+            sampler (callable): Returns {'cpu': 0..1 or None, 'load': per-core or None}
+            clock (callable): Monotonic time source
+        """
+        self.config = config or {}
+        self.cpu_count = int(cpu_count or os.cpu_count() or 1)
+        self.max_jobs = max(1, int(max_jobs or self.config.get('batch_workers') or self.cpu_count))
+        self.target_utilisation = float(self.config.get('target_cpu_utilisation', 0.9))
+        self.max_load = float(self.config.get('max_load_per_core', 1.5))
+        self.interval = float(self.config.get('concurrency_interval', 2.0))
+        self.decrease_factor = 0.5
+        # Throughput must stay within this fraction of the previous level to keep a new job
+        self.tolerance = 0.95
+        self.smoothing = max(1, int(self.config.get('concurrency_smoothing', 3)))
+        self.settle_windows = max(1, int(self.config.get('concurrency_settle', 2)))
+        initial = self.config.get('initial_jobs') or max(1, self.cpu_count // 2)
+        self.jobs = max(1, min(self.max_jobs, int(initial)))
+        self.sampler = sampler or CpuSampler(self.cpu_count)
+        self.clock = clock
+        self.history = deque(maxlen=64)
+        self._lock = threading.Lock()
+        # Throughput of each window at the current number of jobs
+        self._level_throughputs = []
+        self._loads = deque(maxlen=self.smoothing)
+        # (jobs, smoothed throughput) before the increase being measured
+        self._baseline = None
+        self._cooldown = 0
+        self._reset_window()
+
+    def _reset_window(self):
+        self._window_start = self.clock()
+        self._window_audio = 0.0
+        self._window_done = 0
+
+    def threads_per_job(self):
+        """Cores divided evenly between the running jobs"""
+        return max(1, self.cpu_count // self.jobs)
+
+    def record(self, audio_seconds, wall_seconds=None):
+        """
+        Report a finished job and adjust concurrency if a window has passed
+
+        Args:
+            audio_seconds (float): Duration of the audio the job processed
+                (None counts the job as one unit when durations are unknown)
+            wall_seconds (float): Time the job took (kept for history)
+
+        Returns:
+            int: Number of jobs to run concurrently from now on
+        """
+        with self._lock:
+            self._window_audio += float(audio_seconds) if audio_seconds else 1.0
+            self._window_done += 1
+            elapsed = self.clock() - self._window_start
+            # Wait for a full round of jobs so the throughput is comparable
+            if elapsed < self.interval or self._window_done < self.jobs:
+                return self.jobs
+            return self._adjust(self._window_audio / max(elapsed, 1e-9), wall_seconds)
+
+    def _adjust(self, throughput, wall_seconds):
+        sample = self.sampler() or {}
+        cpu, load = sample.get('cpu'), sample.get('load')
+        if load is not None:
+            self._loads.append(load)
+        smoothed_load = sum(self._loads) / len(self._loads) if self._loads else None
+        self._level_throughputs.append(throughput)
+        recent = self._level_throughputs[-self.smoothing:]
+        smoothed = sum(recent) / len(recent)
+        jobs = self.jobs
+
+        if smoothed_load is not None and smoothed_load > self.max_load and jobs > 1:
+            reason = 'load'
+            jobs = max(1, int(jobs * self.decrease_factor))
+            self._baseline = None
+            self._loads.clear()
+        elif self._baseline is not None and len(self._level_throughputs) < self.settle_windows:
+            reason = 'settle'
+        elif self._baseline is not None and smoothed < self._baseline[1] * self.tolerance:
+            # The last increase made things worse: take it back and stay there a while
+            reason = 'throughput'
+            jobs = self._baseline[0]
+            self._baseline = None
+            self._cooldown = self.smoothing
+        else:
+            # An increase that held up is kept
+            self._baseline = None
+            if self._cooldown > 0:
+                self._cooldown -= 1
+                reason = 'hold'
+            elif (cpu is None or cpu < self.target_utilisation) and jobs < self.max_jobs:
+                reason = 'headroom'
+                self._baseline = (jobs, smoothed)
+                jobs += 1
+            else:
+                reason = 'hold'
+
+        self.history.append({
+            'jobs': self.jobs, 'new_jobs': jobs, 'throughput': throughput,
+            'smoothed_throughput': smoothed, 'cpu': cpu, 'load': load,
+            'smoothed_load': smoothed_load, 'reason': reason, 'last_job_seconds': wall_seconds,
+        })
+        if jobs != self.jobs:
+            self._level_throughputs = []
+        self.jobs = jobs
+        self._reset_window()
+        return self.jobs
@@ -0,0 +1,189 @@
+"""
+Content-addressed output store for SunoReady
+Keeps one copy of every processed result, keyed by input content and
+options, and exposes it under the user-facing output names as hard links,
+reflinks or (as a last resort) copies
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from batch_manifest import code_version, options_hash
+
+# ioctl request for cloning a file on btrfs/XFS/bcachefs (linux/fs.h)
+FICLONE = 0x40049409
+
+
+def _reflink(source, destination):
+    """Copy-on-write clone of source; raises OSError where unsupported"""
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+class ContentStore:
+    """
+    Processed outputs stored once under a hash of what produced them
+
+    Output names are hard links into the store where possible, so editing
+    an output in place also changes the stored copy. Write edited versions
+    to a new file instead.
+    """
+
+    def __init__(self, config=None, root=None):
+        """
+        Args:
+            config (dict): App configuration (content_store_dir,
+                content_store_max_mb, processed_output_folder)
+            root (str): Store directory (default: content_store_dir, or
+                .sunoready_store next to the processed folder so hard
+                links stay on one filesystem)
+        """
+        self.config = config or {}
+        output_folder = os.path.abspath(self.config.get('processed_output_folder', 'output/processed'))
+        self.root = os.path.abspath(root or self.config.get('content_store_dir')
+                                    or os.path.join(os.path.dirname(output_folder), '.sunoready_store'))
+        os.makedirs(self.root, exist_ok=True)
+        self.version = code_version()
+        # Space the store may hold on its own (entries no output links to)
+        self.max_bytes = int(float(self.config.get('content_store_max_mb', 2048)) * 1024 * 1024)
+
+    def key(self, input_hash, options):
+        """Store key for an input processed with options by this code version"""
+        payload = f"{input_hash}:{options_hash(options)}:{self.version}"
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+    def path_for(self, key, extension='.mp3'):
+        return os.path.join(self.root, key[:2], key + extension)
+
+    def lookup(self, key, extension='.mp3'):
+        """Stored path for key, or None"""
+        path = self.path_for(key, extension)
+        return path if os.path.isfile(path) else None
+
+    def adopt(self, key, output_path):
+        """
+        Store a freshly produced output and turn it into a link to the store
+
+        If an identical result is already stored (another job finished
+        first), the output is replaced by a link to that one.
+
+        Returns:
+            str: Stored path
+        """
+        stored = self.path_for(key, os.path.splitext(output_path)[1] or '.mp3')
+        if os.path.isfile(stored):
+            self.link(stored, output_path)
+            return stored
+
+        os.makedirs(os.path.dirname(stored), exist_ok=True)
+        fd, staging_path = tempfile.mkstemp(prefix=".adopt_", dir=os.path.dirname(stored))
+        os.close(fd)
+        os.remove(staging_path)
+        try:
+            self._materialize(output_path, staging_path)
+            os.replace(staging_path, stored)
+        except Exception:
+            try:
+                os.remove(staging_path)
+            except:
+                pass
+            raise
+        return stored
+
+    def link(self, stored_path, output_path):
+        """
+        Publish a stored result under output_path
+
+        Tries a hard link, then a reflink, then a plain copy. The output
+        is replaced atomically, so readers never see a partial file.
+
+        Returns:
+            str: 'hardlink', 'reflink' or 'copy'
+        """
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        fd, staging_path = tempfile.mkstemp(prefix=".sunoready_", suffix=".part", dir=output_dir)
+        os.close(fd)
+        os.remove(staging_path)
+        try:
+            method = self._materialize(stored_path, staging_path)
+            os.replace(staging_path, output_path)
+        except Exception:
+            try:
+                os.remove(staging_path)
+            except:
+                pass
+            raise
+        return method
+
+    def _materialize(self, source, destination):
+        """Make destination the same content as source as cheaply as possible"""
+        try:
+            os.link(source, destination)
+            return 'hardlink'
+        except OSError:
+            pass
+        try:
+            _reflink(source, destination)
+            return 'reflink'
+        except OSError:
+            try:
+                os.remove(destination)
+            except:
+                pass
+        shutil.copyfile(source, destination)
+        shutil.copymode(source, destination)
+        return 'copy'
+
+    def prune(self, max_bytes=0):
+        """
+        Delete stored results that no output links to any more, oldest first,
+        until at most max_bytes of them remain
+
+        An entry with a single link is unreferenced and is the only space
+        the store holds on its own; linked entries share their blocks with
+        an output and are always kept. When outputs are reflinks or copies
+        every entry looks unreferenced, so max_bytes bounds the whole
+        store. Outputs themselves are never touched.
+
+        Args:
+            max_bytes (int): Unreferenced bytes to keep (0 removes them all;
+                use self.max_bytes for the configured limit)
+
+        Returns:
+            int: Number of entries removed
+        """
+        unreferenced = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if stat.st_nlink == 1:
+                    unreferenced.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in unreferenced)
+        removed = 0
+        for _, size, path in sorted(unreferenced):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -6,10 +6,14 @@ Creates a lightweight, FFmpeg-only processing pipeline
 
 import os
 import subprocess
-import tempfile
-import shutil
 from pathlib import Path
 
+import mp3_utils
+from concurrency_controller import ffmpeg_thread_args
+from pipeline_steps import Call, Command, run_steps, run_steps_async
+from progress_utils import flush_progress, rate_limited
+from scratch_space import get_scratch_space
+
 class FastAudioProcessor:
     """Fast audio processor using only FFmpeg (no librosa)"""
     
@@ -17,38 +21,75 @@ class FastAudioProcessor:
         self.config = config
         self.processed_output_folder = config.get("processed_output_folder", "output/processed")
         os.makedirs(self.processed_output_folder, exist_ok=True)
+        self.scratch = get_scratch_space(config)
     
     def process_audio_fast(self, input_path, output_path=None, progress_callback=None, **options):
         """
         Ultra-fast audio processing using only FFmpeg
         Avoids heavy librosa operations for better performance
         """
+        progress_callback = rate_limited(progress_callback, config=self.config)
         try:
-            def update_progress(step, total_steps, message=""):
-                if progress_callback:
-                    progress = step / total_steps
-                    progress_callback(progress, message)
-                    
-            if output_path is None:
-                input_name = Path(input_path).stem
-                output_path = f"{self.processed_output_folder}/{input_name}_processed.mp3"
-            
-            # Ensure output directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            update_progress(1, 6, "Initializing fast processing...")
-            
-            # Create processing chain using FFmpeg only
-            temp_files = []
+            return run_steps(self._fast_steps(input_path, output_path, progress_callback, options))
+        except Exception as e:
+            raise Exception(f"Fast processing failed: {str(e)}") from e
+        finally:
+            # Deliver the last step reported (it names the failing stage)
+            flush_progress(progress_callback)
+    
+    async def process_audio_fast_async(self, input_path, output_path=None, progress_callback=None,
+                                       runner=None, **options):
+        """
+        Coroutine version of process_audio_fast
+        
+        Runs the same steps, with every FFmpeg/ffprobe step as an asyncio child
+        process under the runner's concurrency limits, so many files can share
+        one event loop.
+        
+        Args:
+            runner (AsyncSubprocessRunner): Shared runner (defaults to the global one)
+        """
+        from async_runner import get_default_runner
+        runner = runner or get_default_runner()
+        progress_callback = rate_limited(progress_callback, config=self.config)
+        try:
+            return await run_steps_async(
+                self._fast_steps(input_path, output_path, progress_callback, options), runner)
+        except Exception as e:
+            raise Exception(f"Fast processing failed: {str(e)}") from e
+        finally:
+            flush_progress(progress_callback)
+    
+    def _fast_steps(self, input_path, output_path, progress_callback, options):
+        """Step sequence behind both fast entry points (see pipeline_steps)"""
+        def update_progress(step, total_steps, message=""):
+            if progress_callback:
+                progress = step / total_steps
+                progress_callback(progress, message)
+        
+        if output_path is None:
+            input_name = Path(input_path).stem
+            output_path = f"{self.processed_output_folder}/{input_name}_processed.mp3"
+        
+        # Ensure output directory exists
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        
+        update_progress(1, 6, "Initializing fast processing...")
+        
+        job = None
+        try:
+            # Create processing chain using FFmpeg only, intermediates in a private scratch dir
+            job = yield Call(self.scratch.open_job, Path(input_path).stem,
+                             self.scratch.estimate_bytes(input_path), tool='scratch')
             current_file = input_path
             
             # Step 1: Tempo stretch (FFmpeg atempo filter)
             tempo_stretch = options.get('tempo_stretch', 1.0)
             if tempo_stretch != 1.0:
                 update_progress(2, 6, f"Applying tempo stretch ({tempo_stretch}x)...")
-                temp_tempo = tempfile.mktemp(suffix='.mp3')
-                temp_files.append(temp_tempo)
-                self._ffmpeg_tempo_stretch(current_file, temp_tempo, tempo_stretch)
+                temp_tempo = job.new_path('.mp3', 'tempo')
+                yield Command(self._tempo_stretch_cmd(current_file, temp_tempo, tempo_stretch),
+                              "Tempo stretch failed", stage='ffmpeg')
                 current_file = temp_tempo
             else:
                 update_progress(2, 6, "Skipping tempo stretch...")
@@ -56,10 +97,10 @@ class FastAudioProcessor:
             # Step 2: Pitch shift (FFmpeg asetrate + atempo combination)
             pitch_shift = options.get('pitch_shift', self.config.get('pitch_semitones', 0))
             if pitch_shift != 0:
-                update_progress(3, 6, f"Applying pitch shift ({pitch_shift:+d} semitones)...")
-                temp_pitch = tempfile.mktemp(suffix='.mp3')
-                temp_files.append(temp_pitch)
-                self._ffmpeg_pitch_shift(current_file, temp_pitch, pitch_shift)
+                update_progress(3, 6, f"Applying pitch shift ({pitch_shift:+g} semitones)...")
+                temp_pitch = job.new_path('.mp3', 'pitch')
+                yield Command(self._pitch_shift_cmd(current_file, temp_pitch, pitch_shift),
+                              "Pitch shift failed", stage='ffmpeg')
                 current_file = temp_pitch
             else:
                 update_progress(3, 6, "Skipping pitch shift...")
@@ -69,83 +110,99 @@ class FastAudioProcessor:
             fade_out = options.get('fade_out', False)
             if fade_in or fade_out:
                 update_progress(4, 6, "Applying fade effects...")
-                temp_fade = tempfile.mktemp(suffix='.mp3')
-                temp_files.append(temp_fade)
-                self._ffmpeg_fade_effects(
+                temp_fade = job.new_path('.mp3', 'fade')
+                faded = yield from self._fade_steps(
                     current_file, temp_fade,
                     fade_in=fade_in,
                     fade_out=fade_out,
                     fade_in_duration=options.get('fade_in_duration', 3.0),
                     fade_out_duration=options.get('fade_out_duration', 3.0)
                 )
-                current_file = temp_fade
+                if faded:
+                    current_file = temp_fade
             else:
                 update_progress(4, 6, "Skipping fade effects...")
             
             # Step 4: Final trim + normalize + filters in one FFmpeg pass
             update_progress(5, 6, "Applying final effects...")
-            filters = []
-            
-            # Normalize volume
-            if options.get('normalize', False):
-                filters.append('dynaudnorm=f=75:g=25:p=0.95')
-            
-            # Highpass filter
-            if options.get('apply_highpass', False):
-                filters.append('highpass=f=80')
+            filters = self._final_filters(options)
             
             # Trim duration (final step)
             trim_duration = options.get('trim_duration')
             
-            # Build final FFmpeg command
-            cmd = ['ffmpeg', '-y', '-i', current_file]
-            
-            # Add time limit for trim
-            if trim_duration and trim_duration > 0:
-                cmd.extend(['-t', str(trim_duration)])
-            
-            # Add audio filters
-            if filters:
-                cmd.extend(['-af', ','.join(filters)])
-            
-            # High quality output
-            cmd.extend(['-c:a', 'libmp3lame', '-b:a', '320k'])
-            
-            # Remove metadata if requested
-            if options.get('clean_metadata', False):
-                cmd.extend(['-map_metadata', '-1'])
-            
-            cmd.append(output_path)
+            # Trim-only job: cut the input's MP3 frames instead of re-encoding
+            # (intermediates are VBR and always get the final 320k encode)
+            if not filters and current_file == input_path:
+                copied = yield Call(self._copy_mp3_bitstream, current_file, output_path, trim_duration,
+                                    options.get('clean_metadata', False), stage='copy')
+                if copied:
+                    update_progress(6, 6, "Fast processing complete!")
+                    return output_path
             
-            # Run final FFmpeg command
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise Exception(f"FFmpeg error: {result.stderr}")
-            
-            # Clean up temporary files
-            update_progress(6, 6, "Cleaning up...")
-            for temp_file in temp_files:
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except:
-                    pass
+            # Final FFmpeg command (encode in scratch, then publish atomically)
+            final_temp = job.new_path('.mp3', 'output')
+            yield Command(self._final_command(current_file, final_temp, filters, options),
+                          "FFmpeg error", stage='ffmpeg')
+            yield Call(job.commit, final_temp, output_path)
             
             update_progress(6, 6, "Fast processing complete!")
             return output_path
-            
-        except Exception as e:
-            # Clean up on error
-            for temp_file in temp_files:
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except:
-                    pass
-            raise Exception(f"Fast processing failed: {str(e)}")
+        finally:
+            # Remove the job's scratch directory with all intermediates
+            if job is not None:
+                job.close()
+    
+    def _copy_mp3_bitstream(self, input_path, output_path, trim_duration, clean_metadata):
+        """Trim/copy an MP3 on frame boundaries; returns False if not possible"""
+        if not mp3_utils.is_mp3(input_path):
+            return False
+        try:
+            mp3_utils.trim(input_path, output_path, trim_duration, keep_tags=not clean_metadata)
+            return True
+        except mp3_utils.MP3FormatError as e:
+            print(f"Warning: bitstream copy failed ({e}), re-encoding with FFmpeg")
+            return False
     
-    def _ffmpeg_tempo_stretch(self, input_path, output_path, speed):
-        """Apply tempo stretch using FFmpeg atempo filter"""
+    def _final_filters(self, options):
+        """Filters applied in the final FFmpeg pass"""
+        filters = []
+        
+        # Normalize volume
+        if options.get('normalize', False):
+            filters.append('dynaudnorm=f=75:g=25:p=0.95')
+        
+        # Highpass filter
+        if options.get('apply_highpass', False):
+            filters.append('highpass=f=80')
+        
+        return filters
+    
+    def _final_command(self, input_path, output_path, filters, options):
+        """Build the final trim + filters + encode command"""
+        cmd = ['ffmpeg', '-y', '-i', input_path]
+        
+        # Add time limit for trim
+        trim_duration = options.get('trim_duration')
+        if trim_duration and trim_duration > 0:
+            cmd.extend(['-t', str(trim_duration)])
+        
+        # Add audio filters
+        if filters:
+            cmd.extend(['-af', ','.join(filters)])
+        
+        # High quality output
+        cmd.extend(['-c:a', 'libmp3lame', '-b:a', '320k'])
+        cmd.extend(ffmpeg_thread_args())
+        
+        # Remove metadata if requested
+        if options.get('clean_metadata', False):
+            cmd.extend(['-map_metadata', '-1'])
+        
+        cmd.append(output_path)
+        return cmd
+    
+    def _tempo_stretch_cmd(self, input_path, output_path, speed):
+        """Build the FFmpeg atempo command for a tempo stretch"""
         cmd = ['ffmpeg', '-y', '-i', input_path]
         
         # Handle atempo limitations
@@ -171,42 +228,33 @@ class FastAudioProcessor:
             
             cmd.extend(['-af', ','.join(filters)])
         
-        cmd.extend(['-c:a', 'libmp3lame', '-q:a', '2', output_path])
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(f"Tempo stretch failed: {result.stderr}")
+        cmd.extend(['-c:a', 'libmp3lame', '-q:a', '2'])
+        cmd.extend(ffmpeg_thread_args())
+        cmd.append(output_path)
+        return cmd
     
-    def _ffmpeg_pitch_shift(self, input_path, output_path, semitones):
-        """Apply pitch shift using FFmpeg (asetrate + atempo combo)"""
+    def _pitch_shift_cmd(self, input_path, output_path, semitones):
+        """Build the FFmpeg asetrate + atempo pitch shift command"""
         # Calculate pitch shift ratio
         pitch_ratio = 2 ** (semitones / 12.0)
         
-        # Use asetrate to change pitch, then atempo to restore tempo
-        cmd = [
+        # Resample to a known rate first so asetrate's ratio holds for any
+        # input rate, then use atempo to restore tempo
+        return [
             'ffmpeg', '-y', '-i', input_path,
-            '-af', f'asetrate=44100*{pitch_ratio},atempo={1/pitch_ratio}',
+            '-af', f'aresample=44100,asetrate={44100 * pitch_ratio:.3f},aresample=44100,atempo={1/pitch_ratio}',
             '-c:a', 'libmp3lame', '-q:a', '2',
+            *ffmpeg_thread_args(),
             output_path
         ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(f"Pitch shift failed: {result.stderr}")
     
-    def _ffmpeg_fade_effects(self, input_path, output_path, fade_in=False, fade_out=False,
-                           fade_in_duration=3.0, fade_out_duration=3.0):
-        """Apply fade effects using FFmpeg"""
-        # Get duration if needed for fade out
-        total_duration = None
-        if fade_out:
-            probe_cmd = ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', 
-                        '-of', 'default=noprint_wrappers=1:nokey=1', input_path]
-            result = subprocess.run(probe_cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                total_duration = float(result.stdout.strip())
-        
-        # Build filter chain
+    def _probe_duration_cmd(self, input_path):
+        """Build the ffprobe command that prints the duration in seconds"""
+        return ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', 
+                '-of', 'default=noprint_wrappers=1:nokey=1', input_path]
+    
+    def _fade_filters(self, fade_in, fade_out, fade_in_duration, fade_out_duration, total_duration):
+        """Build the afade filter chain"""
         filters = []
         
         if fade_in and fade_in_duration > 0:
@@ -216,17 +264,35 @@ class FastAudioProcessor:
             fade_out_start = max(0, total_duration - fade_out_duration)
             filters.append(f'afade=t=out:st={fade_out_start}:d={fade_out_duration}')
         
-        if not filters:
-            # No fade effects, just copy
-            shutil.copy2(input_path, output_path)
-            return
+        return filters
+    
+    def _fade_cmd(self, input_path, output_path, filters):
+        """Build the FFmpeg fade command"""
+        return ['ffmpeg', '-y', '-i', input_path, '-af', ','.join(filters),
+                '-c:a', 'libmp3lame', '-q:a', '2', *ffmpeg_thread_args(), output_path]
+    
+    def _fade_steps(self, input_path, output_path, fade_in=False, fade_out=False,
+                    fade_in_duration=3.0, fade_out_duration=3.0):
+        """
+        Apply fade effects using FFmpeg
+        
+        Returns:
+            bool: False if there was nothing to fade and no file was written
+        """
+        # Get duration if needed for fade out
+        total_duration = None
+        if fade_out:
+            result = yield Command(self._probe_duration_cmd(input_path))
+            if result.returncode == 0:
+                total_duration = float(result.stdout.strip())
         
-        cmd = ['ffmpeg', '-y', '-i', input_path, '-af', ','.join(filters),
-               '-c:a', 'libmp3lame', '-q:a', '2', output_path]
+        # Build filter chain
+        filters = self._fade_filters(fade_in, fade_out, fade_in_duration, fade_out_duration, total_duration)
+        if not filters:
+            return False
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(f"Fade effects failed: {result.stderr}")
+        yield Command(self._fade_cmd(input_path, output_path, filters), "Fade effects failed", stage='ffmpeg')
+        return True
 
 def test_fast_processor():
     """Test the fast processor"""
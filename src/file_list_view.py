@@ -0,0 +1,321 @@
+"""
+Virtualised file list for SunoReady
+Holds the selected files with a per-file status and draws only the rows that
+are on screen, so selections of tens of thousands of files stay responsive
+"""
+
+import math
+import os
+import threading
+import tkinter as tk
+
+import customtkinter as ctk
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+STATUS_LABELS = {
+    None: "",
+    QUEUED: "⏳ queued",
+    RUNNING: "⚙️ running",
+    DONE: "✅ done",
+    SKIPPED: "⏭️ up to date",
+    FAILED: "❌ failed",
+}
+
+STATUS_COLORS = {
+    None: "#BDC3C7",
+    QUEUED: "#BDC3C7",
+    RUNNING: "#8be9fd",
+    DONE: "#50fa7b",
+    SKIPPED: "#95A5A6",
+    FAILED: "#ff5555",
+}
+
+
+def visible_range(first, rows, total):
+    """
+    Clamp a scroll position to the list
+
+    Returns:
+        tuple: (first, last) row indices shown, last exclusive
+    """
+    first = max(0, min(int(first), max(0, total - rows)))
+    return first, min(total, first + rows)
+
+
+class FileListModel:
+    """Selected files and their processing status"""
+
+    def __init__(self):
+        # Kept as one list object so callers can hold on to it
+        self.paths = []
+        self.statuses = {}
+        # Short per-file description (duration, format) once probed
+        self.details = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        # Bumped on every change; views redraw when it moves
+        self.version = 0
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _key(self, path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def extend(self, paths):
+        """
+        Add files, skipping ones already in the list
+
+        Returns:
+            list: Paths actually added
+        """
+        added = []
+        with self._lock:
+            for path in paths:
+                key = self._key(path)
+                if key in self._positions:
+                    continue
+                self._positions[key] = len(self.paths)
+                self.paths.append(path)
+                added.append(path)
+            if added:
+                self.version += 1
+        return added
+
+    def clear(self):
+        with self._lock:
+            del self.paths[:]
+            self.statuses.clear()
+            self.details.clear()
+            self._positions.clear()
+            self.version += 1
+
+    def index_of(self, path):
+        return self._positions.get(self._key(path))
+
+    def set_status(self, path, status):
+        """Set a file's status from any thread; returns False for unknown files"""
+        key = self._key(path)
+        with self._lock:
+            if key not in self._positions:
+                return False
+            self.statuses[key] = status
+            self.version += 1
+        return True
+
+    def set_details(self, path, text):
+        """
+        Set a file's description from any thread
+
+        Kept even if the file is not listed yet (a probe can finish before
+        its batch is added). Returns True if the file is listed.
+        """
+        key = self._key(path)
+        with self._lock:
+            self.details[key] = text
+            self.version += 1
+            return key in self._positions
+
+    def set_all(self, status):
+        with self._lock:
+            for key in self._positions:
+                self.statuses[key] = status
+            self.version += 1
+
+    def status_of(self, index):
+        return self.statuses.get(self._key(self.paths[index]))
+
+    def row(self, index):
+        """(label, status) for one row"""
+        path = self.paths[index]
+        key = self._key(path)
+        label = f"{index + 1}. {os.path.basename(path)}"
+        if key in self.details:
+            label += f"  ({self.details[key]})"
+        return label, self.statuses.get(key)
+
+    def counts(self):
+        """Number of files per status (None: no status yet)"""
+        counts = {}
+        with self._lock:
+            for key in self._positions:
+                status = self.statuses.get(key)
+                counts[status] = counts.get(status, 0) + 1
+        return counts
+
+
+class VirtualFileList(ctk.CTkFrame):
+    """
+    Scrollable list that only draws the visible rows
+
+    A fixed pool of canvas text items is reused as the list scrolls, so
+    drawing cost depends on the widget height, not on the number of files.
+    """
+
+    def __init__(self, master, model, row_height=20, visible_rows=4, font=None,
+                 canvas_color="#2C3E50", text_color="#ECF0F1", empty_text="No files selected",
+                 thumbnail=None, thumbnail_width=80, status_width=110, wave_color="#3498DB",
+                 select_color="#34495E", on_select=None, **kwargs):
+        """
+        Args:
+            model (FileListModel): Files to show
+            thumbnail (callable): thumbnail(path, pixels) -> (mins, maxs) arrays
+                in -1..1, or None when not available (yet)
+            thumbnail_width (int): Width of the waveform column in pixels
+            status_width (int): Width reserved for the status label
+            on_select (callable): Called with the row index a click selects
+        """
+        super().__init__(master, **kwargs)
+        self.model = model
+        self.thumbnail = thumbnail
+        self.thumbnail_width = thumbnail_width
+        self.status_width = status_width
+        self.wave_color = wave_color
+        self.on_select = on_select
+        # Index of the clicked row, or None
+        self.selected = None
+        self.row_height = row_height
+        self.font = font
+        self.text_color = text_color
+        self.empty_text = empty_text
+        self.first = 0
+        self._items = []
+        self._render_pending = False
+        self._rendered_version = None
+
+        self.canvas = tk.Canvas(self, height=row_height * visible_rows, bg=canvas_color,
+                                highlightthickness=0, borderwidth=0)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self._highlight = self.canvas.create_rectangle(0, 0, 0, 0, fill=select_color, outline="",
+                                                       state="hidden")
+
+        self.canvas.bind("<Configure>", lambda event: self.refresh(force=True))
+        self.canvas.bind("<Button-1>", self._on_click)
+        for widget in (self.canvas, self):
+            widget.bind("<MouseWheel>", self._on_wheel)
+            widget.bind("<Button-4>", self._on_wheel)
+            widget.bind("<Button-5>", self._on_wheel)
+
+    @property
+    def rows(self):
+        """Rows that fit in the canvas"""
+        height = max(self.canvas.winfo_height(), int(self.canvas.cget("height")))
+        return max(1, math.ceil(height / self.row_height))
+
+    def refresh(self, force=False):
+        """Redraw at the next idle moment (many calls cost one redraw)"""
+        if force:
+            self._rendered_version = None
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def scroll_to(self, index):
+        """Scroll so row index is visible"""
+        rows = self.rows
+        if index < self.first or index >= self.first + rows:
+            self.first = index - rows // 2
+            self.refresh(force=True)
+
+    def _ensure_items(self, count):
+        width = max(self.canvas.winfo_width(), 200)
+        while len(self._items) < count:
+            y = len(self._items) * self.row_height + self.row_height // 2
+            name = self.canvas.create_text(6, y, anchor="w", font=self.font, fill=self.text_color)
+            status = self.canvas.create_text(width - 6, y, anchor="e", font=self.font)
+            wave = self.canvas.create_polygon(0, 0, 0, 0, 0, 0, fill=self.wave_color, outline="",
+                                              state="hidden")
+            self._items.append((name, status, wave))
+        # Keep status labels right-aligned after a resize
+        for position, (_, status, _) in enumerate(self._items):
+            self.canvas.coords(status, width - 6, position * self.row_height + self.row_height // 2)
+
+    def _draw_thumbnail(self, item, position, path):
+        """Shape one row's waveform polygon (max along the top, min back along the bottom)"""
+        columns = self.thumbnail(path, self.thumbnail_width) if self.thumbnail else None
+        if columns is None:
+            self.canvas.itemconfigure(item, state="hidden")
+            return
+        mins, maxs = columns
+        right = max(self.canvas.winfo_width(), 200) - self.status_width
+        left = right - len(maxs)
+        middle = position * self.row_height + self.row_height / 2.0
+        half = self.row_height / 2.0 - 2
+        points = []
+        for x, value in enumerate(maxs):
+            points += [left + x, middle - max(float(value), 0.02) * half]
+        for x in range(len(mins) - 1, -1, -1):
+            points += [left + x, middle - min(float(mins[x]), -0.02) * half]
+        self.canvas.coords(item, *points)
+        self.canvas.itemconfigure(item, state="normal")
+
+    def _render(self):
+        self._render_pending = False
+        total = len(self.model)
+        rows = self.rows
+        self.first, last = visible_range(self.first, rows, total)
+        key = (self.model.version, self.first, rows)
+        if key == self._rendered_version:
+            return
+        self._rendered_version = key
+
+        self._ensure_items(rows)
+        for position, (name_item, status_item, wave_item) in enumerate(self._items):
+            index = self.first + position
+            if index < last:
+                label, status = self.model.row(index)
+                self.canvas.itemconfigure(name_item, text=label)
+                self.canvas.itemconfigure(status_item, text=STATUS_LABELS.get(status, status),
+                                          fill=STATUS_COLORS.get(status, self.text_color))
+                self._draw_thumbnail(wave_item, position, self.model.paths[index])
+            else:
+                self.canvas.itemconfigure(name_item, text=self.empty_text if total == 0 and position == 0 else "")
+                self.canvas.itemconfigure(status_item, text="")
+                self.canvas.itemconfigure(wave_item, state="hidden")
+
+        if self.selected is not None and self.selected >= total:
+            self.selected = None
+        if self.selected is not None and self.first <= self.selected < last:
+            top = (self.selected - self.first) * self.row_height
+            self.canvas.coords(self._highlight, 0, top, max(self.canvas.winfo_width(), 200), top + self.row_height)
+            self.canvas.itemconfigure(self._highlight, state="normal")
+        else:
+            self.canvas.itemconfigure(self._highlight, state="hidden")
+
+        if total:
+            self.scrollbar.set(self.first / total, last / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        total = len(self.model)
+        if action == "moveto":
+            self.first = int(float(amount) * total)
+        elif action == "scroll":
+            step = self.rows if unit == "pages" else 1
+            self.first += int(amount) * step
+        self.refresh()
+
+    def _on_click(self, event):
+        index = self.first + int(event.y // self.row_height)
+        if index >= len(self.model):
+            return
+        self.selected = index
+        self.refresh(force=True)
+        if self.on_select:
+            self.on_select(index)
+
+    def _on_wheel(self, event):
+        if getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0:
+            self.first -= 3
+        else:
+            self.first += 3
+        self.refresh()
+        return "break"
@@ -0,0 +1,225 @@
+"""
+Folder ingestion for SunoReady
+Walks folders with an os.scandir generator in a background thread, streams
+the audio files it finds to the caller in batches and probes their duration
+and format concurrently, so files are usable as soon as they are found
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.flac', '.m4a', '.aac', '.ogg')
+
+
+def iter_audio_files(root, extensions=AUDIO_EXTENSIONS, follow_symlinks=False, on_error=None, cancelled=None):
+    """
+    Yield the audio files under root, directory by directory
+
+    Entries are read with os.scandir (one directory listing at a time, no
+    per-file stat on most platforms) and yielded in name order within each
+    directory.
+
+    Args:
+        root (str): Folder to walk
+        extensions (tuple): Lower-case extensions to keep
+        follow_symlinks (bool): Descend into symlinked folders
+        on_error (callable): Called with (path, OSError) for unreadable folders
+        cancelled (threading.Event): Stop walking once set
+
+    Yields:
+        str: Absolute file paths
+    """
+    extensions = tuple(ext.lower() for ext in extensions)
+    stack = [os.path.abspath(root)]
+    seen = set()
+    while stack:
+        if cancelled is not None and cancelled.is_set():
+            return
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name.lower())
+        except OSError as e:
+            if on_error:
+                on_error(folder, e)
+            continue
+        subfolders = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    if follow_symlinks:
+                        # Symlinks can form loops; visit each real folder once
+                        stat = entry.stat()
+                        key = stat.st_dev, stat.st_ino
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                    subfolders.append(entry.path)
+                elif entry.name.lower().endswith(extensions) and entry.is_file():
+                    yield entry.path
+            except OSError as e:
+                if on_error:
+                    on_error(entry.path, e)
+        # Popped from the end, so reverse to visit subfolders in name order
+        stack.extend(reversed(subfolders))
+
+
+def probe_audio(file_path):
+    """
+    Read duration and format from the file header
+
+    Returns:
+        dict: duration (seconds), format, sample_rate, channels, bitrate
+            (None where unknown)
+    """
+    info = {
+        'duration': None,
+        'format': os.path.splitext(file_path)[1].lstrip('.').lower(),
+        'sample_rate': None,
+        'channels': None,
+        'bitrate': None,
+    }
+    # Imported here so that importing this module stays cheap
+    try:
+        from mutagen import File as MutagenFile
+        audio = MutagenFile(file_path)
+        if audio is not None and audio.info:
+            info['duration'] = float(getattr(audio.info, 'length', 0) or 0) or None
+            info['sample_rate'] = getattr(audio.info, 'sample_rate', None)
+            info['channels'] = getattr(audio.info, 'channels', None)
+            info['bitrate'] = getattr(audio.info, 'bitrate', None) or None
+            if info['duration']:
+                return info
+    except Exception:
+        pass
+    try:
+        import soundfile as sf
+        sf_info = sf.info(file_path)
+        info['duration'] = float(sf_info.duration)
+        info['sample_rate'] = sf_info.samplerate
+        info['channels'] = sf_info.channels
+    except Exception:
+        pass
+    return info
+
+
+def format_probe(info):
+    """Short description of a probe result, e.g. '3:12 mp3 320k'"""
+    parts = []
+    duration = info.get('duration')
+    if duration:
+        minutes, seconds = divmod(int(round(duration)), 60)
+        parts.append(f"{minutes}:{seconds:02d}")
+    parts.append(info.get('format') or '?')
+    if info.get('bitrate'):
+        parts.append(f"{int(info['bitrate']) // 1000}k")
+    return " ".join(parts)
+
+
+class FolderIngest:
+    """Background folder walk with batched delivery and concurrent probing"""
+
+    def __init__(self, config=None):
+        """
+        Args:
+            config (dict): App configuration (ingest_batch_size,
+                ingest_batch_interval, probe_workers, ingest_probe,
+                ingest_follow_symlinks)
+        """
+        self.config = config or {}
+        self.batch_size = max(1, int(self.config.get('ingest_batch_size', 500)))
+        self.batch_interval = float(self.config.get('ingest_batch_interval', 0.25))
+        self.probe_workers = max(1, int(self.config.get('probe_workers', 8)))
+        self.probe = self.config.get('ingest_probe', True)
+        self.follow_symlinks = self.config.get('ingest_follow_symlinks', False)
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.found = 0
+        self.probed = 0
+        self.errors = []
+        self.seconds = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self, folders, on_files, on_probed=None, on_done=None):
+        """
+        Walk folders in a background thread
+
+        Args:
+            folders (list): Folders to walk (a single path is accepted)
+            on_files (callable): Called with each batch (list) of new paths
+            on_probed (callable): Called with (path, info) as probes finish
+            on_done (callable): Called with this FolderIngest at the end
+
+        Returns:
+            FolderIngest: self
+        """
+        self._thread = threading.Thread(target=self.run, args=(folders, on_files, on_probed, on_done),
+                                        daemon=True, name="folder-ingest")
+        self._thread.start()
+        return self
+
+    def run(self, folders, on_files, on_probed=None, on_done=None):
+        """Walk folders in the calling thread (see start)"""
+        if isinstance(folders, str):
+            folders = [folders]
+        start = time.perf_counter()
+        probes = None
+        if self.probe and on_probed is not None:
+            probes = ThreadPoolExecutor(max_workers=self.probe_workers, thread_name_prefix="ingest-probe")
+
+        def probe(path):
+            if self.cancelled.is_set():
+                return
+            info = probe_audio(path)
+            with self._lock:
+                self.probed += 1
+            try:
+                on_probed(path, info)
+            except Exception as e:
+                print(f"Warning: probe callback failed: {e}")
+
+        batch = []
+        last_flush = time.perf_counter()
+        try:
+            for folder in folders:
+                for path in iter_audio_files(folder, follow_symlinks=self.follow_symlinks,
+                                             on_error=lambda p, e: self.errors.append((p, str(e))),
+                                             cancelled=self.cancelled):
+                    if self.cancelled.is_set():
+                        break
+                    batch.append(path)
+                    self.found += 1
+                    if probes is not None:
+                        probes.submit(probe, path)
+                    # Deliver in batches: by size, or by time while a slow disk trickles
+                    now = time.perf_counter()
+                    if len(batch) >= self.batch_size or now - last_flush >= self.batch_interval:
+                        on_files(batch)
+                        batch = []
+                        last_flush = now
+            if batch and not self.cancelled.is_set():
+                on_files(batch)
+        except Exception as e:
+            self.errors.append((str(folders), str(e)))
+        finally:
+            if probes is not None:
+                probes.shutdown(wait=True, cancel_futures=self.cancelled.is_set())
+            self.seconds = time.perf_counter() - start
+            self.done.set()
+            if on_done:
+                try:
+                    on_done(self)
+                except Exception as e:
+                    print(f"Warning: ingest callback failed: {e}")
+        return self
+
+    def cancel(self):
+        """Stop walking and drop probes not yet started"""
+        self.cancelled.set()
+
+    def wait(self, timeout=None):
+        """Block until the walk and its probes have finished; returns False on timeout"""
+        return self.done.wait(timeout)
@@ -0,0 +1,359 @@
+"""
+Durable job queue for SunoReady
+Keeps pending, running, done and failed jobs with their options in a local
+SQLite database (WAL mode), so batches survive crashes and restarts and can
+be fed and drained by the GUI, the CLI or a headless runner
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+STATUSES = (PENDING, RUNNING, DONE, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    output_path TEXT,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+
+def _pid_alive(pid):
+    """True if a process with this pid exists on this machine"""
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        # os.kill would terminate the process on Windows
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def default_owner():
+    """Owner tag for jobs claimed by this process"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class QueuedJob:
+    """One row of the job queue"""
+
+    def __init__(self, row):
+        self.id = row['id']
+        self.batch_id = row['batch_id']
+        self.input_path = row['input_path']
+        self.output_path = row['output_path']
+        self.options = json.loads(row['options'])
+        self.status = row['status']
+        self.attempts = row['attempts']
+        self.owner = row['owner']
+        self.error = json.loads(row['error']) if row['error'] else None
+
+    def __repr__(self):
+        return f"QueuedJob({self.id}, {os.path.basename(self.input_path)}, {self.status})"
+
+
+class JobQueue:
+    """SQLite-backed queue of processing jobs"""
+
+    def __init__(self, config=None, path=None):
+        """
+        Args:
+            config (dict): App configuration (job_queue_path)
+            path (str): Database file (default: config/job_queue.db)
+        """
+        self.config = config or {}
+        self.path = path or self.config.get('job_queue_path', 'config/job_queue.db')
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # WAL is a property of the database file and can't be set inside a transaction
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute('PRAGMA busy_timeout=30000')
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self, immediate=False):
+        """
+        Short-lived connection per operation
+
+        Connections are cheap and this keeps the queue usable from any
+        thread or process; WAL lets readers run while a writer commits.
+        """
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute('PRAGMA busy_timeout=30000')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            try:
+                yield conn
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        finally:
+            conn.close()
+
+    def enqueue(self, files, options, output_paths=None, batch_id=None):
+        """
+        Add jobs for files processed with options
+
+        Returns:
+            str: Batch id shared by the new jobs
+        """
+        batch_id = batch_id or uuid.uuid4().hex[:12]
+        options_json = json.dumps(options, sort_keys=True)
+        now = time.time()
+        rows = [
+            (batch_id, os.path.abspath(path), output_paths[i] if output_paths else None, options_json, now)
+            for i, path in enumerate(files)
+        ]
+        with self._connect(immediate=True) as conn:
+            conn.executemany(
+                'INSERT INTO jobs (batch_id, input_path, output_path, options, created_at) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+        return batch_id
+
+    def claim(self, limit=None, owner=None, batch_id=None):
+        """
+        Move pending jobs to running for this owner, oldest first
+
+        The select and update happen in one write transaction, so two
+        runners never claim the same job.
+
+        Args:
+            batch_id (str): Only claim jobs of this batch
+
+        Returns:
+            list: QueuedJob for every claimed job
+        """
+        owner = owner or default_owner()
+        with self._connect(immediate=True) as conn:
+            query = 'SELECT id FROM jobs WHERE status = ?'
+            params = [PENDING]
+            if batch_id:
+                query += ' AND batch_id = ?'
+                params.append(batch_id)
+            query += ' ORDER BY id'
+            if limit:
+                query += ' LIMIT ?'
+                params.append(int(limit))
+            ids = [row['id'] for row in conn.execute(query, params)]
+            if not ids:
+                return []
+            marks = ','.join('?' * len(ids))
+            conn.execute(
+                f'UPDATE jobs SET status = ?, owner = ?, started_at = ?, attempts = attempts + 1 '
+                f'WHERE id IN ({marks})',
+                [RUNNING, owner, time.time()] + ids
+            )
+            rows = conn.execute(f'SELECT * FROM jobs WHERE id IN ({marks}) ORDER BY id', ids).fetchall()
+        return [QueuedJob(row) for row in rows]
+
+    def complete(self, job_id, output_path=None):
+        """Mark a job done, recording where its output went"""
+        with self._connect(immediate=True) as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, output_path = COALESCE(?, output_path), error = NULL, '
+                'finished_at = ? WHERE id = ?',
+                (DONE, output_path, time.time(), job_id)
+            )
+
+    def fail(self, job_id, error):
+        """Mark a job failed; error is a dict (e.g. BatchFailure.to_dict()) or a message"""
+        if not isinstance(error, dict):
+            error = {'message': str(error)}
+        with self._connect(immediate=True) as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+                (FAILED, json.dumps(error), time.time(), job_id)
+            )
+
+    def release(self, job_ids):
+        """
+        Return claimed jobs that were never started to pending
+
+        Their claim is not counted as an attempt.
+
+        Returns:
+            int: Number of jobs put back in the queue
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        marks = ','.join('?' * len(job_ids))
+        with self._connect(immediate=True) as conn:
+            return conn.execute(
+                f'UPDATE jobs SET status = ?, owner = NULL, started_at = NULL, '
+                f'attempts = MAX(attempts - 1, 0) WHERE status = ? AND id IN ({marks})',
+                [PENDING, RUNNING] + job_ids
+            ).rowcount
+
+    def recover(self):
+        """
+        Return running jobs whose owner process is gone to pending
+
+        Call on startup: jobs left running by a crashed or killed process
+        on this machine are resumed. Jobs owned by other hosts are left
+        alone.
+
+        Returns:
+            int: Number of jobs put back in the queue
+        """
+        host = socket.gethostname()
+        stale = []
+        with self._connect(immediate=True) as conn:
+            for row in conn.execute('SELECT id, owner FROM jobs WHERE status = ?', (RUNNING,)):
+                owner_host, _, pid = (row['owner'] or '').rpartition(':')
+                if owner_host != host:
+                    continue
+                try:
+                    alive = _pid_alive(int(pid))
+                except ValueError:
+                    alive = False
+                if not alive:
+                    stale.append(row['id'])
+            if stale:
+                marks = ','.join('?' * len(stale))
+                conn.execute(f'UPDATE jobs SET status = ?, owner = NULL WHERE id IN ({marks})',
+                             [PENDING] + stale)
+        return len(stale)
+
+    def retry_failed(self, batch_id=None):
+        """Put failed jobs back in the queue; returns how many"""
+        query = 'UPDATE jobs SET status = ?, error = NULL WHERE status = ?'
+        params = [PENDING, FAILED]
+        if batch_id:
+            query += ' AND batch_id = ?'
+            params.append(batch_id)
+        with self._connect(immediate=True) as conn:
+            return conn.execute(query, params).rowcount
+
+    def clear(self, statuses=(DONE,), batch_id=None):
+        """Delete finished jobs (of one batch, if given); returns how many"""
+        marks = ','.join('?' * len(statuses))
+        query = f'DELETE FROM jobs WHERE status IN ({marks})'
+        params = list(statuses)
+        if batch_id:
+            query += ' AND batch_id = ?'
+            params.append(batch_id)
+        with self._connect(immediate=True) as conn:
+            return conn.execute(query, params).rowcount
+
+    def counts(self, batch_id=None):
+        """Number of jobs per status"""
+        query = 'SELECT status, COUNT(*) AS n FROM jobs'
+        params = []
+        if batch_id:
+            query += ' WHERE batch_id = ?'
+            params.append(batch_id)
+        counts = dict.fromkeys(STATUSES, 0)
+        with self._connect() as conn:
+            for row in conn.execute(query + ' GROUP BY status', params):
+                counts[row['status']] = row['n']
+        return counts
+
+    def jobs(self, status=None, batch_id=None):
+        """Jobs, optionally filtered by status and batch"""
+        query = 'SELECT * FROM jobs WHERE 1 = 1'
+        params = []
+        if status:
+            query += ' AND status = ?'
+            params.append(status)
+        if batch_id:
+            query += ' AND batch_id = ?'
+            params.append(batch_id)
+        with self._connect() as conn:
+            return [QueuedJob(row) for row in conn.execute(query + ' ORDER BY id', params)]
+
+    def drain(self, run_batch, limit=None, owner=None, batch_id=None):
+        """
+        Process pending jobs until the queue is empty
+
+        Claimed jobs are grouped by options and handed to run_batch, which
+        must behave like BatchExecutor.run: take (files, options,
+        output_paths, file_callback), call file_callback with each result
+        (having index, output_path and failure) and return the results.
+
+        Args:
+            run_batch (callable): Runs one group of jobs
+            limit (int): Jobs to claim at a time (default: all pending)
+            owner (str): Owner tag (default: host:pid)
+            batch_id (str): Only process jobs of this batch (default: all)
+
+        Returns:
+            list: (QueuedJob, result) for every job processed
+        """
+        processed = []
+        while True:
+            claimed = self.claim(limit, owner, batch_id)
+            if not claimed:
+                return processed
+
+            groups = {}
+            for job in claimed:
+                groups.setdefault(json.dumps(job.options, sort_keys=True), []).append(job)
+
+            groups = list(groups.values())
+            for position, group in enumerate(groups):
+                recorded = set()
+
+                def record(result, group=group, recorded=recorded):
+                    job = group[result.index]
+                    if result.failure:
+                        self.fail(job.id, result.failure.to_dict())
+                    else:
+                        self.complete(job.id, result.output_path)
+                    recorded.add(result.index)
+                    processed.append((job, result))
+
+                output_paths = [job.output_path for job in group]
+                try:
+                    results = run_batch([job.input_path for job in group], group[0].options,
+                                        output_paths if any(output_paths) else None, record)
+                except Exception as e:
+                    for index, job in enumerate(group):
+                        if index not in recorded:
+                            self.fail(job.id, {'message': f"Batch error: {str(e)}"})
+                    # Groups not started yet go back to the queue
+                    self.release(job.id for later in groups[position + 1:] for job in later)
+                    raise
+                for result in results or []:
+                    if result.index not in recorded:
+                        record(result)
@@ -6,151 +6,249 @@ Only essential features, maximum performance
 
 import os
 import subprocess
-import tempfile
-import shutil
 from pathlib import Path
 from audio_utils import AudioProcessor
+import mp3_utils
+from concurrency_controller import ffmpeg_thread_args
+from pipeline_steps import Call, Command, run_steps, run_steps_async
+from progress_utils import flush_progress, rate_limited
+from scratch_space import get_scratch_space
 
 class LightningProcessor:
     """Ultra-fast audio processor - only essential features"""
     
-    def __init__(self, config):
+    def __init__(self, config, audio_processor=None):
         self.config = config
         self.processed_output_folder = config.get("processed_output_folder", "output/processed")
         os.makedirs(self.processed_output_folder, exist_ok=True)
-        # Initialize AudioProcessor for pitch shifting
-        self.audio_processor = AudioProcessor(config)
+        self.scratch = get_scratch_space(config)
+        # AudioProcessor for pitch shifting (shared with the caller's when given)
+        self.audio_processor = audio_processor or AudioProcessor(config)
     
     def process_lightning_fast(self, input_path, output_path=None, progress_callback=None, **options):
         """
         Lightning-fast processing - FFmpeg only, minimal steps
         """
+        progress_callback = rate_limited(progress_callback, config=self.config)
         try:
-            def update_progress(step, total_steps, message=""):
-                if progress_callback:
-                    progress = step / total_steps
-                    progress_callback(progress, message)
-                    
-            if output_path is None:
-                input_name = Path(input_path).stem
-                output_path = f"{self.processed_output_folder}/{input_name}_processed.mp3"
-            
-            # Ensure output directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            update_progress(1, 3, "Initializing lightning processing...")
-            
-            # Build single FFmpeg command with all effects
-            cmd = ['ffmpeg', '-y', '-i', input_path]
-            
-            # Audio filters chain
-            filters = []
+            return run_steps(self._lightning_steps(input_path, output_path, progress_callback, options))
+        except Exception as e:
+            raise Exception(f"Lightning processing failed: {str(e)}") from e
+        finally:
+            # Deliver the last step reported (it names the failing stage)
+            flush_progress(progress_callback)
+    
+    async def process_lightning_async(self, input_path, output_path=None, progress_callback=None,
+                                      runner=None, **options):
+        """
+        Coroutine version of process_lightning_fast
+        
+        Runs the same steps, with FFmpeg as an asyncio child process under the
+        runner's concurrency limits and the librosa pitch shift in the
+        runner's CPU executor.
+        
+        Args:
+            runner (AsyncSubprocessRunner): Shared runner (defaults to the global one)
+        """
+        from async_runner import get_default_runner
+        runner = runner or get_default_runner()
+        progress_callback = rate_limited(progress_callback, config=self.config)
+        try:
+            return await run_steps_async(
+                self._lightning_steps(input_path, output_path, progress_callback, options), runner)
+        except Exception as e:
+            raise Exception(f"Lightning processing failed: {str(e)}") from e
+        finally:
+            flush_progress(progress_callback)
+    
+    def _lightning_steps(self, input_path, output_path, progress_callback, options):
+        """Step sequence behind both lightning entry points (see pipeline_steps)"""
+        def update_progress(step, total_steps, message=""):
+            if progress_callback:
+                progress = step / total_steps
+                progress_callback(progress, message)
+        
+        output_path = self._resolve_output_path(input_path, output_path)
+        
+        update_progress(1, 3, "Initializing lightning processing...")
+        job = None
+        try:
+            job = yield Call(self.scratch.open_job, Path(input_path).stem,
+                             self.scratch.estimate_bytes(input_path), tool='scratch')
             
             # Pitch shift (if needed) - Use AudioProcessor.change_pitch like standard path
             pitch_semitones = options.get('pitch_semitones', 0)
-            temp_pitched_file = None
-            current_input = input_path
-            
+            temp_pitched_file, pitch_filters = None, []
             if pitch_semitones != 0:
-                # Use AudioProcessor.change_pitch method (same as standard path)
-                try:
-                    update_progress(1.5, 3, f"Applying pitch shift ({pitch_semitones} semitones)...")
-                    
-                    # Load audio using AudioProcessor
-                    y, sr = self.audio_processor.load_audio(input_path)
-                    
-                    # Apply pitch shift using AudioProcessor.change_pitch (same as standard path)
-                    y_pitched = self.audio_processor.change_pitch(y, pitch_semitones)
-                    
-                    # Save to temporary file
-                    temp_pitched_file = tempfile.mktemp(suffix='.wav')
-                    import soundfile as sf
-                    sf.write(temp_pitched_file, y_pitched, sr)
-                    
-                    # Update input for FFmpeg chain
-                    current_input = temp_pitched_file
-                    cmd[cmd.index(input_path)] = current_input
-                    
-                except Exception as e:
-                    print(f"Warning: AudioProcessor pitch shift failed ({e}), falling back to FFmpeg")
-                    # Fallback to FFmpeg pitch shift
-                    pitch_ratio = 2 ** (pitch_semitones / 12.0)
-                    filters.append(f'asetrate=44100*{pitch_ratio},atempo={1/pitch_ratio}')
-            
-            # Tempo change (if needed)
-            tempo_change = options.get('tempo_change', 100.0)
-            if tempo_change != 100.0:
-                tempo_rate = tempo_change / 100.0
-                if 0.5 <= tempo_rate <= 2.0:
-                    filters.append(f'atempo={tempo_rate}')
-                elif tempo_rate > 2.0:
-                    # Multiple atempo for extreme speeds
-                    current = tempo_rate
-                    while current > 2.0:
-                        filters.append('atempo=2.0')
-                        current /= 2.0
-                    if current != 1.0:
-                        filters.append(f'atempo={current}')
-                elif tempo_rate < 0.5:
-                    # Multiple atempo for slow speeds
-                    current = tempo_rate
-                    while current < 0.5:
-                        filters.append('atempo=0.5')
-                        current /= 0.5
-                    if current != 1.0:
-                        filters.append(f'atempo={current}')
+                update_progress(1.5, 3, f"Applying pitch shift ({pitch_semitones} semitones)...")
+                temp_pitched_file, pitch_filters = yield Call(
+                    self._prepare_pitch, input_path, pitch_semitones, job, stage='dsp')
             
-            # Normalize (if enabled)
-            if options.get('normalize', False):
-                filters.append('dynaudnorm=f=75:g=25:p=0.95')
-            
-            # Highpass filter (if enabled)
-            if options.get('apply_highpass', False):
-                filters.append('highpass=f=80')
+            filters = pitch_filters + self.build_filter_chain(options)
             
             update_progress(2, 3, "Applying effects...")
             
-            # Add filters if any
-            if filters:
-                cmd.extend(['-af', ','.join(filters)])
-            
-            # Trim duration (final step)
-            trim_duration = options.get('trim_duration')
-            if trim_duration and trim_duration > 0:
-                cmd.extend(['-t', str(trim_duration)])
-            
-            # Output settings - high quality, fast encoding
-            cmd.extend(['-c:a', 'libmp3lame', '-b:a', '320k'])
+            # Nothing to decode: trim/copy the MP3 frames directly
+            if not filters and temp_pitched_file is None:
+                copied = yield Call(self._copy_bitstream, input_path, output_path, options, stage='copy')
+                if copied:
+                    update_progress(3, 3, "Lightning processing complete!")
+                    return output_path
             
-            # Remove metadata if requested
-            if options.get('clean_metadata', False):
-                cmd.extend(['-map_metadata', '-1'])
-            
-            cmd.append(output_path)
-            
-            # Run single FFmpeg command
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise Exception(f"FFmpeg error: {result.stderr}")
-            
-            # Clean up temporary pitched file if created
-            if temp_pitched_file and os.path.exists(temp_pitched_file):
-                try:
-                    os.remove(temp_pitched_file)
-                except:
-                    pass  # Ignore cleanup errors
+            # Run single FFmpeg command into scratch, then publish atomically
+            final_temp = job.new_path('.mp3', 'output')
+            cmd = self.build_ffmpeg_command(temp_pitched_file or input_path, final_temp, filters, options)
+            # One FFmpeg process decodes, filters, encodes and strips tags
+            yield Command(cmd, "FFmpeg error", stage='ffmpeg')
+            yield Call(job.commit, final_temp, output_path)
             
             update_progress(3, 3, "Lightning processing complete!")
             return output_path
+        finally:
+            # Remove the job's scratch directory (pitched WAV, partial output)
+            if job is not None:
+                job.close()
+    
+    def _resolve_output_path(self, input_path, output_path):
+        """Default the output path and make sure its folder exists"""
+        if output_path is None:
+            input_name = Path(input_path).stem
+            output_path = f"{self.processed_output_folder}/{input_name}_processed.mp3"
+        
+        # Ensure output directory exists
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        return output_path
+    
+    def _prepare_pitch(self, input_path, pitch_semitones, job):
+        """
+        Pitch shift with AudioProcessor.change_pitch into a WAV in the job's scratch dir
+        
+        Returns:
+            tuple: (temporary WAV path or None, FFmpeg fallback filters)
+        """
+        if pitch_semitones == 0:
+            return None, []
+        
+        temp_pitched_file = None
+        try:
+            # Load audio using AudioProcessor
+            y, sr = self.audio_processor.load_audio(input_path)
+            
+            # Apply pitch shift using AudioProcessor.change_pitch (same as standard path)
+            y_pitched = self.audio_processor.change_pitch(y, pitch_semitones)
+            
+            # Save to temporary file
+            temp_pitched_file = job.new_path('.wav', 'pitched')
+            import soundfile as sf
+            sf.write(temp_pitched_file, y_pitched, sr)
+            return temp_pitched_file, []
             
         except Exception as e:
-            # Clean up temporary pitched file on error
-            if temp_pitched_file and os.path.exists(temp_pitched_file):
-                try:
-                    os.remove(temp_pitched_file)
-                except:
-                    pass  # Ignore cleanup errors
-            raise Exception(f"Lightning processing failed: {str(e)}")
+            self._remove_temp(temp_pitched_file)
+            print(f"Warning: AudioProcessor pitch shift failed ({e}), falling back to FFmpeg")
+            # Fallback to FFmpeg pitch shift at the input's own rate
+            return None, self._ffmpeg_pitch_filters(input_path, pitch_semitones)
+    
+    def _ffmpeg_pitch_filters(self, input_path, pitch_semitones):
+        """
+        asetrate + aresample + atempo pitch shift
+        
+        asetrate is relative to the input's real rate, read from its header;
+        aresample brings the output back to that rate.
+        """
+        from folder_ingest import probe_audio
+        filters = []
+        sample_rate = probe_audio(input_path)['sample_rate']
+        if not sample_rate:
+            # Unknown rate: resample to a known one first
+            sample_rate = 44100
+            filters.append(f'aresample={sample_rate}')
+        pitch_ratio = 2 ** (pitch_semitones / 12.0)
+        filters.append(f'asetrate={sample_rate * pitch_ratio:.3f}')
+        filters.append(f'aresample={sample_rate}')
+        return filters + self._atempo_chain(1 / pitch_ratio)
+    
+    def build_filter_chain(self, options):
+        """Build the FFmpeg -af filter list for tempo, normalize and highpass"""
+        filters = []
+        
+        # Tempo change (if needed)
+        tempo_change = options.get('tempo_change', 100.0)
+        if tempo_change != 100.0:
+            filters.extend(self._atempo_chain(tempo_change / 100.0))
+        
+        # Normalize (if enabled)
+        if options.get('normalize', False):
+            filters.append('dynaudnorm=f=75:g=25:p=0.95')
+        
+        # Highpass filter (if enabled)
+        if options.get('apply_highpass', False):
+            filters.append('highpass=f=80')
+        
+        return filters
+    
+    def _atempo_chain(self, tempo_rate):
+        """atempo filters for any rate (one stage accepts 0.5..2.0)"""
+        if 0.5 <= tempo_rate <= 2.0:
+            return [f'atempo={tempo_rate}']
+        filters = []
+        current = tempo_rate
+        # Multiple atempo for extreme speeds
+        while current > 2.0:
+            filters.append('atempo=2.0')
+            current /= 2.0
+        while current < 0.5:
+            filters.append('atempo=0.5')
+            current /= 0.5
+        if current != 1.0:
+            filters.append(f'atempo={current}')
+        return filters
+    
+    def build_ffmpeg_command(self, input_path, output_path, filters, options):
+        """Build the single FFmpeg command that applies all filters and encodes"""
+        cmd = ['ffmpeg', '-y', '-i', input_path]
+        
+        # Add filters if any
+        if filters:
+            cmd.extend(['-af', ','.join(filters)])
+        
+        # Trim duration (final step)
+        trim_duration = options.get('trim_duration')
+        if trim_duration and trim_duration > 0:
+            cmd.extend(['-t', str(trim_duration)])
+        
+        # Output settings - high quality, fast encoding
+        cmd.extend(['-c:a', 'libmp3lame', '-b:a', '320k'])
+        cmd.extend(ffmpeg_thread_args())
+        
+        # Remove metadata if requested
+        if options.get('clean_metadata', False):
+            cmd.extend(['-map_metadata', '-1'])
+        
+        cmd.append(output_path)
+        return cmd
+    
+    def _copy_bitstream(self, input_path, output_path, options):
+        """Trim/copy MP3 frames without re-encoding; returns False if not possible"""
+        if not mp3_utils.is_mp3(input_path):
+            return False
+        try:
+            mp3_utils.trim(
+                input_path, output_path, options.get('trim_duration'),
+                keep_tags=not options.get('clean_metadata', False)
+            )
+            return True
+        except mp3_utils.MP3FormatError as e:
+            print(f"Warning: bitstream copy failed ({e}), re-encoding with FFmpeg")
+            return False
+    
+    def _remove_temp(self, temp_file):
+        """Remove a temporary file, ignoring errors"""
+        if temp_file and os.path.exists(temp_file):
+            try:
+                os.remove(temp_file)
+            except:
+                pass  # Ignore cleanup errors
 
 def test_lightning_processor():
     """Test the lightning processor"""
@@ -13,6 +13,8 @@ from mutagen.oggvorbis import OggVorbis
 import subprocess
 from pathlib import Path
 
+import mp3_utils
+
 class MetadataUtils:
     def __init__(self, log_callback=None):
         self.supported_formats = ['.mp3', '.flac', '.m4a', '.ogg', '.wav']
@@ -45,6 +47,10 @@ class MetadataUtils:
             # Use mutagen for metadata removal
             success = self._clean_with_mutagen(file_path)
             
+            # MP3: drop any leftover tags (APE, Lyrics3, ...) at the frame level
+            if file_ext == '.mp3' and self._clean_with_bitstream(file_path):
+                return True
+            
             # If mutagen fails or for extra safety, use FFmpeg
             if not success or file_ext == '.mp3':
                 success = self._clean_with_ffmpeg(file_path)
@@ -78,6 +84,15 @@ class MetadataUtils:
             print(f"Mutagen cleaning failed: {str(e)}")
             return False
     
+    def _clean_with_bitstream(self, file_path):
+        """Strip all tags from an MP3 without spawning FFmpeg"""
+        try:
+            mp3_utils.strip_tags(file_path)
+            return True
+        except Exception as e:
+            print(f"Bitstream cleaning failed: {str(e)}")
+            return False
+    
     def _clean_with_ffmpeg(self, file_path):
         """Clean metadata using FFmpeg (more thorough)"""
         try:
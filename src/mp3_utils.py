@@ -0,0 +1,760 @@
+"""
+MP3 bitstream utilities for SunoReady
+Frame-level trimming, tag stripping and concatenation without re-encoding
+"""
+
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+# MPEG audio version ids (2 header bits)
+MPEG_25 = 0
+MPEG_2 = 2
+MPEG_1 = 3
+
+# Layer III bitrates in kbps, indexed by the 4-bit bitrate field
+BITRATES_V1_L3 = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]
+BITRATES_V2_L3 = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+
+SAMPLE_RATES = {
+    MPEG_1: [44100, 48000, 32000],
+    MPEG_2: [22050, 24000, 16000],
+    MPEG_25: [11025, 12000, 8000],
+}
+
+# Fixed decoder delay of the MP3 synthesis filterbank (samples)
+DECODER_DELAY = 529
+
+# Largest delay/padding value a LAME tag can hold (12 bits)
+MAX_LAME_DELAY = 4095
+
+LAME_ENCODER_IDS = (b"LAME", b"Lavf", b"Lavc", b"GOGO")
+
+
+class MP3FormatError(Exception):
+    """Raised when data cannot be handled as a Layer III bitstream"""
+
+
+class MP3Frame:
+    """A single MPEG-1/2/2.5 Layer III frame located inside a byte buffer"""
+
+    __slots__ = (
+        "offset", "size", "version", "sample_rate", "bitrate", "channels",
+        "has_crc", "samples", "side_info_size", "main_data_begin",
+    )
+
+    def __init__(self, offset, size, version, sample_rate, bitrate, channels,
+                 has_crc, main_data_begin):
+        self.offset = offset
+        self.size = size
+        self.version = version
+        self.sample_rate = sample_rate
+        self.bitrate = bitrate
+        self.channels = channels
+        self.has_crc = has_crc
+        self.samples = 1152 if version == MPEG_1 else 576
+        if version == MPEG_1:
+            self.side_info_size = 17 if channels == 1 else 32
+        else:
+            self.side_info_size = 9 if channels == 1 else 17
+        self.main_data_begin = main_data_begin
+
+    @property
+    def side_info_offset(self):
+        """Offset of the side information relative to the frame start"""
+        return 6 if self.has_crc else 4
+
+    @property
+    def main_data_size(self):
+        """Number of bytes this frame contributes to the bit reservoir"""
+        return self.size - self.side_info_offset - self.side_info_size
+
+
+def parse_frame_header(data, offset):
+    """
+    Parse a Layer III frame header
+
+    Args:
+        data (bytes): Buffer holding the bitstream
+        offset (int): Position of the candidate sync word
+
+    Returns:
+        MP3Frame: Parsed frame, or None if the bytes are not a valid header
+    """
+    if offset + 4 > len(data):
+        return None
+
+    b0, b1, b2, b3 = data[offset], data[offset + 1], data[offset + 2], data[offset + 3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    if version == 1 or layer != 1:  # reserved version, or not Layer III
+        return None
+
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if bitrate_index in (0, 15) or sample_rate_index == 3:  # free format / invalid
+        return None
+
+    bitrates = BITRATES_V1_L3 if version == MPEG_1 else BITRATES_V2_L3
+    bitrate = bitrates[bitrate_index]
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    channels = 1 if (b3 >> 6) == 3 else 2
+    has_crc = (b1 & 0x01) == 0
+
+    if version == MPEG_1:
+        size = 144000 * bitrate // sample_rate + padding
+    else:
+        size = 72000 * bitrate // sample_rate + padding
+
+    side_offset = offset + (6 if has_crc else 4)
+    if side_offset + 2 > len(data):
+        return None
+    if version == MPEG_1:
+        main_data_begin = (data[side_offset] << 1) | (data[side_offset + 1] >> 7)
+    else:
+        main_data_begin = data[side_offset]
+
+    return MP3Frame(offset, size, version, sample_rate, bitrate, channels,
+                    has_crc, main_data_begin)
+
+
+def _id3v2_size(data, offset=0):
+    """Return the total size of an ID3v2 tag at offset, or 0 if there is none"""
+    if data[offset:offset + 3] != b"ID3" or len(data) < offset + 10:
+        return 0
+    flags = data[offset + 5]
+    size_bytes = data[offset + 6:offset + 10]
+    if any(b & 0x80 for b in size_bytes):
+        return 0
+    size = 0
+    for b in size_bytes:
+        size = (size << 7) | b
+    size += 10
+    if flags & 0x10:  # footer present
+        size += 10
+    return size
+
+
+def _trailing_tags_start(data, end):
+    """Find where trailing tags (ID3v1, APEv2, Lyrics3) begin before end"""
+    changed = True
+    while changed and end > 0:
+        changed = False
+
+        # ID3v1 (128 bytes), optionally preceded by an extended "TAG+" block
+        if end >= 128 and data[end - 128:end - 125] == b"TAG":
+            end -= 128
+            if end >= 227 and data[end - 227:end - 223] == b"TAG+":
+                end -= 227
+            changed = True
+            continue
+
+        # APEv2 footer; the size field covers items and footer, not the header
+        if end >= 32 and data[end - 32:end - 24] == b"APETAGEX":
+            size, flags = struct.unpack("<II", data[end - 20:end - 12])
+            tag_size = size + (32 if flags & 0x80000000 else 0)
+            if 0 < tag_size <= end:
+                end -= tag_size
+                changed = True
+                continue
+
+        # Lyrics3v2: 6-digit size followed by "LYRICS200"
+        if end >= 15 and data[end - 9:end] == b"LYRICS200":
+            try:
+                size = int(data[end - 15:end - 9])
+            except ValueError:
+                size = -1
+            if 0 < size + 15 <= end:
+                end -= size + 15
+                changed = True
+    return end
+
+
+def crc16_mpeg(data, crc=0xFFFF):
+    """CRC-16 (poly 0x8005, MSB first) as used for protected MPEG frames"""
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x8005) if crc & 0x8000 else (crc << 1)
+            crc &= 0xFFFF
+    return crc
+
+
+def crc16_lame(data, crc=0):
+    """CRC-16/ARC (reflected poly 0xA001) as used by the LAME info tag"""
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+class _BitWriter:
+    """Overwrite bit fields inside a bytearray (MSB first)"""
+
+    def __init__(self, buffer, base):
+        self.buffer = buffer
+        self.base = base
+
+    def write(self, bit_offset, width, value):
+        for i in range(width):
+            bit = (value >> (width - 1 - i)) & 1
+            pos = bit_offset + i
+            index = self.base + pos // 8
+            mask = 0x80 >> (pos % 8)
+            if bit:
+                self.buffer[index] |= mask
+            else:
+                self.buffer[index] &= ~mask & 0xFF
+
+
+def silence_frame(frame_bytes, frame):
+    """
+    Turn a frame into a silent one that consumes no main data
+
+    The frame keeps its size, so any bytes it carries for the bit reservoir
+    stay where the following frames expect them. Only the side information
+    is rewritten: no backstep, no scalefactors and zero-length Huffman data.
+
+    Args:
+        frame_bytes (bytes): Raw frame
+        frame (MP3Frame): Parsed header of the frame
+
+    Returns:
+        bytes: Silent frame
+    """
+    out = bytearray(frame_bytes)
+    writer = _BitWriter(out, frame.side_info_offset)
+    nch = frame.channels
+
+    if frame.version == MPEG_1:
+        writer.write(0, 9, 0)  # main_data_begin
+        header_bits = 9 + (5 if nch == 1 else 3)
+        writer.write(header_bits, 4 * nch, 0)  # scfsi
+        header_bits += 4 * nch
+        granules, block_bits, sfc_bits = 2, 59, 4
+    else:
+        writer.write(0, 8, 0)
+        header_bits = 8 + (1 if nch == 1 else 2)
+        granules, block_bits, sfc_bits = 1, 63, 9
+
+    for gr in range(granules):
+        for ch in range(nch):
+            start = header_bits + (gr * nch + ch) * block_bits
+            writer.write(start, 12, 0)  # part2_3_length
+            writer.write(start + 12, 9, 0)  # big_values
+            writer.write(start + 21, 8, 0)  # global_gain
+            writer.write(start + 29, sfc_bits, 0)  # scalefac_compress
+
+    if frame.has_crc:
+        side = out[6:6 + frame.side_info_size]
+        crc = crc16_mpeg(bytes(out[2:4]) + bytes(side))
+        out[4:6] = struct.pack(">H", crc)
+    return bytes(out)
+
+
+def build_priming_frame(template_bytes, template, reservoir):
+    """
+    Build a silent frame whose main data area ends with the given reservoir bytes
+
+    Used in front of a cut point so the first kept frame finds the bit
+    reservoir data it points back to. The bitrate is raised as far as needed
+    for the reservoir to fit in a single frame.
+
+    Args:
+        template_bytes (bytes): Raw frame whose header settings are reused
+        template (MP3Frame): Parsed header of that frame
+        reservoir (bytes): Bytes the next frame expects in the reservoir
+
+    Returns:
+        bytes: Silent priming frame
+    """
+    bitrates = BITRATES_V1_L3 if template.version == MPEG_1 else BITRATES_V2_L3
+    factor = 144000 if template.version == MPEG_1 else 72000
+    overhead = template.side_info_offset + template.side_info_size
+
+    for index in range(1, 15):
+        size = factor * bitrates[index] // template.sample_rate
+        if size - overhead >= len(reservoir):
+            break
+    else:
+        reservoir = reservoir[-(size - overhead):]
+
+    b1 = template_bytes[1]
+    b2 = (index << 4) | (template_bytes[2] & 0x0D)  # keep rate and private bit, no padding
+    header = bytes([0xFF, b1, b2, template_bytes[3]])
+    body = bytes(size - 4 - len(reservoir)) + reservoir
+    frame_bytes = header + body
+    return silence_frame(frame_bytes, parse_frame_header(frame_bytes, 0))
+
+
+class InfoTag:
+    """Xing/Info header (and optional LAME extension) carried by the first frame"""
+
+    FLAG_FRAMES = 0x01
+    FLAG_BYTES = 0x02
+    FLAG_TOC = 0x04
+    FLAG_QUALITY = 0x08
+
+    def __init__(self, frame, frame_bytes):
+        self.frame = frame
+        self.data = bytearray(frame_bytes)
+        self.xing_offset = None
+        self.lame_offset = None
+
+        for start in (frame.side_info_offset + frame.side_info_size,
+                      4 + frame.side_info_size):
+            if self.data[start:start + 4] in (b"Xing", b"Info"):
+                self.xing_offset = start
+                break
+        if self.xing_offset is None:
+            return
+
+        self.flags = struct.unpack(">I", self.data[self.xing_offset + 4:self.xing_offset + 8])[0]
+        pos = self.xing_offset + 8
+        self.frames_offset = self.bytes_offset = self.toc_offset = None
+        if self.flags & self.FLAG_FRAMES:
+            self.frames_offset = pos
+            pos += 4
+        if self.flags & self.FLAG_BYTES:
+            self.bytes_offset = pos
+            pos += 4
+        if self.flags & self.FLAG_TOC:
+            self.toc_offset = pos
+            pos += 100
+        if self.flags & self.FLAG_QUALITY:
+            pos += 4
+        if self.data[pos:pos + 4] in LAME_ENCODER_IDS and pos + 36 <= len(self.data):
+            self.lame_offset = pos
+
+    @classmethod
+    def detect(cls, frame, frame_bytes):
+        """Return an InfoTag if the frame is a Xing/Info frame, else None"""
+        tag = cls(frame, frame_bytes)
+        if tag.xing_offset is not None:
+            return tag
+        # VBRI headers cannot be rewritten; report them so they get dropped
+        if frame_bytes[36:40] == b"VBRI":
+            return False
+        return None
+
+    @property
+    def delay(self):
+        """Encoder delay in samples from the LAME tag (0 if unknown)"""
+        if self.lame_offset is None:
+            return 0
+        b = self.data[self.lame_offset + 21:self.lame_offset + 24]
+        return (b[0] << 4) | (b[1] >> 4)
+
+    @property
+    def padding(self):
+        """Encoder padding in samples from the LAME tag (0 if unknown)"""
+        if self.lame_offset is None:
+            return 0
+        b = self.data[self.lame_offset + 21:self.lame_offset + 24]
+        return ((b[1] & 0x0F) << 8) | b[2]
+
+    def rebuild(self, audio_frames, audio_bytes, delay=None, padding=None):
+        """
+        Rewrite counters, TOC, delay/padding and the tag CRC for an edited stream
+
+        Args:
+            audio_frames (list): Raw bytes of every audio frame that follows
+            audio_bytes (int): Total size of those frames
+            delay (int): New encoder delay (None keeps the current one)
+            padding (int): New encoder padding (None keeps the current one)
+
+        Returns:
+            bytes: Updated info frame
+        """
+        data = self.data
+        total_bytes = len(data) + audio_bytes
+
+        if self.frames_offset is not None:
+            data[self.frames_offset:self.frames_offset + 4] = struct.pack(">I", len(audio_frames))
+        if self.bytes_offset is not None:
+            data[self.bytes_offset:self.bytes_offset + 4] = struct.pack(">I", total_bytes)
+        if self.toc_offset is not None:
+            toc = bytearray(100)
+            count = len(audio_frames)
+            if count:
+                positions = []
+                pos = len(data)
+                for raw in audio_frames:
+                    positions.append(pos)
+                    pos += len(raw)
+                for i in range(100):
+                    index = min(count - 1, i * count // 100)
+                    toc[i] = min(255, positions[index] * 256 // total_bytes)
+            data[self.toc_offset:self.toc_offset + 100] = toc
+
+        if self.lame_offset is not None:
+            lame = self.lame_offset
+            new_delay = self.delay if delay is None else max(0, min(MAX_LAME_DELAY, delay))
+            new_padding = self.padding if padding is None else max(0, min(MAX_LAME_DELAY, padding))
+            data[lame + 21] = (new_delay >> 4) & 0xFF
+            data[lame + 22] = ((new_delay & 0x0F) << 4) | ((new_padding >> 8) & 0x0F)
+            data[lame + 23] = new_padding & 0xFF
+
+            data[lame + 28:lame + 32] = struct.pack(">I", total_bytes)
+            # The music CRC (lame + 32) is left as is: decoders do not check it
+            # and recomputing it byte by byte would cost more than the edit.
+            data[lame + 34:lame + 36] = struct.pack(">H", crc16_lame(bytes(data[:lame + 34])))
+
+        return bytes(data)
+
+
+class MP3Bitstream:
+    """
+    In-memory view of an MP3 file as a list of Layer III frames
+
+    All editing operations work on whole frames, so no audio is decoded or
+    re-encoded. Tags (ID3v1/v2, APEv2, Lyrics3) are never copied to the output.
+    """
+
+    def __init__(self, data):
+        self.data = bytes(data)
+        self.frames = []
+        self.info_tag = None
+        self._parse()
+
+    @classmethod
+    def from_file(cls, file_path):
+        """Load and parse an MP3 file"""
+        with open(file_path, "rb") as f:
+            return cls(f.read())
+
+    def _parse(self):
+        data = self.data
+        start = 0
+        # Some files carry several ID3v2 tags back to back
+        while True:
+            size = _id3v2_size(data, start)
+            if not size:
+                break
+            start += size
+        end = _trailing_tags_start(data, len(data))
+        self.leading_tags = data[:start]
+        self.trailing_tags = data[end:]
+
+        pos = start
+        reference = None
+        while pos + 4 <= end:
+            frame = parse_frame_header(data, pos)
+            if frame is None or pos + frame.size > end or (
+                    reference is not None and not self._compatible(reference, frame)):
+                pos += 1
+                continue
+
+            # Require the next header to line up before accepting the first sync
+            if reference is None:
+                next_pos = pos + frame.size
+                if next_pos + 4 <= end:
+                    following = parse_frame_header(data, next_pos)
+                    if following is None or not self._compatible(frame, following):
+                        pos += 1
+                        continue
+                reference = frame
+
+            self.frames.append(frame)
+            pos += frame.size
+
+        if not self.frames:
+            raise MP3FormatError("No MPEG Layer III frames found")
+
+        first = self.frames[0]
+        tag = InfoTag.detect(first, self.frame_bytes(first))
+        if tag is not None:
+            self.frames.pop(0)
+            self.info_tag = tag or None
+            if not self.frames:
+                raise MP3FormatError("Stream contains only an info frame")
+
+    @staticmethod
+    def _compatible(a, b):
+        return a.version == b.version and a.sample_rate == b.sample_rate
+
+    def frame_bytes(self, frame):
+        """Raw bytes of a frame"""
+        return self.data[frame.offset:frame.offset + frame.size]
+
+    @property
+    def sample_rate(self):
+        return self.frames[0].sample_rate
+
+    @property
+    def samples_per_frame(self):
+        return self.frames[0].samples
+
+    @property
+    def encoder_delay(self):
+        """Samples to skip at the start (encoder plus decoder delay)"""
+        if self.info_tag is not None and self.info_tag.lame_offset is not None:
+            return self.info_tag.delay + DECODER_DELAY
+        return 0
+
+    @property
+    def duration(self):
+        """Playable duration in seconds"""
+        samples = len(self.frames) * self.samples_per_frame
+        if self.info_tag is not None and self.info_tag.lame_offset is not None:
+            samples -= self.info_tag.delay + self.info_tag.padding
+        return max(0, samples) / self.sample_rate
+
+    def select(self, first=0, last=None):
+        """
+        Return a view of the stream restricted to frames[first:last]
+
+        The info tag is kept, so the result can be fed to concatenate_streams.
+        """
+        view = MP3Bitstream.__new__(MP3Bitstream)
+        view.data = self.data
+        view.frames = self.frames[first:last]
+        view.info_tag = self.info_tag
+        view.leading_tags = self.leading_tags
+        view.trailing_tags = self.trailing_tags
+        if not view.frames:
+            raise MP3FormatError("Selection contains no audio frames")
+        return view
+
+    def _reservoir_bytes(self, first_index):
+        """Main data bytes that frame first_index reads from the bit reservoir"""
+        needed = self.frames[first_index].main_data_begin
+        parts = []
+        index = first_index - 1
+        while needed > 0 and index >= 0:
+            frame = self.frames[index]
+            start = frame.offset + frame.side_info_offset + frame.side_info_size
+            area = self.data[start:frame.offset + frame.size]
+            take = area[-needed:] if needed < len(area) else area
+            parts.append(take)
+            needed -= len(take)
+            index -= 1
+        return b"".join(reversed(parts))
+
+    def render(self, first=0, last=None, end_samples=None, start_samples=None):
+        """
+        Serialise frames[first:last] into a standalone MP3 stream
+
+        When the first kept frame borrows bytes from the bit reservoir, a
+        single silent frame carrying those bytes is put in front of it, and the
+        LAME tag (if any) is updated so gapless-aware decoders skip it.
+
+        Args:
+            first (int): Index of the first frame to keep
+            last (int): Index one past the last frame to keep
+            end_samples (int): Exact output length to signal through padding
+            start_samples (int): Output start position in stream samples
+
+        Returns:
+            bytes: New bitstream without tags
+        """
+        last = len(self.frames) if last is None else last
+        spf = self.samples_per_frame
+        chunks = []
+
+        priming = 0
+        if first > 0 and self.frames[first].main_data_begin > 0:
+            template = self.frames[first]
+            chunks.append(build_priming_frame(
+                self.frame_bytes(template), template, self._reservoir_bytes(first)))
+            priming = 1
+        for frame in self.frames[first:last]:
+            chunks.append(self.frame_bytes(frame))
+
+        if self.info_tag is None:
+            return b"".join(chunks)
+
+        delay = padding = None
+        if self.info_tag.lame_offset is not None:
+            if start_samples is not None and first > 0:
+                delay = start_samples - first * spf + priming * spf - DECODER_DELAY
+            if end_samples is not None:
+                total = len(chunks) * spf
+                current_delay = self.info_tag.delay if delay is None else delay
+                padding = total - current_delay - end_samples
+        audio_bytes = sum(len(c) for c in chunks)
+        header = self.info_tag.rebuild(chunks, audio_bytes, delay=delay, padding=padding)
+        return header + b"".join(chunks)
+
+    def trim(self, duration=None, start=0.0):
+        """
+        Cut the stream on frame boundaries
+
+        Args:
+            duration (float): Seconds to keep (None keeps everything after start)
+            start (float): Seconds to skip at the beginning
+
+        Returns:
+            bytes: Trimmed bitstream
+        """
+        spf = self.samples_per_frame
+        rate = self.sample_rate
+        skip = self.encoder_delay
+        gapless = skip > 0
+
+        if start > 0:
+            start_samples = int(round(start * rate)) + skip
+            if gapless:
+                # Keep one decoder delay of lead-in so the cut point decodes cleanly
+                first = max(0, (start_samples - DECODER_DELAY) // spf)
+            else:
+                first = start_samples // spf
+        else:
+            start_samples = None
+            first = 0
+
+        if duration is not None and duration > 0:
+            out_samples = int(round(duration * rate))
+            base = start_samples if start_samples is not None else skip
+            last = min(len(self.frames), -(-(base + out_samples) // spf))
+        else:
+            out_samples = None
+            last = len(self.frames)
+
+        if first >= last:
+            raise MP3FormatError("Trim range selects no audio frames")
+
+        if out_samples is not None and last == len(self.frames):
+            out_samples = None  # stream ends before the requested duration
+        return self.render(first, last, end_samples=out_samples, start_samples=start_samples)
+
+
+def _default_file_mode():
+    """Permission bits a plain open() would give a new file"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def write_atomic(output_path, payload):
+    """
+    Write bytes next to output_path and rename into place
+
+    Readers never see a partly written file.
+
+    Args:
+        output_path (str): Destination file
+        payload (bytes): File contents
+
+    Returns:
+        str: output_path
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(suffix=".mp3", dir=output_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        # mkstemp creates 0600 files; give the output normal permissions
+        os.chmod(temp_path, _default_file_mode())
+        os.replace(temp_path, output_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return output_path
+
+
+def is_mp3(file_path):
+    """Check whether a file can be handled by the bitstream editor"""
+    if Path(file_path).suffix.lower() != ".mp3":
+        return False
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(10)
+    except OSError:
+        return False
+    return head[:3] == b"ID3" or (len(head) >= 2 and head[0] == 0xFF and (head[1] & 0xE0) == 0xE0)
+
+
+def strip_tags(input_path, output_path=None):
+    """
+    Remove ID3v1/ID3v2/APE/Lyrics3 tags without touching the audio frames
+
+    Args:
+        input_path (str): Source MP3
+        output_path (str): Destination (defaults to rewriting input_path)
+
+    Returns:
+        str: Path of the cleaned file
+    """
+    stream = MP3Bitstream.from_file(input_path)
+    return write_atomic(output_path or input_path, stream.render())
+
+
+def trim(input_path, output_path, duration, start=0.0, keep_tags=False):
+    """
+    Trim an MP3 on frame boundaries (equivalent to ffmpeg -ss/-t, no re-encode)
+
+    Args:
+        input_path (str): Source MP3
+        output_path (str): Destination MP3
+        duration (float): Seconds to keep (None or 0 keeps the rest)
+        start (float): Seconds to skip at the beginning
+        keep_tags (bool): Copy the source tags to the output unchanged
+
+    Returns:
+        str: Path of the trimmed file
+    """
+    stream = MP3Bitstream.from_file(input_path)
+    payload = stream.trim(duration=duration, start=start)
+    if keep_tags:
+        payload = stream.leading_tags + payload + stream.trailing_tags
+    return write_atomic(output_path, payload)
+
+
+def concatenate(input_paths, output_path):
+    """
+    Join MP3 streams with matching sample rate and MPEG version
+
+    The info frame of the first stream is kept and updated; info frames and
+    tags of the other inputs are dropped.
+
+    Args:
+        input_paths (list): Source MP3 files in playback order
+        output_path (str): Destination MP3
+
+    Returns:
+        str: Path of the joined file
+    """
+    if not input_paths:
+        raise ValueError("No input files to concatenate")
+
+    streams = [MP3Bitstream.from_file(path) for path in input_paths]
+    return write_atomic(output_path, concatenate_streams(streams))
+
+
+def concatenate_streams(streams, padding=None):
+    """
+    Join parsed streams into one bitstream
+
+    Args:
+        streams (list): MP3Bitstream objects in playback order
+        padding (int): Encoder padding to record in the LAME tag (None keeps it)
+
+    Returns:
+        bytes: Joined bitstream
+    """
+    reference = streams[0].frames[0]
+    chunks = []
+    for stream in streams:
+        first = stream.frames[0]
+        if first.version != reference.version or first.sample_rate != reference.sample_rate:
+            raise MP3FormatError("Cannot concatenate streams with different sample rates")
+        for frame in stream.frames:
+            chunks.append(stream.frame_bytes(frame))
+
+    info_tag = streams[0].info_tag
+    if info_tag is None:
+        return b"".join(chunks)
+
+    if padding is None and len(streams) > 1 and streams[-1].info_tag is not None:
+        padding = streams[-1].info_tag.padding
+    audio_bytes = sum(len(c) for c in chunks)
+    return info_tag.rebuild(chunks, audio_bytes, padding=padding) + b"".join(chunks)
@@ -0,0 +1,114 @@
+"""
+Segment-parallel MP3 encoding for SunoReady
+Splits processed PCM into frame-aligned segments, encodes them in parallel
+FFmpeg processes and joins the frames back into one gapless stream
+"""
+
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import mp3_utils
+from scratch_space import get_scratch_space
+
+# Frames of real audio encoded on each side of a segment so the encoder's
+# filterbank and psychoacoustic state match a single continuous encode
+OVERLAP_FRAMES = 8
+
+
+class ParallelMP3Encoder:
+    """Encode long PCM buffers to MP3 using several FFmpeg processes at once"""
+
+    def __init__(self, config=None, max_workers=None):
+        self.config = config or {}
+        self.max_workers = max_workers or self.config.get('encode_workers') or os.cpu_count() or 1
+        self.segment_seconds = float(self.config.get('encode_segment_seconds', 60))
+        self.bitrate = self.config.get('default_output_quality', '320k')
+        self.ffmpeg_path = self.config.get('ffmpeg_path', 'ffmpeg')
+
+    def should_use(self, n_samples, sr):
+        """Check whether splitting is worthwhile for a buffer of this length"""
+        min_seconds = float(self.config.get('parallel_encode_min_seconds', 300))
+        return self.max_workers > 1 and n_samples / float(sr) >= min_seconds
+
+    def plan_segments(self, n_samples, sr):
+        """
+        Split n_samples into frame-aligned segments
+
+        Returns:
+            list: (keep_start, keep_end, chunk_start, chunk_end) sample tuples
+        """
+        spf = 1152 if sr >= 32000 else 576
+        frames_total = -(-n_samples // spf)
+        frames_per_segment = max(OVERLAP_FRAMES * 4, int(self.segment_seconds * sr) // spf)
+        pad = OVERLAP_FRAMES * spf
+
+        segments = []
+        for first_frame in range(0, frames_total, frames_per_segment):
+            keep_start = first_frame * spf
+            keep_end = min(n_samples, (first_frame + frames_per_segment) * spf)
+            chunk_start = max(0, keep_start - pad)
+            chunk_end = min(n_samples, keep_end + pad)
+            segments.append((keep_start, keep_end, chunk_start, chunk_end))
+        return segments
+
+    def encode(self, y, sr, output_path):
+        """
+        Encode a float PCM buffer to MP3
+
+        Args:
+            y (np.ndarray): Audio, shape (samples,) or (channels, samples)
+            sr (int): Sample rate
+            output_path (str): Destination MP3
+
+        Returns:
+            str: output_path
+        """
+        pcm = np.asarray(y, dtype=np.float32)
+        channels = 1 if pcm.ndim == 1 else pcm.shape[0]
+        interleaved = pcm if pcm.ndim == 1 else pcm.T
+        n_samples = interleaved.shape[0]
+
+        segments = self.plan_segments(n_samples, sr)
+        spf = 1152 if sr >= 32000 else 576
+        # Segments are small next to the caller's own reservation; reserving
+        # nothing here keeps a nested job from waiting on its parent's quota
+        with get_scratch_space(self.config).open_job('encode') as job:
+            def encode_segment(index):
+                keep_start, keep_end, chunk_start, chunk_end = segments[index]
+                segment_path = os.path.join(job.path, f"segment_{index:05d}.mp3")
+                chunk = np.ascontiguousarray(interleaved[chunk_start:chunk_end])
+                self._encode_chunk(chunk, sr, channels, segment_path)
+
+                stream = mp3_utils.MP3Bitstream.from_file(segment_path)
+                first = (keep_start - chunk_start) // spf
+                is_last = index == len(segments) - 1
+                # The last segment keeps the encoder's flush frames
+                last = None if is_last else first + (keep_end - keep_start) // spf
+                view = stream.select(first, last)
+                if first > 0 and view.frames[0].main_data_begin:
+                    raise mp3_utils.MP3FormatError("Segment starts inside the bit reservoir")
+                return view
+
+            workers = min(self.max_workers, len(segments))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                streams = list(executor.map(encode_segment, range(len(segments))))
+
+            payload = mp3_utils.concatenate_streams(streams)
+            return mp3_utils.write_atomic(output_path, payload)
+
+    def _encode_chunk(self, chunk, sr, channels, output_path):
+        """Pipe raw float PCM into one FFmpeg process"""
+        cmd = [
+            self.ffmpeg_path, '-y', '-v', 'error',
+            '-f', 'f32le', '-ar', str(sr), '-ac', str(channels), '-i', 'pipe:0',
+            '-c:a', 'libmp3lame', '-b:a', self.bitrate,
+            # Every frame must be self-contained so segments can be spliced
+            '-reservoir', '0',
+            output_path
+        ]
+        result = subprocess.run(cmd, input=chunk.tobytes(), capture_output=True)
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg segment encode failed: {result.stderr.decode(errors='replace')}")
@@ -0,0 +1,217 @@
+"""
+Performance monitor for SunoReady
+Processors time their stages with stage_timer; the batch executor collects
+those timings per job together with completions, queue depth and active
+workers into a PerfMonitor, which the Performance tab reads as snapshots
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import psutil
+    psutil_available = True
+except ImportError:
+    psutil = None
+    psutil_available = False
+
+from concurrency_controller import CpuSampler
+
+_local = threading.local()
+
+
+def record_stage(name, seconds):
+    """Add stage time to every StageCollector active in this thread"""
+    for collector in getattr(_local, 'collectors', ()):
+        collector.add(name, seconds)
+
+
+@contextmanager
+def stage_timer(name):
+    """Time a block as a processing stage (decode, dsp, encode, metadata, ...)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+class StageCollector:
+    """
+    Sums the stage times recorded in the current thread while active
+
+    Used as a context manager around one job (or one stage of a job), so
+    timings from concurrent jobs in other threads are never mixed in.
+    """
+
+    def __init__(self):
+        self.totals = {}
+
+    def add(self, name, seconds):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    def __enter__(self):
+        if not hasattr(_local, 'collectors'):
+            _local.collectors = []
+        _local.collectors.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.collectors.remove(self)
+        return False
+
+
+def process_rss():
+    """Resident memory of this process and its children (batch workers), in bytes"""
+    if psutil_available:
+        try:
+            process = psutil.Process()
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        except psutil.Error:
+            return None
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class PerfMonitor:
+    """Thread-safe aggregate of batch throughput, queue state and stage times"""
+
+    def __init__(self, config=None, clock=time.monotonic, sampler=None):
+        """
+        Args:
+            config (dict): App configuration (perf_window: seconds of history
+                used for the throughput rates)
+            clock (callable): Time source in seconds
+            sampler (callable): Returns {'cpu': 0..1 or None} (default: system CPU)
+        """
+        self.config = config or {}
+        self.window = float(self.config.get('perf_window', 60.0))
+        self.clock = clock
+        self.sampler = sampler or CpuSampler(os.cpu_count() or 1)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # (time, wall seconds, audio seconds) per processed file
+            self._completions = deque()
+            self._since = self.clock()
+            self.stage_seconds = {}
+            self.stage_counts = {}
+            self.processed = 0
+            self.failed = 0
+            self.queue_depth = 0
+            self.active_workers = 0
+            self.workers = 0
+
+    def batch_started(self, jobs, workers):
+        """A batch of jobs is about to run on up to workers workers"""
+        with self._lock:
+            if not self.queue_depth and not self.active_workers:
+                # Idle before: measure rates from now on
+                self._since = self.clock()
+                self._completions.clear()
+            self.queue_depth += jobs
+            self.workers = workers
+
+    def batch_finished(self):
+        with self._lock:
+            self.queue_depth = 0
+            self.active_workers = 0
+
+    def set_active(self, active, queued=None):
+        """Jobs running right now (and, optionally, jobs not started yet)"""
+        with self._lock:
+            self.active_workers = active
+            if queued is not None:
+                self.queue_depth = queued
+
+    def file_finished(self, wall_seconds, audio_seconds=None, ok=True, stages=None):
+        """
+        Record a processed (or failed) file
+
+        Args:
+            wall_seconds (float): Processing time of the file
+            audio_seconds (float): Duration of its audio, for the ×realtime rate
+            ok (bool): False for a failure
+            stages (dict): Stage name -> seconds spent on this file
+        """
+        with self._lock:
+            if ok:
+                self.processed += 1
+                self._completions.append((self.clock(), wall_seconds or 0.0, audio_seconds or 0.0))
+            else:
+                self.failed += 1
+        if stages:
+            self.record_stages(stages)
+
+    def record_stages(self, stages):
+        with self._lock:
+            for name, seconds in stages.items():
+                self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+                self.stage_counts[name] = self.stage_counts.get(name, 0) + 1
+
+    def snapshot(self):
+        """
+        Current figures for display
+
+        Returns:
+            dict: files_per_min, realtime (audio seconds per wall second),
+                queue_depth, active_workers, workers, processed, failed,
+                stages ({name: {'seconds', 'share', 'count'}}), cpu (0..1),
+                rss (bytes)
+        """
+        now = self.clock()
+        with self._lock:
+            while self._completions and now - self._completions[0][0] > self.window:
+                self._completions.popleft()
+            span = max(1e-3, min(self.window, now - self._since))
+            done = len(self._completions)
+            audio = sum(item[2] for item in self._completions)
+            total_stage = sum(self.stage_seconds.values())
+            stages = {
+                name: {
+                    'seconds': seconds,
+                    'share': seconds / total_stage if total_stage else 0.0,
+                    'count': self.stage_counts.get(name, 0),
+                }
+                for name, seconds in sorted(self.stage_seconds.items(), key=lambda item: -item[1])
+            }
+            snapshot = {
+                'files_per_min': done * 60.0 / span,
+                'realtime': audio / span,
+                'queue_depth': self.queue_depth,
+                'active_workers': self.active_workers,
+                'workers': self.workers,
+                'processed': self.processed,
+                'failed': self.failed,
+                'stages': stages,
+            }
+        try:
+            snapshot['cpu'] = self.sampler().get('cpu')
+        except Exception:
+            snapshot['cpu'] = None
+        snapshot['rss'] = process_rss()
+        return snapshot
+
+
+def format_bytes(count):
+    """Format a byte count as '512 KB', '1.4 GB', ..."""
+    if count is None:
+        return "n/a"
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if count < 1024 or unit == 'GB':
+            return f"{count:.0f} {unit}" if unit in ('B', 'KB') else f"{count:.1f} {unit}"
+        count /= 1024.0
@@ -0,0 +1,99 @@
+"""
+Step sequences shared by the processors' sync and async entry points
+A processor writes its pipeline once as a generator that yields Command and
+Call steps; run_steps() executes them inline and run_steps_async() under an
+AsyncSubprocessRunner, so both entry points run the same sequence
+"""
+
+import subprocess
+from contextlib import nullcontext
+
+from perf_monitor import stage_timer
+
+
+class Command:
+    """Child process step; the generator receives the finished process"""
+
+    def __init__(self, cmd, error_prefix=None, stage=None):
+        """
+        Args:
+            cmd (list): Command line
+            error_prefix (str): Raise "<error_prefix>: <stderr>" on a non-zero
+                exit; None hands the failed result back to the generator
+            stage (str): stage_timer name to record the step under
+        """
+        self.cmd = cmd
+        self.error_prefix = error_prefix
+        self.stage = stage
+
+
+class Call:
+    """Blocking function step; the generator receives its return value"""
+
+    def __init__(self, func, *args, tool='cpu', stage=None):
+        """
+        Args:
+            func: Function to call with args
+            tool (str): Runner executor to use in async mode ('cpu', 'scratch', ...)
+            stage (str): stage_timer name to record the step under
+        """
+        self.func = func
+        self.args = args
+        self.tool = tool
+        self.stage = stage
+
+
+def _timed(step):
+    return stage_timer(step.stage) if step.stage else nullcontext()
+
+
+def _check(step, result):
+    if step.error_prefix is not None and result.returncode != 0:
+        raise Exception(f"{step.error_prefix}: {result.stderr}")
+    return result
+
+
+def run_steps(steps):
+    """
+    Run a step generator in the calling thread
+
+    Returns:
+        The generator's return value
+    """
+    value = None
+    try:
+        while True:
+            try:
+                step = steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+            with _timed(step):
+                if isinstance(step, Command):
+                    value = _check(step, subprocess.run(step.cmd, capture_output=True, text=True))
+                else:
+                    value = step.func(*step.args)
+    finally:
+        steps.close()
+
+
+async def run_steps_async(steps, runner):
+    """
+    Run a step generator under an AsyncSubprocessRunner's concurrency limits
+
+    Returns:
+        The generator's return value
+    """
+    value = None
+    try:
+        while True:
+            try:
+                step = steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+            with _timed(step):
+                if isinstance(step, Command):
+                    value = _check(step, await runner.run(step.cmd))
+                else:
+                    value = await runner.run_blocking(step.func, *step.args, tool=step.tool)
+    finally:
+        steps.close()
@@ -0,0 +1,220 @@
+"""
+Excerpt previews for SunoReady
+Renders a 10-20 second window of a file with the current settings in one
+FFmpeg call: the input is seeked rather than decoded from the start, and
+pitch uses FFmpeg's resampler instead of librosa's phase vocoder, so trying
+a setting costs a fraction of a second instead of a full render
+"""
+
+import os
+import subprocess
+import threading
+import time
+import wave
+from pathlib import Path
+
+try:
+    import pyaudio
+    pyaudio_available = True
+except ImportError:
+    pyaudio = None
+    pyaudio_available = False
+
+try:
+    import winsound
+    winsound_available = True
+except ImportError:
+    winsound = None
+    winsound_available = False
+
+from concurrency_controller import ffmpeg_thread_args
+
+PREVIEW_RATE = 44100
+PREVIEW_CHANNELS = 2
+MIN_PREVIEW_SECONDS = 10.0
+MAX_PREVIEW_SECONDS = 20.0
+
+
+def choose_start(duration, seconds):
+    """
+    Default excerpt start: a third of the way in (past most intros), kept
+    inside the file
+
+    Args:
+        duration (float): File duration in seconds (None if unknown)
+        seconds (float): Length of the excerpt in input seconds
+    """
+    if not duration:
+        return 0.0
+    return max(0.0, min(duration / 3.0, duration - seconds))
+
+
+def pitch_filters(semitones, sample_rate=PREVIEW_RATE):
+    """
+    Resampler-based pitch shift: play faster or slower, resample back and
+    restore the tempo with atempo
+
+    Less transparent than a phase vocoder on large shifts, but it runs in
+    real time many times over, which is what a preview needs.
+    """
+    if not semitones:
+        return []
+    # atempo accepts 0.5..2, which covers an octave either way
+    semitones = max(-12.0, min(12.0, float(semitones)))
+    ratio = 2 ** (semitones / 12.0)
+    return [f'asetrate={sample_rate * ratio:.3f}', f'aresample={sample_rate}', f'atempo={1.0 / ratio:.6f}']
+
+
+class Preview:
+    """A rendered excerpt: 16-bit PCM in memory and the WAV written from it"""
+
+    def __init__(self, input_path, path, pcm, start, seconds, render_seconds):
+        self.input_path = input_path
+        self.path = path
+        self.pcm = pcm
+        self.sample_rate = PREVIEW_RATE
+        self.channels = PREVIEW_CHANNELS
+        self.start = start
+        self.seconds = seconds
+        self.render_seconds = render_seconds
+
+    @property
+    def duration(self):
+        return len(self.pcm) / float(2 * self.channels * self.sample_rate)
+
+
+class PreviewRenderer:
+    """Renders excerpts with the lightning processor's FFmpeg filter chain"""
+
+    def __init__(self, config=None, lightning_processor=None):
+        """
+        Args:
+            config (dict): App configuration (preview_seconds, preview_folder)
+            lightning_processor (LightningProcessor): Supplies the tempo,
+                normalize and highpass filters (built on first use if None)
+        """
+        self.config = config or {}
+        self.lightning_processor = lightning_processor
+        self.preview_folder = self.config.get('preview_folder', 'output/previews')
+
+    def filters(self, options):
+        """FFmpeg filters applying options (app-level naming) to the excerpt"""
+        from processor_planner import translate_options
+        if self.lightning_processor is None:
+            from lightning_processor import LightningProcessor
+            self.lightning_processor = LightningProcessor(config=self.config)
+        options = translate_options('lightning', options)
+        # Everything runs at one rate so asetrate's ratio is exact
+        return ([f'aresample={PREVIEW_RATE}'] + pitch_filters(options.get('pitch_semitones', 0))
+                + self.lightning_processor.build_filter_chain(options))
+
+    def render(self, input_path, options, start=None, seconds=None, duration=None):
+        """
+        Render an excerpt of input_path with options
+
+        Args:
+            input_path (str): Source file
+            options (dict): Processing options in app-level naming
+                (tempo_change, pitch_semitones, normalize, apply_highpass)
+            start (float): Excerpt start in the source, seconds (default:
+                a third of the way in)
+            seconds (float): Excerpt length as heard, 10-20 s (default:
+                preview_seconds, 15)
+            duration (float): Source duration if known, to place the default start
+
+        Returns:
+            Preview
+        """
+        began = time.perf_counter()
+        seconds = float(seconds or self.config.get('preview_seconds', 15.0))
+        seconds = max(MIN_PREVIEW_SECONDS, min(MAX_PREVIEW_SECONDS, seconds))
+        # Faster tempo consumes more source per second heard
+        source_seconds = seconds * float(options.get('tempo_change', 100.0)) / 100.0
+        if start is None:
+            start = choose_start(duration, source_seconds)
+
+        cmd = ['ffmpeg', '-v', 'error', *ffmpeg_thread_args(),
+               # -ss before -i seeks in the container instead of decoding up to start
+               '-ss', f'{start:.3f}', '-t', f'{source_seconds:.3f}', '-i', input_path,
+               '-vn', '-af', ','.join(self.filters(options)),
+               '-ac', str(PREVIEW_CHANNELS), '-ar', str(PREVIEW_RATE), '-f', 's16le', 'pipe:1']
+        try:
+            result = subprocess.run(cmd, capture_output=True)
+        except FileNotFoundError:
+            raise Exception("FFmpeg not found. Please install FFmpeg and add it to your PATH.")
+        if result.returncode != 0:
+            raise Exception(f"Preview render failed: {result.stderr.decode(errors='replace').strip()}")
+        if not result.stdout:
+            raise Exception(f"Preview render failed: nothing to play after {start:.1f}s")
+
+        os.makedirs(self.preview_folder, exist_ok=True)
+        path = os.path.join(self.preview_folder, f"{Path(input_path).stem}_preview.wav")
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(PREVIEW_CHANNELS)
+            f.setsampwidth(2)
+            f.setframerate(PREVIEW_RATE)
+            f.writeframes(result.stdout)
+        return Preview(input_path, path, result.stdout, start, seconds, time.perf_counter() - began)
+
+
+class PreviewPlayer:
+    """Plays one preview at a time (PyAudio, or winsound on Windows)"""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def available(self):
+        return pyaudio_available or winsound_available
+
+    def play(self, preview):
+        """
+        Start playing preview, stopping the one playing now
+
+        Returns:
+            bool: False when no audio output is available
+        """
+        self.stop()
+        if pyaudio_available:
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._play_pyaudio, args=(preview, self._stop),
+                                            daemon=True, name="preview-player")
+            self._thread.start()
+            return True
+        if winsound_available:
+            winsound.PlaySound(preview.path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+            return True
+        return False
+
+    def _play_pyaudio(self, preview, stop):
+        audio = None
+        stream = None
+        try:
+            audio = pyaudio.PyAudio()
+            stream = audio.open(format=pyaudio.paInt16, channels=preview.channels,
+                                rate=preview.sample_rate, output=True)
+            chunk = 4096 * 2 * preview.channels
+            for offset in range(0, len(preview.pcm), chunk):
+                if stop.is_set():
+                    break
+                stream.write(preview.pcm[offset:offset + chunk])
+        except Exception as e:
+            print(f"Warning: preview playback failed: {e}")
+        finally:
+            try:
+                if stream is not None:
+                    stream.stop_stream()
+                    stream.close()
+                if audio is not None:
+                    audio.terminate()
+            except:
+                pass
+
+    def stop(self):
+        self._stop.set()
+        if winsound_available and not pyaudio_available:
+            winsound.PlaySound(None, 0)
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
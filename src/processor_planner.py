@@ -0,0 +1,417 @@
+"""
+Cost-model-driven processor selection for SunoReady
+Predicts wall time for every processing backend from measured per-stage
+cost tables and routes each job to the cheapest backend that supports the
+requested options
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from mutagen import File as MutagenFile
+    mutagen_available = True
+except ImportError:
+    MutagenFile = None
+    mutagen_available = False
+
+try:
+    from scipy.optimize import nnls
+    scipy_available = True
+except ImportError:
+    nnls = None
+    scipy_available = False
+
+try:
+    import soundfile as sf
+    soundfile_available = True
+except ImportError:
+    sf = None
+    soundfile_available = False
+
+# Order also breaks ties between equally cheap backends
+BACKENDS = ['lightning', 'fast', 'standard']
+
+# Features each backend can apply
+CAPABILITIES = {
+    'lightning': {'pitch', 'tempo', 'normalize', 'highpass', 'trim', 'metadata'},
+    'fast': {'pitch', 'tempo', 'normalize', 'highpass', 'fade', 'trim', 'metadata'},
+    'standard': {'pitch', 'tempo', 'normalize', 'highpass', 'noise', 'fade', 'trim', 'metadata'},
+}
+
+# Prior cost tables: stage -> [fixed seconds, seconds per second of audio].
+# Measured tables loaded from disk take precedence.
+DEFAULT_COSTS = {
+    'lightning': {
+        'startup': [0.05, 0.0], 'copy': [0.01, 0.0005], 'encode': [0.1, 0.012],
+        'pitch': [0.6, 0.08], 'tempo': [0.0, 0.002], 'normalize': [0.0, 0.004],
+        'highpass': [0.0, 0.001],
+    },
+    'fast': {
+        'startup': [0.05, 0.0], 'copy': [0.01, 0.0005], 'encode': [0.1, 0.012],
+        'pitch': [0.1, 0.015], 'tempo': [0.1, 0.015], 'fade': [0.15, 0.016],
+        'normalize': [0.0, 0.004], 'highpass': [0.0, 0.001],
+    },
+    'standard': {
+        'startup': [0.05, 0.0], 'decode': [0.3, 0.01], 'encode': [0.1, 0.015],
+        'copy': [0.01, 0.0005], 'pitch': [0.6, 0.08], 'tempo': [0.1, 0.015],
+        'normalize': [0.0, 0.0005], 'noise': [0.0, 0.001], 'highpass': [0.0, 0.001],
+        'fade': [0.3, 0.02], 'metadata': [0.02, 0.0005],
+    },
+}
+
+# Observations kept per backend for refitting
+MAX_SAMPLES = 500
+
+
+def requested_features(options):
+    """
+    Map app-level options to the set of features a job needs
+
+    Args:
+        options (dict): Options named like the config keys (tempo_change in
+            percent, pitch_semitones, normalize, apply_highpass, add_noise,
+            fade_in/fade_out, trim_duration, clean_metadata, tempo_stretch)
+    """
+    features = set()
+    if options.get('pitch_semitones', 0):
+        features.add('pitch')
+    if _tempo_rate(options) != 1.0:
+        features.add('tempo')
+    if options.get('normalize', False):
+        features.add('normalize')
+    if options.get('apply_highpass', False):
+        features.add('highpass')
+    if options.get('add_noise', False):
+        features.add('noise')
+    if options.get('fade_in', False) or options.get('fade_out', False):
+        features.add('fade')
+    if options.get('trim_duration'):
+        features.add('trim')
+    if options.get('clean_metadata', False):
+        features.add('metadata')
+    return features
+
+
+def _tempo_rate(options):
+    """Combined speed factor of tempo_change (percent) and tempo_stretch (ratio)"""
+    return float(options.get('tempo_change', 100.0)) / 100.0 * float(options.get('tempo_stretch', 1.0))
+
+
+def backend_stages(backend, features, input_format):
+    """List the cost-table stages a backend runs for a set of features"""
+    copy_only = input_format == '.mp3' and features <= {'trim', 'metadata'}
+    stages = ['startup']
+
+    if backend == 'lightning':
+        if copy_only:
+            return stages + ['copy']
+        # Pitch is rendered to WAV first, everything else is one FFmpeg pass
+        order = ['pitch', 'tempo', 'normalize', 'highpass']
+        return stages + [f for f in order if f in features] + ['encode']
+
+    if backend == 'fast':
+        # Tempo, pitch and fade are separate FFmpeg passes (costed per stage);
+        # the final pass only copies an untouched MP3 input
+        passes = [f for f in ('tempo', 'pitch', 'fade') if f in features]
+        filters = [f for f in ('normalize', 'highpass') if f in features]
+        final = 'encode' if filters or passes or input_format != '.mp3' else 'copy'
+        return stages + passes + filters + [final]
+
+    # AudioProcessor.process_audio_enhanced
+    if 'tempo' in features:
+        stages.append('tempo')
+    dsp = [f for f in ('pitch', 'normalize', 'noise', 'highpass') if f in features]
+    if dsp:
+        stages += ['decode'] + dsp + ['encode']
+    if 'fade' in features:
+        stages.append('fade')
+    if 'trim' in features:
+        stages.append('copy' if input_format == '.mp3' else 'encode')
+    if 'metadata' in features:
+        stages.append('metadata')
+    return stages
+
+
+def translate_options(backend, options):
+    """Rename app-level options to the keyword arguments a backend expects"""
+    rate = _tempo_rate(options)
+    common = {
+        'normalize': options.get('normalize', False),
+        'apply_highpass': options.get('apply_highpass', False),
+        'clean_metadata': options.get('clean_metadata', False),
+        'trim_duration': options.get('trim_duration'),
+    }
+    pitch = options.get('pitch_semitones', 0)
+
+    if backend == 'lightning':
+        tempo_change = float(options.get('tempo_change', 100.0)) * float(options.get('tempo_stretch', 1.0))
+        return dict(common, tempo_change=tempo_change, pitch_semitones=pitch)
+
+    fades = {
+        'fade_in': options.get('fade_in', False),
+        'fade_out': options.get('fade_out', False),
+        'fade_in_duration': options.get('fade_in_duration', 3.0),
+        'fade_out_duration': options.get('fade_out_duration', 3.0),
+    }
+    if backend == 'fast':
+        return dict(common, tempo_stretch=rate, pitch_shift=pitch, **fades)
+
+    # process_audio_enhanced: FFmpeg tempo stretch, librosa for the rest
+    return dict(common, tempo_stretch=rate, pitch_shift=pitch,
+                add_noise=options.get('add_noise', False), **fades)
+
+
+def probe_duration(file_path):
+    """Input duration in seconds (mutagen, then soundfile, then a size estimate)"""
+    if mutagen_available:
+        try:
+            audio = MutagenFile(file_path)
+            if audio is not None and audio.info and audio.info.length:
+                return float(audio.info.length)
+        except Exception:
+            pass
+    if soundfile_available:
+        try:
+            return float(sf.info(file_path).duration)
+        except Exception:
+            pass
+    try:
+        # Assume 128 kbps when nothing can read the header
+        return os.path.getsize(file_path) / 16000.0
+    except OSError:
+        return 0.0
+
+
+def run_backend(processor, backend, input_path, output_path, progress_callback, options):
+    """Call the processing entry point of a backend with translated options"""
+    if backend == 'lightning':
+        return processor.process_lightning_fast(input_path, output_path, progress_callback, **options)
+    if backend == 'fast':
+        return processor.process_audio_fast(input_path, output_path, progress_callback, **options)
+    return processor.process_audio_enhanced(input_path, output_path, progress_callback, **options)
+
+
+def create_processor(backend, config):
+    """Build a processor instance for a backend name"""
+    if backend == 'lightning':
+        from lightning_processor import LightningProcessor
+        return LightningProcessor(config)
+    if backend == 'fast':
+        from fast_processor import FastAudioProcessor
+        return FastAudioProcessor(config)
+    from audio_utils import AudioProcessor
+    return AudioProcessor(config)
+
+
+class JobPlan:
+    """Routing decision for one job"""
+
+    def __init__(self, backend, estimates, options, duration, features):
+        self.backend = backend
+        self.estimates = estimates
+        self.options = options
+        self.duration = duration
+        self.features = features
+
+    @property
+    def predicted_seconds(self):
+        return self.estimates[self.backend]
+
+    def __repr__(self):
+        return f"JobPlan({self.backend}, {self.predicted_seconds:.2f}s)"
+
+
+class ProcessorPlanner:
+    """Predict per-backend wall time and route jobs to the cheapest one"""
+
+    def __init__(self, config=None, backends=None, cost_file=None):
+        """
+        Args:
+            config (dict): App configuration
+            backends (dict): Backend name -> processor instance
+            cost_file (str): JSON file with measured cost tables
+        """
+        self.config = config or {}
+        self.backends = dict(backends or {})
+        self.cost_file = cost_file or self.config.get('planner_cost_file', 'config/cost_model.json')
+        self.costs = {name: {k: list(v) for k, v in table.items()} for name, table in DEFAULT_COSTS.items()}
+        self.samples = {name: [] for name in BACKENDS}
+        self._lock = threading.Lock()
+        self.load()
+
+    def available_backends(self):
+        """Backends that have a processor attached"""
+        return [name for name in BACKENDS if self.backends.get(name) is not None]
+
+    def load(self):
+        """Load measured cost tables and observations from disk"""
+        if not os.path.exists(self.cost_file):
+            return
+        try:
+            with open(self.cost_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Warning: could not read cost model {self.cost_file}: {e}")
+            return
+        for name, table in data.get('costs', {}).items():
+            self.costs.setdefault(name, {}).update({k: list(v) for k, v in table.items()})
+        for name, samples in data.get('samples', {}).items():
+            self.samples[name] = list(samples)[-MAX_SAMPLES:]
+
+    def save(self):
+        """Write cost tables and observations to disk atomically"""
+        with self._lock:
+            data = {'version': 1, 'costs': self.costs, 'samples': self.samples}
+            payload = json.dumps(data, indent=1)
+        directory = os.path.dirname(os.path.abspath(self.cost_file))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = self.cost_file + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(temp_path, self.cost_file)
+
+    def estimate(self, backend, stages, duration):
+        """Predicted wall time for a list of stages"""
+        table = self.costs[backend]
+        total = 0.0
+        for stage in stages:
+            fixed, per_second = table.get(stage, [0.0, 0.0])
+            total += fixed + per_second * duration
+        return total
+
+    def plan(self, input_path, options, duration=None):
+        """
+        Choose the cheapest backend that supports every requested option
+
+        Args:
+            input_path (str): Input file
+            options (dict): App-level options (see requested_features)
+            duration (float): Input duration if already known
+
+        Returns:
+            JobPlan: Chosen backend, all estimates and translated options
+        """
+        features = requested_features(options)
+        if duration is None:
+            duration = probe_duration(input_path)
+        input_format = Path(input_path).suffix.lower()
+
+        estimates = {}
+        for name in self.available_backends():
+            if features <= CAPABILITIES[name]:
+                stages = backend_stages(name, features, input_format)
+                estimates[name] = self.estimate(name, stages, duration)
+
+        if not estimates:
+            raise Exception(f"No processor supports the requested options: {', '.join(sorted(features))}")
+
+        backend = min(estimates, key=lambda name: (estimates[name], BACKENDS.index(name)))
+        return JobPlan(backend, estimates, translate_options(backend, options), duration, features)
+
+    def execute(self, plan, input_path, output_path=None, progress_callback=None):
+        """
+        Run a planned job and record its measured wall time
+
+        Returns:
+            str: Output path
+        """
+        start = time.perf_counter()
+        result = run_backend(self.backends[plan.backend], plan.backend, input_path, output_path,
+                             progress_callback, plan.options)
+        self.record_plan(plan, input_path, time.perf_counter() - start)
+        return result
+
+    def record_plan(self, plan, input_path, seconds):
+        """Record the measured wall time of a planned job run elsewhere"""
+        stages = backend_stages(plan.backend, plan.features, Path(input_path).suffix.lower())
+        self.record(plan.backend, stages, plan.duration, seconds)
+
+    def record(self, backend, stages, duration, seconds):
+        """Add one measured run to the observations for a backend"""
+        with self._lock:
+            samples = self.samples.setdefault(backend, [])
+            samples.append({'stages': list(stages), 'duration': float(duration), 'seconds': float(seconds)})
+            del samples[:-MAX_SAMPLES]
+
+    def fit(self, backends=None):
+        """
+        Refit cost tables from recorded observations by non-negative least squares
+
+        Each observation contributes one equation: the sum of
+        fixed + per_second * duration over its stages equals the measured
+        time. Stages that no observation exercised keep their old values.
+        """
+        with self._lock:
+            for backend in backends or list(self.samples):
+                samples = self.samples.get(backend) or []
+                if not samples:
+                    continue
+                stages = sorted({stage for sample in samples for stage in sample['stages']})
+                index = {stage: i for i, stage in enumerate(stages)}
+                matrix = np.zeros((len(samples), 2 * len(stages)))
+                target = np.zeros(len(samples))
+                for row, sample in enumerate(samples):
+                    for stage in sample['stages']:
+                        matrix[row, 2 * index[stage]] += 1.0
+                        matrix[row, 2 * index[stage] + 1] += sample['duration']
+                    target[row] = sample['seconds']
+
+                # Tiny ridge pull towards the current table keeps
+                # under-determined stages near their previous values
+                table = self.costs.setdefault(backend, {})
+                prior = np.array([v for stage in stages for v in table.get(stage, [0.0, 0.0])])
+                ridge = 1e-3
+                lhs = np.vstack([matrix, ridge * np.eye(len(prior))])
+                rhs = np.concatenate([target, ridge * prior])
+                if scipy_available:
+                    solution, _ = nnls(lhs, rhs)
+                else:
+                    solution = np.maximum(np.linalg.lstsq(lhs, rhs, rcond=None)[0], 0.0)
+
+                for stage, i in index.items():
+                    table[stage] = [float(solution[2 * i]), float(solution[2 * i + 1])]
+
+    def benchmark(self, sample_files, option_sets, backends=None, output_dir=None):
+        """
+        Time every backend on every sample file and option set, then refit
+
+        Args:
+            sample_files (list): Audio files of varying duration
+            option_sets (list): App-level option dicts to try
+            backends (list): Backend names (defaults to all available)
+            output_dir (str): Where benchmark outputs are written
+
+        Returns:
+            dict: Backend name -> list of (file, options, seconds)
+        """
+        output_dir = output_dir or os.path.join(self.config.get('processed_output_folder', 'output/processed'),
+                                                'benchmark')
+        os.makedirs(output_dir, exist_ok=True)
+        results = {}
+        for name in backends or self.available_backends():
+            results[name] = []
+            for file_path in sample_files:
+                duration = probe_duration(file_path)
+                for i, options in enumerate(option_sets):
+                    features = requested_features(options)
+                    if not features <= CAPABILITIES[name]:
+                        continue
+                    plan = JobPlan(name, {name: 0.0}, translate_options(name, options), duration, features)
+                    output_path = os.path.join(output_dir, f"{Path(file_path).stem}_{name}_{i}.mp3")
+                    start = time.perf_counter()
+                    self.execute(plan, file_path, output_path)
+                    results[name].append((file_path, options, time.perf_counter() - start))
+                    try:
+                        os.remove(output_path)
+                    except OSError:
+                        pass
+        self.fit()
+        self.save()
+        return results
+
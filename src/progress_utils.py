@@ -0,0 +1,155 @@
+"""
+Progress reporting helpers for SunoReady
+Coalesces chatty progress callbacks so that processors, the batch executor
+and the downloader report at a bounded rate whatever their inner loops do
+"""
+
+import threading
+import time
+
+DEFAULT_PROGRESS_RATE = 10.0
+
+
+def _is_final(args):
+    """A progress value of 1.0 (or more) marks the end of a job"""
+    if not args:
+        return False
+    try:
+        return float(args[0]) >= 1.0
+    except (TypeError, ValueError):
+        return False
+
+
+class RateLimitedProgress:
+    """
+    Progress callback wrapper that delivers at most max_rate updates a second
+
+    Updates arriving too soon are held back, and a newer one replaces the
+    held value. A held update is delivered once its interval has passed
+    (by a timer thread, or by poll()), even if nothing else is reported.
+    Final updates (value >= 1.0, or final=True) are always delivered, and
+    flush() delivers a held update, so the last state a job reported is
+    never lost.
+    """
+
+    def __init__(self, callback, max_rate=DEFAULT_PROGRESS_RATE, clock=time.monotonic, timer=True):
+        """
+        Args:
+            callback (callable): Receives the arguments of delivered updates
+            max_rate (float): Updates per second (0 or less: no limit)
+            clock (callable): Time source in seconds
+            timer (bool): Deliver held updates from a timer thread when their
+                interval ends (False: only through poll(), flush() or the
+                next update)
+        """
+        self.callback = callback
+        self.interval = 1.0 / max_rate if max_rate and max_rate > 0 else 0.0
+        self.clock = clock
+        self.delivered = 0
+        self.dropped = 0
+        self._last = None
+        self._pending = None
+        self._timer = timer
+        self._timer_thread = None
+        self._lock = threading.Lock()
+        # Deliveries run in update order: updates are numbered under _lock
+        # and stale ones are dropped under _deliver_lock
+        self._seq = 0
+        self._delivered_seq = 0
+        self._deliver_lock = threading.RLock()
+
+    def __call__(self, *args, final=None):
+        """
+        Report progress
+
+        Returns:
+            bool: True if the update was delivered now
+        """
+        if final is None:
+            final = _is_final(args)
+        now = self.clock()
+        with self._lock:
+            self._seq += 1
+            if not final and self._last is not None and now - self._last < self.interval:
+                if self._pending is not None:
+                    self.dropped += 1
+                self._pending = (self._seq, args)
+                self._schedule(self.interval - (now - self._last))
+                return False
+            self._pending = None
+            self._last = now
+            seq = self._seq
+        return self._deliver(seq, args)
+
+    def poll(self):
+        """Deliver the held update if its interval has passed; True if delivered"""
+        with self._lock:
+            if self._pending is None or self.clock() - self._last < self.interval:
+                return False
+            (seq, args), self._pending = self._pending, None
+            self._last = self.clock()
+        return self._deliver(seq, args)
+
+    def _deliver(self, seq, args):
+        """
+        Run the callback unless a newer update got there first
+
+        A held update taken by poll() or flush() can race with a newer call
+        delivering directly; the sequence number keeps the stale one from
+        arriving after it (e.g. after the final update).
+        """
+        with self._deliver_lock:
+            if seq <= self._delivered_seq:
+                self.dropped += 1
+                return False
+            self._delivered_seq = seq
+            self.delivered += 1
+            self.callback(*args)
+        return True
+
+    def _schedule(self, delay):
+        """Start the timer for a held update (call with the lock held)"""
+        if self._timer and self._timer_thread is None:
+            self._timer_thread = threading.Timer(max(0.0, delay), self._on_timer)
+            self._timer_thread.daemon = True
+            self._timer_thread.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer_thread = None
+        if not self.poll():
+            with self._lock:
+                if self._pending is not None:
+                    # Woke early (coarse clock): try again shortly
+                    self._schedule(max(self.interval - (self.clock() - self._last), self.interval / 10.0))
+
+    def flush(self):
+        """Deliver the held update, if any"""
+        with self._lock:
+            if self._pending is None:
+                return False
+            (seq, args), self._pending = self._pending, None
+            self._last = self.clock()
+        return self._deliver(seq, args)
+
+
+def rate_limited(callback, max_rate=DEFAULT_PROGRESS_RATE, config=None):
+    """
+    Wrap callback in a RateLimitedProgress (None stays None)
+
+    Args:
+        callback (callable): Progress callback or None
+        max_rate (float): Updates per second, overridden by config['progress_rate']
+        config (dict): App configuration
+    """
+    if callback is None or isinstance(callback, RateLimitedProgress):
+        return callback
+    if config:
+        max_rate = float(config.get('progress_rate', max_rate))
+    return RateLimitedProgress(callback, max_rate)
+
+
+def flush_progress(callback):
+    """Flush callback if it is rate limited (safe to call with anything)"""
+    if isinstance(callback, RateLimitedProgress):
+        callback.flush()
@@ -0,0 +1,364 @@
+"""
+Managed scratch space for SunoReady intermediate files
+Per-job directories under a configurable root, a disk quota with admission
+control shared by every process using the root, cleanup of directories left
+behind by crashed runs, and atomic publication of finished outputs
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+LOCK_NAME = ".lock"
+JOB_PREFIX = "job_"
+# Reservations of all processes sharing the root, guarded by LEDGER_LOCK_NAME
+LEDGER_NAME = ".reservations.json"
+LEDGER_LOCK_NAME = ".reservations.lock"
+# Seconds between admission checks while waiting on other processes
+ADMIT_POLL_SECONDS = 0.2
+# A job directory without a lock file is only treated as orphaned once it is
+# older than this, so a job that is still starting up is left alone
+UNLOCKED_GRACE_SECONDS = 60
+
+
+class ScratchQuotaError(Exception):
+    """Raised when a job cannot get scratch space within its timeout"""
+
+
+def _try_lock(handle):
+    """Take an exclusive, non-blocking lock on an open file; True on success"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _lock(handle):
+    """Take an exclusive lock on an open file, waiting for it"""
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+    else:
+        handle.seek(0)
+        while True:
+            try:
+                # LK_LOCK itself gives up after about 10 seconds
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+
+def _lock_held(lock_path):
+    """True if another open handle (any process) holds the lock on lock_path"""
+    try:
+        # Never create the file: a missing lock means the job is gone
+        handle = os.fdopen(os.open(lock_path, os.O_RDWR), "r+")
+    except OSError:
+        return False
+    try:
+        return not _try_lock(handle)
+    finally:
+        handle.close()
+
+
+class ScratchJob:
+    """A private scratch directory owned by one processing job"""
+
+    def __init__(self, space, path, lock_handle, reserved_bytes):
+        self.space = space
+        self.path = path
+        self.reserved_bytes = reserved_bytes
+        self._lock_handle = lock_handle
+        self._counter = 0
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def new_path(self, suffix="", name="tmp"):
+        """
+        Return a fresh file path inside the job directory
+
+        The directory is private to this job (mode 0700), so unlike
+        tempfile.mktemp there is no window for another process to claim
+        the name.
+        """
+        self._counter += 1
+        return os.path.join(self.path, f"{name}_{self._counter:03d}{suffix}")
+
+    def commit(self, scratch_path, output_path):
+        """
+        Atomically move a finished file to its final location
+
+        A rename is used when the scratch root is on the same filesystem.
+        Otherwise (e.g. scratch on a tmpfs) the file is copied next to the
+        destination first and then renamed over it, so readers never see a
+        partial output.
+
+        Returns:
+            str: output_path
+        """
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        try:
+            os.replace(scratch_path, output_path)
+            return output_path
+        except OSError:
+            pass
+
+        fd, staging_path = tempfile.mkstemp(prefix=".sunoready_", suffix=".part", dir=output_dir)
+        os.close(fd)
+        try:
+            shutil.copyfile(scratch_path, staging_path)
+            shutil.copymode(scratch_path, staging_path)
+            os.replace(staging_path, output_path)
+        except Exception:
+            try:
+                os.remove(staging_path)
+            except:
+                pass
+            raise
+        try:
+            os.remove(scratch_path)
+        except:
+            pass
+        return output_path
+
+    def close(self):
+        """Delete the job directory and release its quota reservation"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._lock_handle.close()
+        except:
+            pass
+        shutil.rmtree(self.path, ignore_errors=True)
+        if self.reserved_bytes:
+            self.space._release(self.path)
+
+
+class ScratchSpace:
+    """Scratch root shared by all jobs in this process"""
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        root = self.config.get("scratch_dir") or os.path.join(tempfile.gettempdir(), "sunoready_scratch")
+        self.root = os.path.abspath(root)
+        self.quota_bytes = int(float(self.config.get("scratch_quota_mb", 4096)) * 1024 * 1024)
+        # Space kept free on the scratch filesystem regardless of the quota
+        self.min_free_bytes = int(float(self.config.get("scratch_min_free_mb", 256)) * 1024 * 1024)
+        self.reserve_factor = float(self.config.get("scratch_reserve_factor", 6.0))
+        self.ledger_path = os.path.join(self.root, LEDGER_NAME)
+        # Wakes waiters in this process early; other processes are polled
+        self._condition = threading.Condition()
+        os.makedirs(self.root, exist_ok=True)
+
+    def estimate_bytes(self, input_path, factor=None):
+        """Rough scratch need for a job: input size times the reserve factor"""
+        try:
+            size = os.path.getsize(input_path)
+        except OSError:
+            size = 0
+        return int(size * (factor if factor is not None else self.reserve_factor))
+
+    def open_job(self, name="job", reserve_bytes=0, timeout=None):
+        """
+        Create a job directory once enough scratch space is available
+
+        Jobs wait while the sum of reservations, across every process
+        using this root, would exceed the quota. A job is always admitted
+        when nothing else holds a reservation, so a single oversized job
+        cannot wait forever, and a job reserving nothing is always
+        admitted, so nested jobs cannot wait on their parent.
+
+        Args:
+            name (str): Label used in the directory name
+            reserve_bytes (int): Expected peak scratch usage
+            timeout (float): Seconds to wait for admission (None waits forever)
+
+        Returns:
+            ScratchJob: The new job (use as a context manager)
+        """
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)[:40]
+        path = os.path.join(self.root, f"{JOB_PREFIX}{safe_name}_{uuid.uuid4().hex[:12]}")
+        os.makedirs(path, mode=0o700)
+        lock_handle = None
+        try:
+            # Locked before reserving: a reservation is live while its lock is held
+            lock_handle = open(os.path.join(path, LOCK_NAME), "a+")
+            lock_handle.write(str(os.getpid()))
+            lock_handle.flush()
+            if not _try_lock(lock_handle):
+                raise Exception(f"Could not lock scratch directory: {path}")
+            self._admit(path, reserve_bytes, timeout)
+            return ScratchJob(self, path, lock_handle, reserve_bytes)
+        except Exception:
+            try:
+                if lock_handle is not None:
+                    lock_handle.close()
+            except:
+                pass
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+    def _admit(self, job_path, reserve_bytes, timeout):
+        if reserve_bytes == 0:
+            # Jobs that reserve nothing never wait: they are often opened
+            # inside a job that already holds the quota (e.g. the parallel
+            # encoder), which would otherwise wait on itself
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._ledger() as reservations:
+                reserved = sum(reservations.values())
+                within_quota = not reservations or reserved + reserve_bytes <= self.quota_bytes
+                disk_ok = self._disk_free() - reserve_bytes >= self.min_free_bytes
+                if within_quota and disk_ok:
+                    reservations[os.path.basename(job_path)] = reserve_bytes
+                    return
+                if not reservations:
+                    # Nothing will finish and free space, so waiting cannot help
+                    raise ScratchQuotaError(
+                        f"Not enough free disk space in {self.root} for {reserve_bytes} bytes"
+                    )
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise ScratchQuotaError(
+                    f"Scratch space exhausted: {reserve_bytes} bytes requested, "
+                    f"{reserved} of {self.quota_bytes} reserved"
+                )
+            with self._condition:
+                self._condition.wait(min(ADMIT_POLL_SECONDS, remaining) if remaining is not None
+                                     else ADMIT_POLL_SECONDS)
+
+    @contextmanager
+    def _ledger(self):
+        """
+        Reservations of every live job under the root, locked across processes
+
+        Yields a dict of job directory name -> reserved bytes; changes are
+        written back on exit. Entries whose job lock is no longer held
+        (finished or crashed jobs) are dropped on the way in.
+        """
+        with self._condition:
+            handle = open(os.path.join(self.root, LEDGER_LOCK_NAME), "a+")
+            try:
+                _lock(handle)
+                try:
+                    with open(self.ledger_path, "r", encoding="utf-8") as f:
+                        reservations = json.load(f)
+                except (OSError, ValueError):
+                    reservations = {}
+                live = {name: size for name, size in reservations.items()
+                        if _lock_held(os.path.join(self.root, name, LOCK_NAME))}
+                yield live
+                if live != reservations:
+                    temp_path = self.ledger_path + ".tmp"
+                    with open(temp_path, "w", encoding="utf-8") as f:
+                        json.dump(live, f)
+                    os.replace(temp_path, self.ledger_path)
+            finally:
+                handle.close()
+
+    def _disk_free(self):
+        try:
+            return shutil.disk_usage(self.root).free
+        except OSError:
+            return self.quota_bytes + self.min_free_bytes
+
+    def _release(self, job_path):
+        try:
+            with self._ledger() as reservations:
+                reservations.pop(os.path.basename(job_path), None)
+        except OSError:
+            pass
+        with self._condition:
+            self._condition.notify_all()
+
+    def cleanup_orphans(self):
+        """
+        Remove job directories whose owning process is gone
+
+        A live job holds an exclusive lock on its .lock file, so any
+        directory whose lock can be taken belongs to a crashed run.
+
+        Returns:
+            int: Number of directories removed
+        """
+        removed = 0
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return 0
+
+        for entry in entries:
+            if not entry.name.startswith(JOB_PREFIX) or not entry.is_dir(follow_symlinks=False):
+                continue
+            lock_path = os.path.join(entry.path, LOCK_NAME)
+            if not os.path.exists(lock_path):
+                try:
+                    age = time.time() - entry.stat().st_mtime
+                except OSError:
+                    continue
+                if age < UNLOCKED_GRACE_SECONDS:
+                    continue
+            else:
+                try:
+                    handle = open(lock_path, "a+")
+                except OSError:
+                    continue
+                try:
+                    if not _try_lock(handle):
+                        continue
+                finally:
+                    handle.close()
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+        return removed
+
+
+_spaces = {}
+_spaces_lock = threading.Lock()
+
+
+def get_scratch_space(config=None):
+    """
+    Shared ScratchSpace for the configured root
+
+    The first call for a root also removes orphans left by earlier runs.
+    """
+    config = config or {}
+    root = os.path.abspath(
+        config.get("scratch_dir") or os.path.join(tempfile.gettempdir(), "sunoready_scratch")
+    )
+    with _spaces_lock:
+        space = _spaces.get(root)
+        if space is None:
+            space = ScratchSpace(config)
+            removed = space.cleanup_orphans()
+            if removed:
+                print(f"Removed {removed} orphaned scratch director{'y' if removed == 1 else 'ies'}")
+            _spaces[root] = space
+        return space
@@ -0,0 +1,228 @@
+"""
+Shared-memory audio buffers for SunoReady
+Moves numpy arrays between processes by name instead of pickling them
+through pipes, with a reference count that frees each block when its last
+user releases it
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Block layout: [refcount int64 | padding][array data]
+# 64 bytes keeps the data cache-line aligned for any dtype
+HEADER_BYTES = 64
+
+
+class SharedArrayRef:
+    """
+    Picklable handle to an array in a shared memory block
+
+    Sending a ref to another process hands over one reference: whoever
+    receives it must eventually call SharedBufferPool.release(ref).
+    """
+
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype).str
+
+    @property
+    def nbytes(self):
+        return int(np.prod(self.shape, dtype=np.int64)) * np.dtype(self.dtype).itemsize
+
+    def __repr__(self):
+        return f"SharedArrayRef({self.name}, shape={self.shape}, dtype={self.dtype})"
+
+
+class SharedArrayView:
+    """
+    A mapped shared block exposing the array as a numpy view
+
+    Use as a context manager. The array must not be used after the view is
+    closed; keep a copy if it is needed longer.
+    """
+
+    def __init__(self, ref):
+        self.ref = ref
+        self._shm = shared_memory.SharedMemory(name=ref.name)
+        self.array = np.ndarray(ref.shape, dtype=ref.dtype, buffer=self._shm.buf, offset=HEADER_BYTES)
+
+    def __enter__(self):
+        return self.array
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        if self._shm is None:
+            return
+        self.array = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Someone still holds a view of the data; the mapping goes away
+            # when it is garbage collected
+            pass
+        self._shm = None
+
+
+def _refcount_cell(shm):
+    return np.ndarray((1,), dtype=np.int64, buffer=shm.buf)
+
+
+class SharedBufferPool:
+    """
+    Allocates reference-counted shared memory blocks for numpy arrays
+
+    The refcount lives in each block's header and is guarded by one lock per
+    pool. Create the pool in the parent process and hand it to workers
+    through Process args or a pool initializer so they share that lock.
+
+    The pool keeps its own handle to every block it allocates until the
+    block's refcount drops to zero. On Windows a named mapping disappears
+    when its last handle closes, so without this a block would vanish
+    between put() and the consumer opening it by name.
+    """
+
+    def __init__(self, context=None, lock=None):
+        """
+        Args:
+            context: multiprocessing context used to create the lock
+            lock: Existing multiprocessing lock to guard refcounts with
+        """
+        self._lock = lock or (context or multiprocessing).Lock()
+        # Blocks created by this process, by name; never pickled
+        self._owned = {}
+
+    def __getstate__(self):
+        return {'_lock': self._lock}
+
+    def __setstate__(self, state):
+        self._lock = state['_lock']
+        self._owned = {}
+
+    def allocate(self, shape, dtype=np.float32):
+        """
+        Create an uninitialised shared array with a refcount of 1
+
+        Returns:
+            SharedArrayRef: Handle to fill through view()
+        """
+        self._sweep()
+        ref = SharedArrayRef("", shape, dtype)
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + max(1, ref.nbytes))
+        _refcount_cell(shm)[0] = 1
+        ref.name = shm.name
+        self._owned[shm.name] = shm
+        return ref
+
+    def put(self, array):
+        """
+        Copy an array into a new shared block
+
+        This is the only copy on the way between stages; later stages work
+        on the shared data in place.
+
+        Returns:
+            SharedArrayRef: Handle holding one reference
+        """
+        array = np.asarray(array)
+        ref = self.allocate(array.shape, array.dtype)
+        with SharedArrayView(ref) as shared:
+            shared[...] = array
+        return ref
+
+    def view(self, ref):
+        """Map a block and return a SharedArrayView (does not change the refcount)"""
+        return SharedArrayView(ref)
+
+    def take(self, ref):
+        """Copy the array into private memory and release the reference"""
+        with SharedArrayView(ref) as shared:
+            array = shared.copy()
+        self.release(ref)
+        return array
+
+    def retain(self, ref, count=1):
+        """Add references before handing the same block to more consumers"""
+        shm = shared_memory.SharedMemory(name=ref.name)
+        try:
+            with self._lock:
+                cell = _refcount_cell(shm)
+                cell[0] += count
+                del cell
+        finally:
+            shm.close()
+
+    def release(self, ref):
+        """
+        Drop one reference; the block is unlinked when none remain
+
+        Returns:
+            bool: True if this call freed the block
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=ref.name)
+        except FileNotFoundError:
+            return False
+        try:
+            with self._lock:
+                cell = _refcount_cell(shm)
+                cell[0] -= 1
+                freed = cell[0] <= 0
+                del cell
+                if freed:
+                    shm.unlink()
+        finally:
+            shm.close()
+        if freed:
+            self._close_owned(ref.name)
+        self._sweep()
+        return freed
+
+    def refcount(self, ref):
+        """Current reference count of a block (0 once freed)"""
+        try:
+            shm = shared_memory.SharedMemory(name=ref.name)
+        except FileNotFoundError:
+            return 0
+        try:
+            with self._lock:
+                cell = _refcount_cell(shm)
+                count = int(cell[0])
+                del cell
+            return count
+        finally:
+            shm.close()
+
+    def close(self):
+        """
+        Drop this process's handles to the blocks it allocated
+
+        Blocks that are still referenced stay mapped for their other users
+        on POSIX; on Windows they go away with the last open handle.
+        """
+        for name in list(self._owned):
+            self._close_owned(name)
+
+    def _sweep(self):
+        """Close handles to owned blocks whose last reference was released elsewhere"""
+        for name, shm in list(self._owned.items()):
+            with self._lock:
+                count = int(_refcount_cell(shm)[0])
+            if count <= 0:
+                self._close_owned(name)
+
+    def _close_owned(self, name):
+        shm = self._owned.pop(name, None)
+        if shm is None:
+            return
+        try:
+            shm.close()
+        except BufferError:
+            # A view from this process is still alive; the mapping goes
+            # away when it is garbage collected
+            pass
@@ -0,0 +1,102 @@
+"""
+Staged processing pipeline for SunoReady
+Runs decode, DSP and encode in their own threads with bounded queues in
+between, so different files occupy different stages at the same time
+"""
+
+import queue
+import threading
+from concurrent.futures import CancelledError
+
+_DONE = object()
+
+
+class StagePipeline:
+    """
+    Push items through a chain of stage functions running in parallel threads
+
+    Each stage is (name, func). While file N is in the last stage, file N+1
+    can be in the middle stage and file N+2 in the first. A queue of
+    queue_size sits between stages, so a slow stage holds back the ones in
+    front of it instead of letting decoded audio pile up in memory.
+
+    numpy/librosa and FFmpeg subprocesses release the GIL for most of their
+    work, which is what lets the stages overlap in threads.
+    """
+
+    def __init__(self, stages, queue_size=1, stop_on_error=True):
+        """
+        Args:
+            stages (list): (name, func) tuples; func takes the previous
+                stage's output and returns the next stage's input
+            queue_size (int): Items allowed to wait between two stages
+            stop_on_error (bool): Stop feeding new items after a failure
+        """
+        self.stages = stages
+        self.queue_size = max(1, int(queue_size))
+        self.stop_on_error = stop_on_error
+
+    def run(self, items, on_result=None):
+        """
+        Run all items through the stages
+
+        Args:
+            items (iterable): Inputs for the first stage
+            on_result (callable): on_result(index, value) as each item leaves
+                the last stage (value is an exception if a stage raised)
+
+        Returns:
+            list: Final value per item in input order; an exception instance
+                for failed items and CancelledError for items never started
+        """
+        items = list(items)
+        results = [None] * len(items)
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        failed = threading.Event()
+
+        def feed():
+            for index, item in enumerate(items):
+                if self.stop_on_error and failed.is_set():
+                    results[index] = CancelledError()
+                    continue
+                queues[0].put((index, item))
+            queues[0].put(_DONE)
+
+        def stage_worker(stage_index):
+            _, func = self.stages[stage_index]
+            inbox = queues[stage_index]
+            outbox = queues[stage_index + 1]
+            while True:
+                entry = inbox.get()
+                if entry is _DONE:
+                    outbox.put(_DONE)
+                    return
+                index, value = entry
+                if not isinstance(value, BaseException):
+                    try:
+                        value = func(value)
+                    except Exception as e:
+                        failed.set()
+                        value = e
+                outbox.put((index, value))
+
+        threads = [threading.Thread(target=feed, daemon=True, name="pipeline-feed")]
+        threads += [
+            threading.Thread(target=stage_worker, args=(i,), daemon=True, name=f"pipeline-{name}")
+            for i, (name, _) in enumerate(self.stages)
+        ]
+        for thread in threads:
+            thread.start()
+
+        while True:
+            entry = queues[-1].get()
+            if entry is _DONE:
+                break
+            index, value = entry
+            results[index] = value
+            if on_result:
+                on_result(index, value)
+
+        for thread in threads:
+            thread.join()
+        return results
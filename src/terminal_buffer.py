@@ -0,0 +1,195 @@
+"""
+Bounded terminal log for SunoReady
+Keeps the newest terminal lines in a fixed-capacity ring buffer, spills older
+ones to a rotating log file and renders only a window of lines into the
+Terminal tab, so the GUI stays responsive through days of output
+"""
+
+import logging
+import os
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+
+class TerminalBuffer:
+    """Fixed-capacity line store with optional spill to a rotating log"""
+
+    def __init__(self, capacity=20000, spill_path=None, max_bytes=5 * 1024 * 1024, backup_count=3):
+        """
+        Args:
+            capacity (int): Lines kept in memory
+            spill_path (str): Log file for lines pushed out of memory (None: drop them)
+            max_bytes (int): Size at which the log file is rotated
+            backup_count (int): Rotated files kept
+        """
+        self.capacity = max(1, int(capacity))
+        self.lines = deque(maxlen=self.capacity)
+        # Number of lines ever appended; line n (0-based) is in memory while
+        # n >= total - len(lines)
+        self.total = 0
+        self.spilled = 0
+        self._spill = None
+        self.spill_path = spill_path
+        if spill_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(spill_path)), exist_ok=True)
+                handler = RotatingFileHandler(spill_path, maxBytes=max_bytes,
+                                              backupCount=backup_count, encoding='utf-8', delay=True)
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self._spill = handler
+            except Exception as e:
+                print(f"Warning: terminal log spill disabled: {e}")
+
+    def __len__(self):
+        return len(self.lines)
+
+    @property
+    def first(self):
+        """Absolute number of the oldest line still in memory"""
+        return self.total - len(self.lines)
+
+    def append(self, new_lines):
+        """Add lines, spilling the ones that fall out of the buffer"""
+        new_lines = list(new_lines)
+        overflow = len(self.lines) + len(new_lines) - self.capacity
+        if overflow > 0:
+            if self._spill is not None:
+                # Lines evicted from memory, then new lines that never fit
+                evicted = [self.lines[i] for i in range(min(overflow, len(self.lines)))]
+                evicted += new_lines[:max(0, overflow - len(self.lines))]
+                self._write_spill(evicted)
+            self.spilled += overflow
+        self.lines.extend(new_lines)
+        self.total += len(new_lines)
+
+    def _write_spill(self, lines):
+        if not lines:
+            return
+        record = logging.LogRecord('terminal', logging.INFO, '', 0, '\n'.join(lines), None, None)
+        try:
+            self._spill.emit(record)
+        except Exception:
+            pass
+
+    def window(self, start, count):
+        """
+        Lines start .. start + count (absolute numbers), clipped to memory
+
+        Returns:
+            tuple: (first absolute line number returned, list of lines)
+        """
+        start = max(self.first, min(start, self.total))
+        end = min(self.total, start + max(0, count))
+        offset = start - self.first
+        return start, [self.lines[i] for i in range(offset, offset + end - start)]
+
+    def tail(self, count):
+        """The newest count lines as (first line number, lines)"""
+        return self.window(self.total - count, count)
+
+    def clear(self):
+        """Forget the lines in memory (spilled lines stay on disk)"""
+        self.lines.clear()
+        self.total = 0
+
+    def flush(self):
+        """Write every line still in memory to the spill log (e.g. on exit)"""
+        if self._spill is not None:
+            self._write_spill(list(self.lines))
+            self._spill.flush()
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+class TerminalView:
+    """
+    Renders a window of a TerminalBuffer into a Tk/CTk textbox
+
+    While the view is scrolled to the bottom it follows new lines and trims
+    the top, so the widget never holds more than view_lines. Scrolling past
+    the top or bottom of the window pages older or newer lines in from the
+    buffer.
+    """
+
+    def __init__(self, textbox, buffer, view_lines=1000):
+        self.textbox = textbox
+        self.buffer = buffer
+        self.view_lines = max(10, int(view_lines))
+        # Absolute line numbers shown in the widget: [start, end)
+        self.start = 0
+        self.end = 0
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            try:
+                textbox.bind(sequence, self._on_wheel, add='+')
+            except Exception:
+                pass
+
+    @property
+    def following(self):
+        """True while the window ends at the newest line and is scrolled to the bottom"""
+        if self.end < self.buffer.total:
+            return False
+        try:
+            return self.textbox.yview()[1] >= 0.999
+        except Exception:
+            return True
+
+    def append(self, lines):
+        """Add lines to the buffer and show them if the view follows the tail"""
+        following = self.following
+        self.buffer.append(lines)
+        if not following:
+            return
+        if self.buffer.first > self.start:
+            # Lines shown in the widget were evicted; start again from the tail
+            self.render(self.buffer.total)
+            return
+        self.textbox.insert("end", "".join(line + "\n" for line in lines))
+        self.end = self.buffer.total
+        excess = (self.end - self.start) - self.view_lines
+        if excess > 0:
+            self.textbox.delete("1.0", f"{excess + 1}.0")
+            self.start += excess
+        self.textbox.see("end")
+
+    def render(self, end=None, anchor_line=None):
+        """
+        Show the view_lines lines ending at end (default: the newest)
+
+        Args:
+            end (int): Absolute line number one past the last line shown
+            anchor_line (int): Absolute line to scroll to after rendering
+        """
+        end = self.buffer.total if end is None else end
+        self.start, lines = self.buffer.window(end - self.view_lines, self.view_lines)
+        self.end = self.start + len(lines)
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("end", "".join(line + "\n" for line in lines))
+        if anchor_line is None:
+            self.textbox.see("end")
+        else:
+            line = min(max(anchor_line, self.start), max(self.start, self.end - 1)) - self.start + 1
+            self.textbox.see(f"{line}.0")
+
+    def clear(self):
+        self.buffer.clear()
+        self.start = self.end = 0
+        self.textbox.delete("1.0", "end")
+
+    def _on_wheel(self, event):
+        """Page older or newer lines in when scrolling past the window edge"""
+        up = getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0
+        try:
+            top, bottom = self.textbox.yview()
+        except Exception:
+            return
+        page = self.view_lines // 2
+        if up and top <= 0.0 and self.start > self.buffer.first:
+            anchor = self.start
+            self.render(max(self.buffer.first + self.view_lines, self.end - page), anchor_line=anchor)
+        elif not up and bottom >= 1.0 and self.end < self.buffer.total:
+            anchor = self.end
+            self.render(min(self.buffer.total, self.end + page), anchor_line=anchor)
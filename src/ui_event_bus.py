@@ -0,0 +1,146 @@
+"""
+UI event bus for SunoReady
+Worker threads post log, progress and status events; a single pump on the Tk
+thread drains and coalesces them at a fixed frame rate, so the cost of
+updating the UI stays constant however chatty the workers are
+"""
+
+import threading
+import time
+from collections import deque
+
+# Kinds whose events are all delivered, batched per frame; every other kind
+# keeps only its latest value per frame
+BATCHED_KINDS = ('log', 'call')
+
+
+class UIEventBus:
+    """Thread-safe event queue drained on the Tk thread by root.after"""
+
+    def __init__(self, root=None, interval_ms=33, max_events_per_frame=2000):
+        """
+        Args:
+            root: Tk root (anything with after/after_cancel) that runs the pump
+            interval_ms (int): Pump period (33 ms is about 30 frames per second)
+            max_events_per_frame (int): Events drained per frame; the rest
+                wait for the next frame so a flood can't freeze the UI
+        """
+        self.root = root
+        self.interval_ms = max(1, int(interval_ms))
+        self.max_events_per_frame = max(1, int(max_events_per_frame))
+        # deque.append and popleft are atomic, so producers never take a lock
+        self._events = deque()
+        self._handlers = {}
+        self._after_id = None
+        self._ui_thread = threading.current_thread()
+        self.frames = 0
+        self.dropped_updates = 0
+        self.last_pump_seconds = 0.0
+
+    def on(self, kind, handler):
+        """
+        Route events of a kind to handler (called on the Tk thread)
+
+        'log' handlers get the list of (message, msg_type) posted since the
+        last frame; other kinds get only their latest value.
+        """
+        self._handlers[kind] = handler
+
+    def post(self, kind, value=None):
+        """Queue an event from any thread"""
+        self._events.append((kind, value))
+
+    def log(self, message, msg_type="normal"):
+        self.post('log', (message, msg_type))
+
+    def status(self, message):
+        self.post('status', message)
+
+    def progress(self, value, kind='progress'):
+        self.post(kind, value)
+
+    def call(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on the Tk thread at the next frame"""
+        self.post('call', (func, args, kwargs))
+
+    def on_ui_thread(self):
+        return threading.current_thread() is self._ui_thread
+
+    def start(self):
+        """Start the pump (call on the Tk thread)"""
+        self._ui_thread = threading.current_thread()
+        if self.root is not None and self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self.root is not None and self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        try:
+            self.pump()
+        finally:
+            try:
+                self._after_id = self.root.after(self.interval_ms, self._tick)
+            except Exception:
+                # The window is gone
+                self._after_id = None
+
+    def pump(self):
+        """
+        Drain queued events and deliver them coalesced
+
+        Returns:
+            int: Number of events taken from the queue
+        """
+        start = time.perf_counter()
+        batches = {}
+        latest = {}
+        taken = 0
+        while taken < self.max_events_per_frame:
+            try:
+                kind, value = self._events.popleft()
+            except IndexError:
+                break
+            taken += 1
+            if kind in BATCHED_KINDS:
+                batches.setdefault(kind, []).append(value)
+            else:
+                if kind in latest:
+                    self.dropped_updates += 1
+                latest[kind] = value
+
+        calls = batches.pop('call', [])
+        for kind, values in batches.items():
+            self._deliver(kind, values)
+        for kind, value in latest.items():
+            self._deliver(kind, value)
+        # Calls last: a dialog opened here should follow the logs that led to it
+        for func, args, kwargs in calls:
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                print(f"Warning: UI callback failed: {e}")
+
+        if taken:
+            self.frames += 1
+        self.last_pump_seconds = time.perf_counter() - start
+        return taken
+
+    def _deliver(self, kind, value):
+        handler = self._handlers.get(kind)
+        if handler is None:
+            return
+        try:
+            handler(value)
+        except Exception as e:
+            print(f"Warning: UI handler for {kind} failed: {e}")
+
+    @property
+    def pending(self):
+        return len(self._events)
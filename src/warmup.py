@@ -0,0 +1,134 @@
+"""
+JIT warm-up for SunoReady
+Keeps numba's compiled kernels in a persistent cache under the app data
+folder and compiles librosa's pitch, tempo and resample paths at idle, so
+the first real job runs at steady-state speed
+"""
+
+import os
+import sys
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join('config', 'cache', 'numba')
+
+
+def configure_jit_cache(config=None):
+    """
+    Point numba's on-disk cache at the app data folder
+
+    Must run before numba (or librosa) is imported: numba decides where a
+    function's cache lives when the function is defined. A NUMBA_CACHE_DIR
+    already set in the environment wins.
+
+    Args:
+        config (dict): App configuration (numba_cache_dir; empty disables)
+
+    Returns:
+        str: Cache directory in use, or None
+    """
+    if os.environ.get('NUMBA_CACHE_DIR'):
+        return os.environ['NUMBA_CACHE_DIR']
+    path = (config or {}).get('numba_cache_dir', DEFAULT_CACHE_DIR)
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError as e:
+        print(f"Warning: numba cache disabled: {e}")
+        return None
+    # Child processes (batch workers) inherit the setting
+    os.environ['NUMBA_CACHE_DIR'] = path
+    if 'numba' in sys.modules:
+        print("Warning: numba was imported before its cache directory was set")
+    return path
+
+
+def warm_up_audio_stack(audio_processor=None, sr=22050):
+    """
+    Import the audio libraries and trigger their first-call JIT compilation
+
+    librosa's pitch shift and time stretch pull in scipy and the resampler
+    and compile numba kernels on first use. Running them once on a quarter
+    second of synthetic audio moves that cost out of the first real job.
+
+    Args:
+        audio_processor (AudioProcessor): Exercise its change_pitch /
+            change_tempo and resample to its rate (default: call librosa directly)
+        sr (int): Sample rate of the synthetic buffer
+
+    Returns:
+        float: Seconds spent warming up
+    """
+    start = time.perf_counter()
+    try:
+        import io
+        import numpy as np
+        import librosa
+        import soundfile as sf
+
+        t = np.arange(int(sr * 0.25)) / sr
+        y = (0.1 * np.sin(2 * np.pi * 440.0 * t)).astype(np.float32)
+        if audio_processor is not None:
+            # The processor works at its own rate; loading resamples to it
+            y = librosa.resample(y, orig_sr=sr, target_sr=audio_processor.sample_rate)
+            audio_processor.change_pitch(y, 1)
+            audio_processor.change_tempo(y, 1.1)
+        else:
+            librosa.resample(y, orig_sr=sr, target_sr=44100)
+            librosa.effects.pitch_shift(y, sr=sr, n_steps=1)
+            librosa.effects.time_stretch(y, rate=1.1)
+        sf.write(io.BytesIO(), y, sr, format='WAV')
+    except Exception as e:
+        print(f"Warning: audio warm-up failed: {e}")
+    return time.perf_counter() - start
+
+
+class WarmupService:
+    """Runs the warm-up once, in a background thread, after a short idle delay"""
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.enabled = self.config.get('jit_warmup', True)
+        self.done = threading.Event()
+        self.seconds = None
+        self._thread = None
+
+    def start(self, audio_processor=None, delay=None, callback=None):
+        """
+        Start warming up (idempotent)
+
+        Args:
+            audio_processor (AudioProcessor): Processor whose paths to compile
+            delay (float): Seconds to wait first so startup work finishes
+                (default: warmup_delay, 2s)
+            callback (callable): Called with the seconds spent when done
+
+        Returns:
+            WarmupService: self
+        """
+        if not self.enabled:
+            self.done.set()
+            return self
+        if self._thread is not None:
+            return self
+        delay = float(self.config.get('warmup_delay', 2.0) if delay is None else delay)
+
+        def run():
+            time.sleep(max(0.0, delay))
+            self.seconds = warm_up_audio_stack(audio_processor)
+            self.done.set()
+            if callback:
+                try:
+                    callback(self.seconds)
+                except Exception as e:
+                    print(f"Warning: warm-up callback failed: {e}")
+
+        self._thread = threading.Thread(target=run, daemon=True, name="jit-warmup")
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Block until the warm-up has finished; returns False on timeout"""
+        return self.done.wait(timeout)
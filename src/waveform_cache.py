@@ -0,0 +1,453 @@
+"""
+Waveform overviews for SunoReady
+Builds a min/max/RMS pyramid of a file in one streaming decode, stores it
+quantised in a cache keyed by the file's content hash and serves any zoom
+level in time proportional to the number of pixels drawn
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from batch_manifest import hash_file
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join('config', 'cache', 'waveforms')
+
+# Decode rate for overviews: plenty for shapes, cheap to decode
+DEFAULT_SAMPLE_RATE = 11025
+# Samples per bin at the finest level, and bins merged per level above it
+DEFAULT_BASE_BIN = 256
+DEFAULT_FACTOR = 4
+
+_QUANT = 127.0
+
+
+def iter_pcm(file_path, sample_rate=DEFAULT_SAMPLE_RATE, chunk_samples=65536, ffmpeg_path='ffmpeg'):
+    """
+    Decode a file to mono float32 chunks without loading it whole
+
+    FFmpeg decodes and resamples into a pipe; soundfile is used when FFmpeg
+    is missing (at the file's own rate, formats it can read).
+
+    Yields:
+        tuple: (sample_rate, np.ndarray chunk); the first item fixes the rate
+    """
+    from concurrency_controller import ffmpeg_thread_args
+    cmd = [ffmpeg_path, '-v', 'error', *ffmpeg_thread_args(), '-i', file_path,
+           '-vn', '-ac', '1', '-ar', str(sample_rate), '-f', 'f32le', 'pipe:1']
+    try:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError:
+        process = None
+
+    if process is not None:
+        try:
+            chunk_bytes = chunk_samples * 4
+            pending = b''
+            while True:
+                data = process.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                data = pending + data
+                usable = len(data) - len(data) % 4
+                pending = data[usable:]
+                if usable:
+                    yield sample_rate, np.frombuffer(data[:usable], dtype=np.float32)
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise Exception(f"FFmpeg decode failed: {stderr.decode(errors='replace').strip()}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        return
+
+    import soundfile as sf
+    rate = sf.info(file_path).samplerate
+    for block in sf.blocks(file_path, blocksize=chunk_samples, dtype='float32', always_2d=True):
+        yield rate, block.mean(axis=1)
+
+
+class WaveformPyramid:
+    """
+    min/max/RMS per bin at several zoom levels
+
+    levels[0] has one bin per base_bin samples; every level above merges
+    factor bins of the one below. Each level is an (n, 3) float32 array of
+    min, max and RMS.
+    """
+
+    def __init__(self, levels, sample_rate, base_bin, factor, n_samples):
+        self.levels = levels
+        self.sample_rate = sample_rate
+        self.base_bin = base_bin
+        self.factor = factor
+        self.n_samples = n_samples
+
+    @property
+    def duration(self):
+        return self.n_samples / float(self.sample_rate) if self.sample_rate else 0.0
+
+    def samples_per_bin(self, level):
+        return self.base_bin * self.factor ** level
+
+    def overview(self, pixels, start=0.0, end=None):
+        """
+        min, max and RMS per pixel column over a time range
+
+        Picks the coarsest level that still has a bin per pixel, so the cost
+        is O(pixels) whatever the file length or zoom.
+
+        Args:
+            pixels (int): Number of columns
+            start (float): Range start in seconds
+            end (float): Range end in seconds (default: end of file)
+
+        Returns:
+            tuple: (mins, maxs, rms) arrays of length pixels
+        """
+        pixels = max(1, int(pixels))
+        end = self.duration if end is None else min(end, self.duration)
+        start = max(0.0, min(start, end))
+        empty = np.zeros(pixels, dtype=np.float32)
+        if not self.levels or not len(self.levels[0]) or end <= start:
+            return empty, empty.copy(), empty.copy()
+
+        span = (end - start) * self.sample_rate
+        level = 0
+        while (level + 1 < len(self.levels)
+               and span / self.samples_per_bin(level + 1) >= pixels):
+            level += 1
+        data = self.levels[level]
+        per_bin = self.samples_per_bin(level)
+        first = int(start * self.sample_rate // per_bin)
+        last = min(len(data), max(first + 1, int(np.ceil(end * self.sample_rate / per_bin))))
+        bins = data[first:last]
+
+        if len(bins) >= pixels:
+            edges = np.linspace(0, len(bins), pixels + 1).astype(np.int64)[:-1]
+            counts = np.diff(np.append(edges, len(bins)))
+            mins = np.minimum.reduceat(bins[:, 0], edges)
+            maxs = np.maximum.reduceat(bins[:, 1], edges)
+            rms = np.sqrt(np.add.reduceat(bins[:, 2] ** 2, edges) / counts)
+        else:
+            # Zoomed in past the finest level: repeat bins across columns
+            index = np.minimum((np.arange(pixels) * len(bins)) // pixels, len(bins) - 1)
+            mins, maxs, rms = bins[index, 0], bins[index, 1], bins[index, 2]
+        return mins.astype(np.float32), maxs.astype(np.float32), rms.astype(np.float32)
+
+    def to_arrays(self):
+        """Quantised arrays for storage"""
+        arrays = {'meta': np.array([CACHE_VERSION, self.sample_rate, self.base_bin,
+                                    self.factor, self.n_samples], dtype=np.int64)}
+        for i, level in enumerate(self.levels):
+            arrays[f'level{i}'] = np.clip(np.round(level * _QUANT), -_QUANT, _QUANT).astype(np.int8)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        version, sample_rate, base_bin, factor, n_samples = (int(v) for v in arrays['meta'])
+        if version != CACHE_VERSION:
+            raise ValueError(f"Unsupported waveform cache version {version}")
+        levels = []
+        while f'level{len(levels)}' in arrays:
+            levels.append(arrays[f'level{len(levels)}'].astype(np.float32) / _QUANT)
+        return cls(levels, sample_rate, base_bin, factor, n_samples)
+
+
+class WaveformBuilder:
+    """Accumulates decoded chunks into the finest level, then stacks the pyramid"""
+
+    def __init__(self, base_bin=DEFAULT_BASE_BIN, factor=DEFAULT_FACTOR, min_bins=64):
+        self.base_bin = max(1, int(base_bin))
+        self.factor = max(2, int(factor))
+        self.min_bins = max(1, int(min_bins))
+        self.sample_rate = None
+        self.n_samples = 0
+        self._bins = []
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def feed(self, chunk, sample_rate):
+        if self.sample_rate is None:
+            self.sample_rate = sample_rate
+        self.n_samples += len(chunk)
+        data = np.concatenate([self._pending, np.asarray(chunk, dtype=np.float32)])
+        usable = len(data) - len(data) % self.base_bin
+        if usable:
+            self._bins.append(self._summarize(data[:usable].reshape(-1, self.base_bin)))
+        self._pending = data[usable:]
+
+    def _summarize(self, frames):
+        return np.stack([frames.min(axis=1), frames.max(axis=1),
+                         np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))], axis=1).astype(np.float32)
+
+    def finish(self):
+        """
+        Returns:
+            WaveformPyramid: Finest level plus every coarser one down to min_bins
+        """
+        if len(self._pending):
+            self._bins.append(self._summarize(self._pending.reshape(1, -1)))
+            self._pending = np.zeros(0, dtype=np.float32)
+        level = np.concatenate(self._bins) if self._bins else np.zeros((0, 3), dtype=np.float32)
+        levels = [level]
+        while len(level) > self.min_bins:
+            # Pad to a whole number of groups by repeating the last bin
+            pad = (-len(level)) % self.factor
+            if pad:
+                level = np.concatenate([level, np.repeat(level[-1:], pad, axis=0)])
+            groups = level.reshape(-1, self.factor, 3)
+            level = np.stack([groups[:, :, 0].min(axis=1), groups[:, :, 1].max(axis=1),
+                              np.sqrt(np.mean(groups[:, :, 2] ** 2, axis=1))], axis=1)
+            levels.append(level)
+        return WaveformPyramid(levels, self.sample_rate or DEFAULT_SAMPLE_RATE,
+                               self.base_bin, self.factor, self.n_samples)
+
+
+def build_waveform(file_path, config=None):
+    """
+    Decode a file once and build its pyramid
+
+    Args:
+        file_path (str): Audio file
+        config (dict): App configuration (waveform_sample_rate,
+            waveform_base_bin, waveform_factor, ffmpeg_path)
+
+    Returns:
+        WaveformPyramid
+    """
+    config = config or {}
+    builder = WaveformBuilder(config.get('waveform_base_bin', DEFAULT_BASE_BIN),
+                              config.get('waveform_factor', DEFAULT_FACTOR))
+    for sample_rate, chunk in iter_pcm(file_path, int(config.get('waveform_sample_rate', DEFAULT_SAMPLE_RATE)),
+                                       ffmpeg_path=config.get('ffmpeg_path', 'ffmpeg')):
+        builder.feed(chunk, sample_rate)
+    return builder.finish()
+
+
+class WaveformCache:
+    """Pyramids on disk by content hash, with the most recent ones in memory"""
+
+    def __init__(self, config=None, root=None):
+        """
+        Args:
+            config (dict): App configuration (waveform_cache_dir,
+                waveform_memory_items, and the build settings)
+            root (str): Cache directory (default: waveform_cache_dir)
+        """
+        self.config = config or {}
+        self.root = os.path.abspath(root or self.config.get('waveform_cache_dir', DEFAULT_CACHE_DIR))
+        self.memory_items = max(1, int(self.config.get('waveform_memory_items', 256)))
+        self._memory = OrderedDict()
+        self._memory_paths = {}
+        # Content hashes by path, reused while size and mtime match
+        self._hashes = {}
+        self._index_path = os.path.join(self.root, 'index.json')
+        self._lock = threading.Lock()
+        self._index_dirty = False
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                self._hashes = data.get('hashes', {})
+        except (OSError, ValueError):
+            pass
+
+    def save_index(self):
+        """Write the path to hash index atomically (skipped when unchanged)"""
+        with self._lock:
+            if not self._index_dirty:
+                return
+            data = {'version': CACHE_VERSION, 'hashes': dict(self._hashes)}
+            self._index_dirty = False
+        os.makedirs(self.root, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".index_", suffix=".tmp", dir=self.root)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self._index_path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except:
+                pass
+            raise
+
+    def key(self, file_path):
+        """Cache key: content hash plus the build settings"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        stat_key = [stat.st_size, stat.st_mtime_ns]
+        with self._lock:
+            cached = self._hashes.get(path)
+        if cached and cached['stat'] == stat_key:
+            digest = cached['hash']
+        else:
+            digest = hash_file(path)
+            with self._lock:
+                self._hashes[path] = {'stat': stat_key, 'hash': digest}
+                self._index_dirty = True
+        payload = (f"{digest}:{self.config.get('waveform_sample_rate', DEFAULT_SAMPLE_RATE)}:"
+                   f"{self.config.get('waveform_base_bin', DEFAULT_BASE_BIN)}:"
+                   f"{self.config.get('waveform_factor', DEFAULT_FACTOR)}:{CACHE_VERSION}")
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.root, key[:2], key + '.npz')
+
+    def cached(self, file_path):
+        """Pyramid already in memory for this path, or None (never touches the disk)"""
+        with self._lock:
+            key = self._memory_paths.get(os.path.abspath(file_path))
+            if key is None or key not in self._memory:
+                return None
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+    def _remember(self, key, file_path, pyramid):
+        with self._lock:
+            self._memory[key] = pyramid
+            self._memory.move_to_end(key)
+            self._memory_paths[os.path.abspath(file_path)] = key
+            while len(self._memory) > self.memory_items:
+                evicted, _ = self._memory.popitem(last=False)
+                self._memory_paths = {p: k for p, k in self._memory_paths.items() if k != evicted}
+
+    def get(self, file_path, build=True):
+        """
+        Pyramid for a file: from memory, from disk, or decoded and stored
+
+        Args:
+            file_path (str): Audio file
+            build (bool): Decode the file when nothing is cached
+
+        Returns:
+            WaveformPyramid or None (not cached and build=False)
+        """
+        key = self.key(file_path)
+        with self._lock:
+            pyramid = self._memory.get(key)
+            if pyramid is not None:
+                self._memory.move_to_end(key)
+                self._memory_paths[os.path.abspath(file_path)] = key
+                return pyramid
+
+        stored = self.path_for(key)
+        try:
+            with np.load(stored) as arrays:
+                pyramid = WaveformPyramid.from_arrays(arrays)
+            self._remember(key, file_path, pyramid)
+            return pyramid
+        except (OSError, ValueError, KeyError):
+            pass
+        if not build:
+            return None
+
+        try:
+            pyramid = build_waveform(file_path, self.config)
+        except Exception as e:
+            raise Exception(f"Waveform overview failed: {str(e)}")
+        self._store(stored, pyramid)
+        self._remember(key, file_path, pyramid)
+        return pyramid
+
+    def _store(self, stored, pyramid):
+        os.makedirs(os.path.dirname(stored), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".wave_", suffix=".npz", dir=os.path.dirname(stored))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, **pyramid.to_arrays())
+            os.replace(temp_path, stored)
+        except Exception as e:
+            try:
+                os.remove(temp_path)
+            except:
+                pass
+            print(f"Warning: could not store waveform overview: {e}")
+
+
+class ThumbnailLoader:
+    """
+    Serves overviews to the GUI without blocking it
+
+    thumbnail() answers from memory only; files without an overview yet are
+    queued and built one at a time in a background thread, newest request
+    first, so the rows on screen are filled before ones scrolled past.
+    """
+
+    def __init__(self, cache, on_ready=None, max_pending=64):
+        """
+        Args:
+            cache (WaveformCache): Where overviews come from
+            on_ready (callable): Called with a path once its overview is available
+            max_pending (int): Oldest requests beyond this are dropped
+        """
+        self.cache = cache
+        self.on_ready = on_ready
+        self.max_pending = max(1, int(max_pending))
+        self.failed = set()
+        self._pending = OrderedDict()
+        self._wakeup = threading.Condition()
+        self._thread = None
+
+    def thumbnail(self, file_path, pixels):
+        """
+        (mins, maxs) for pixels columns, or None while the overview is being built
+        """
+        pyramid = self.cache.cached(file_path)
+        if pyramid is None:
+            self.request(file_path)
+            return None
+        mins, maxs, _ = pyramid.overview(pixels)
+        return mins, maxs
+
+    def request(self, file_path):
+        path = os.path.abspath(file_path)
+        if path in self.failed:
+            return
+        with self._wakeup:
+            self._pending[path] = True
+            self._pending.move_to_end(path)
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="waveform-loader")
+                self._thread.start()
+            self._wakeup.notify()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while not self._pending:
+                    # Idle: persist the hash index, then wait for work
+                    self._wakeup.release()
+                    try:
+                        self.cache.save_index()
+                    except Exception as e:
+                        print(f"Warning: could not save waveform index: {e}")
+                    finally:
+                        self._wakeup.acquire()
+                    if not self._pending:
+                        self._wakeup.wait()
+                path, _ = self._pending.popitem(last=True)
+            try:
+                self.cache.get(path)
+            except Exception as e:
+                self.failed.add(path)
+                print(f"Warning: {e}")
+                continue
+            if self.on_ready:
+                try:
+                    self.on_ready(path)
+                except Exception as e:
+                    print(f"Warning: waveform callback failed: {e}")
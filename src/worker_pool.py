@@ -0,0 +1,221 @@
+"""
+Persistent warm worker pool for SunoReady
+Keeps worker processes alive across jobs and batches, and pays the import and
+JIT cost of the audio stack once per worker at startup instead of per job
+"""
+
+import atexit
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from processor_planner import create_processor
+from warmup import configure_jit_cache, warm_up_audio_stack
+
+# Backends whose processors are built while a worker warms up
+DEFAULT_WARM_BACKENDS = ('lightning', 'fast', 'standard')
+
+# Per-process worker state, set up by _init_worker (or built directly for inline runs)
+_worker = None
+
+
+class _WorkerState:
+    """Processors and the progress channel of one worker process"""
+
+    def __init__(self, config, progress_queue):
+        self.config = config
+        self.progress_queue = progress_queue
+        self.processors = {}
+        self.warmup_seconds = 0.0
+
+    def processor(self, backend):
+        if backend not in self.processors:
+            self.processors[backend] = create_processor(backend, self.config)
+        return self.processors[backend]
+
+
+def _init_worker(config, progress_queue, warm=False):
+    """Pool initializer: set up worker state and optionally warm it"""
+    global _worker
+    configure_jit_cache(config)
+    _worker = _WorkerState(config, progress_queue)
+    if not warm:
+        return
+
+    start = time.perf_counter()
+    for backend in config.get('pool_warm_backends', DEFAULT_WARM_BACKENDS):
+        try:
+            _worker.processor(backend)
+        except Exception as e:
+            print(f"Warning: could not prepare {backend} processor: {e}")
+    warm_up_audio_stack(_worker.processors.get('standard'))
+    _worker.warmup_seconds = time.perf_counter() - start
+
+
+def current_worker():
+    """State of the worker process this is called in"""
+    return _worker
+
+
+def _worker_info():
+    """Identify a warmed worker (used to start all workers up front)"""
+    # Hold the worker briefly so each ping lands on a different process
+    time.sleep(0.05)
+    return os.getpid(), _worker.warmup_seconds if _worker else 0.0
+
+
+class WarmWorkerPool:
+    """
+    Long-lived process pool whose workers are warmed once at startup
+
+    Progress messages from all jobs go through one queue. Each batch
+    registers a handler under a token, and messages from other (for example
+    cancelled) batches are dropped.
+    """
+
+    def __init__(self, config=None, max_workers=None, warm=True):
+        """
+        Args:
+            config (dict): App configuration (sent to every worker)
+            max_workers (int): Worker processes (default: batch_workers or core count)
+            warm (bool): Warm the audio stack in each worker's initializer
+        """
+        self.config = config or {}
+        self.max_workers = int(max_workers or self.config.get('batch_workers') or os.cpu_count() or 1)
+        self.warm = warm
+        # spawn matches Windows behaviour and avoids forking a Tk process
+        self.start_method = self.config.get('batch_start_method', 'spawn')
+        self.progress_queue = None
+        self._executor = None
+        self._listener = None
+        self._handlers = {}
+        self._tokens = itertools.count(1)
+        self._lock = threading.Lock()
+        self.worker_info = {}
+
+    @property
+    def running(self):
+        return self._executor is not None
+
+    def start(self, wait_ready=False, timeout=None):
+        """
+        Start the pool (idempotent)
+
+        Args:
+            wait_ready (bool): Block until every worker has finished warming up
+            timeout (float): Seconds to wait when wait_ready is set
+
+        Returns:
+            WarmWorkerPool: self
+        """
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context(self.start_method)
+                self.progress_queue = context.Queue()
+                self._listener = threading.Thread(target=self._dispatch, daemon=True,
+                                                  name="worker-pool-progress")
+                self._listener.start()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=context,
+                    initializer=_init_worker, initargs=(self.config, self.progress_queue, self.warm)
+                )
+                # Workers are spawned on demand; one ping each starts them all now
+                self._pings = [self._executor.submit(_worker_info) for _ in range(self.max_workers)]
+            pings = self._pings
+
+        if wait_ready:
+            done, _ = wait(pings, timeout=timeout)
+            for future in done:
+                if future.exception() is None:
+                    pid, seconds = future.result()
+                    self.worker_info[pid] = seconds
+        return self
+
+    def submit(self, func, *args):
+        """Submit a call to the pool, starting it if needed"""
+        self.start()
+        return self._executor.submit(func, *args)
+
+    def register(self, handler):
+        """
+        Route progress messages of a new batch to handler
+
+        Returns:
+            int: Token that the batch's jobs must put in their messages
+        """
+        token = next(self._tokens)
+        with self._lock:
+            self._handlers[token] = handler
+        return token
+
+    def unregister(self, token):
+        with self._lock:
+            self._handlers.pop(token, None)
+
+    def _dispatch(self):
+        """Forward (token, *message) items to their batch until the None sentinel"""
+        progress_queue = self.progress_queue
+        while True:
+            try:
+                item = progress_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            handler = self._handlers.get(item[0])
+            if handler is not None:
+                try:
+                    handler(*item[1:])
+                except Exception as e:
+                    print(f"Warning: progress handler failed: {e}")
+
+    def restart(self):
+        """Replace a broken pool (a worker crashed) with fresh workers, keeping batch handlers"""
+        with self._lock:
+            handlers = dict(self._handlers)
+        self.shutdown(wait=False)
+        self.start()
+        with self._lock:
+            self._handlers.update(handlers)
+
+    def shutdown(self, wait=True):
+        """Stop all workers; the pool can be started again afterwards"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            progress_queue, listener = self.progress_queue, self._listener
+            self._listener = None
+            self._handlers.clear()
+        if executor is None:
+            return
+        executor.shutdown(wait=wait, cancel_futures=True)
+        try:
+            progress_queue.put(None)
+            if listener:
+                listener.join(timeout=5)
+            progress_queue.close()
+        except:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool(config=None):
+    """
+    Shared WarmWorkerPool for this process
+
+    The pool is created on first use and shut down when the process exits.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WarmWorkerPool(config)
+            atexit.register(_pool.shutdown)
+        return _pool
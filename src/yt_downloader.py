@@ -9,6 +9,8 @@ from youtubesearchpython import VideosSearch
 import re
 from pathlib import Path
 
+from progress_utils import rate_limited
+
 class YouTubeDownloader:
     def __init__(self, log_callback=None, config=None):
         # Load config for output directory
@@ -18,6 +20,10 @@ class YouTubeDownloader:
             self.output_dir = "output/downloads"
         os.makedirs(self.output_dir, exist_ok=True)
         self.log_callback = log_callback
+        # yt-dlp calls the hook for every chunk; messages are only built for
+        # the updates that are actually shown
+        self.download_progress = rate_limited(self._log_download_progress,
+                                              (config or {}).get('download_progress_rate', 2.0))
     
     def log(self, message, msg_type="normal"):
         """Log message to callback if available"""
@@ -29,19 +35,25 @@ class YouTubeDownloader:
     def progress_hook(self, d):
         """Progress callback for yt-dlp"""
         if d['status'] == 'downloading':
-            if 'total_bytes' in d:
-                percent = (d['downloaded_bytes'] / d['total_bytes']) * 100
-                self.log(f"Downloading... {percent:.1f}% ({d['downloaded_bytes']}/{d['total_bytes']} bytes)", "download")
-            elif 'total_bytes_estimate' in d:
-                percent = (d['downloaded_bytes'] / d['total_bytes_estimate']) * 100
-                self.log(f"Downloading... ~{percent:.1f}% ({d['downloaded_bytes']}/?? bytes)", "download")
-            else:
-                self.log(f"Downloading... {d['downloaded_bytes']} bytes", "download")
+            self.download_progress(d, final=False)
         elif d['status'] == 'finished':
+            self.download_progress.flush()
             self.log(f"Download completed: {d['filename']}", "success")
         elif d['status'] == 'error':
+            self.download_progress.flush()
             self.log(f"Download error: {d.get('error', 'Unknown error')}", "error")
     
+    def _log_download_progress(self, d):
+        """Format and log one download progress update"""
+        if d.get('total_bytes'):
+            percent = (d['downloaded_bytes'] / d['total_bytes']) * 100
+            self.log(f"Downloading... {percent:.1f}% ({d['downloaded_bytes']}/{d['total_bytes']} bytes)", "download")
+        elif d.get('total_bytes_estimate'):
+            percent = (d['downloaded_bytes'] / d['total_bytes_estimate']) * 100
+            self.log(f"Downloading... ~{percent:.1f}% ({d['downloaded_bytes']}/?? bytes)", "download")
+        else:
+            self.log(f"Downloading... {d['downloaded_bytes']} bytes", "download")
+    
     def search_youtube(self, query, limit=10):
         """
         Search YouTube for videos
@@ -9,58 +9,10 @@ import sys
 import json
 from pathlib import Path
 
-def create_parser():
-    """Create the command line argument parser with comprehensive help text"""
-    parser = argparse.ArgumentParser(
-        prog='SunoReady',
-        description='Audio processing tool for Suno AI with advanced pitch control and copyright bypass features',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  %(prog)s --gui                              # Launch GUI interface
-  %(prog)s process input.mp3                 # Process with default settings
-  %(prog)s process input.mp3 --pitch 3       # Apply +3 semitones pitch shift
-  %(prog)s process *.mp3 --pitch -2 --tempo 105  # Batch process with custom settings
-  %(prog)s process song.wav --pitch 7 --normalize --clean-metadata
-  
-Pitch Control:
-  The pitch control feature allows precise adjustment of audio pitch while maintaining tempo.
-  
-  Range: −12 to +12 semitones (2 full octaves)
-  • 1 semitone = smallest musical interval (piano keys)
-  • +12 semitones = 1 octave higher (double frequency)
-  • −12 semitones = 1 octave lower (half frequency)
-  
-  Common Usage:
-  • ±1-3 semitones: Subtle changes for copyright bypass
-  • ±4-7 semitones: Noticeable pitch changes for creative purposes
-  • ±8-12 semitones: Dramatic pitch shifts (may reduce quality)
-  
-  Mathematical Formula: frequency_out = frequency_in × 2^(semitones/12)
-  
-Audio Quality Tips:
-  • Smaller pitch changes (±1-6 semitones) maintain better quality
-  • Combine with other effects for maximum copyright bypass effectiveness
-  • Use Lightning processor (default) for best speed vs quality balance
-
-Copyright Notice:
-  This tool is for educational and research purposes only.
-  Users are responsible for complying with copyright laws.
-        """
-    )
-    
-    # Main command subparsers
-    subparsers = parser.add_subparsers(dest='command', help='Available commands')
-    
-    # GUI command
-    gui_parser = subparsers.add_parser('gui', help='Launch graphical user interface')
-    
-    # Process command
-    process_parser = subparsers.add_parser('process', help='Process audio files with specified settings')
-    process_parser.add_argument('files', nargs='+', help='Input audio files to process')
-    
+def add_processing_arguments(parser):
+    """Add the audio and output options shared by 'process' and 'queue add'"""
     # Audio processing options
-    audio_group = process_parser.add_argument_group('Audio Processing Options')
+    audio_group = parser.add_argument_group('Audio Processing Options')
     
     audio_group.add_argument(
         '--pitch', 
@@ -106,13 +58,13 @@ Copyright Notice:
     )
     
     # Output options
-    output_group = process_parser.add_argument_group('Output Options')
+    output_group = parser.add_argument_group('Output Options')
     
     output_group.add_argument(
         '--format', 
         choices=['mp3', 'wav', 'flac'], 
         default='mp3',
-        help='Output audio format. Default: mp3'
+        help='Output audio format (only mp3 is supported so far). Default: mp3'
     )
     
     output_group.add_argument(
@@ -124,7 +76,93 @@ Copyright Notice:
     output_group.add_argument(
         '--quality', 
         default='320k',
-        help='Output quality for MP3 format (e.g., 128k, 192k, 320k). Default: 320k'
+        help='Output quality for MP3 format (only 320k is supported so far). Default: 320k'
+    )
+
+def create_parser():
+    """Create the command line argument parser with comprehensive help text"""
+    parser = argparse.ArgumentParser(
+        prog='SunoReady',
+        description='Audio processing tool for Suno AI with advanced pitch control and copyright bypass features',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --gui                              # Launch GUI interface
+  %(prog)s process input.mp3                 # Process with default settings
+  %(prog)s process input.mp3 --pitch 3       # Apply +3 semitones pitch shift
+  %(prog)s process *.mp3 --pitch -2 --tempo 105  # Batch process with custom settings
+  %(prog)s process song.wav --pitch 7 --normalize --clean-metadata
+  %(prog)s queue add *.mp3 --pitch 2          # Queue files, process them later
+  %(prog)s queue run                          # Process (or resume) everything queued
+  
+Pitch Control:
+  The pitch control feature allows precise adjustment of audio pitch while maintaining tempo.
+  
+  Range: −12 to +12 semitones (2 full octaves)
+  • 1 semitone = smallest musical interval (piano keys)
+  • +12 semitones = 1 octave higher (double frequency)
+  • −12 semitones = 1 octave lower (half frequency)
+  
+  Common Usage:
+  • ±1-3 semitones: Subtle changes for copyright bypass
+  • ±4-7 semitones: Noticeable pitch changes for creative purposes
+  • ±8-12 semitones: Dramatic pitch shifts (may reduce quality)
+  
+  Mathematical Formula: frequency_out = frequency_in × 2^(semitones/12)
+  
+Audio Quality Tips:
+  • Smaller pitch changes (±1-6 semitones) maintain better quality
+  • Combine with other effects for maximum copyright bypass effectiveness
+  • Use Lightning processor (default) for best speed vs quality balance
+
+Copyright Notice:
+  This tool is for educational and research purposes only.
+  Users are responsible for complying with copyright laws.
+        """
+    )
+    
+    # Main command subparsers
+    subparsers = parser.add_subparsers(dest='command', help='Available commands')
+    
+    # GUI command
+    gui_parser = subparsers.add_parser('gui', help='Launch graphical user interface')
+    
+    # Process command
+    process_parser = subparsers.add_parser('process', help='Process audio files with specified settings')
+    process_parser.add_argument('files', nargs='+', help='Input audio files to process')
+    
+    add_processing_arguments(process_parser)
+    process_parser.add_argument(
+        '--force', 
+        action='store_true',
+        help='Reprocess every file, even when an earlier run already produced '
+             'an up-to-date output with the same settings'
+    )
+    
+    # Job queue commands
+    queue_parser = subparsers.add_parser(
+        'queue', help='Queue files for processing and run the queue (survives crashes and restarts)')
+    queue_commands = queue_parser.add_subparsers(dest='queue_command', help='Queue commands')
+    
+    queue_add_parser = queue_commands.add_parser('add', help='Add files to the queue without processing them')
+    queue_add_parser.add_argument('files', nargs='+', help='Input audio files to queue')
+    add_processing_arguments(queue_add_parser)
+    
+    queue_run_parser = queue_commands.add_parser(
+        'run', help='Process queued files until the queue is empty (resumes interrupted jobs)')
+    queue_run_parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Reprocess every file, even when its output is already up to date'
+    )
+    
+    queue_commands.add_parser('status', help='Show queued, running, finished and failed jobs')
+    queue_commands.add_parser('retry', help='Put failed jobs back in the queue')
+    queue_clear_parser = queue_commands.add_parser('clear', help='Remove finished jobs from the queue')
+    queue_clear_parser.add_argument(
+        '--failed',
+        action='store_true',
+        help='Also remove failed jobs'
     )
     
     # YouTube download command
@@ -171,6 +209,134 @@ def validate_tempo_range(tempo_value):
         raise ValueError(f"Tempo value {tempo_value}% is outside valid range (50-200%)")
     return tempo_value
 
+def validate_output_options(args):
+    """Reject output options the processors cannot honour yet (they always write 320k MP3)"""
+    if args.format != 'mp3':
+        raise ValueError(f"Output format '{args.format}' is not supported yet (only mp3)")
+    if args.quality.lower() not in ('320k', '320'):
+        raise ValueError(f"Output quality '{args.quality}' is not supported yet (only 320k)")
+
+def _load_config():
+    sys.path.insert(0, str(Path(__file__).parent / "src"))
+    try:
+        with open('config/config.json', 'r') as f:
+            config = json.load(f)
+    except (FileNotFoundError, ValueError):
+        config = {}
+    # Reuse numba kernels compiled by earlier runs (must precede any librosa import)
+    from warmup import configure_jit_cache
+    configure_jit_cache(config)
+    return config
+
+def queue_files(args, pitch, tempo):
+    """Add files to the job queue with their output paths; returns (queue, batch id)"""
+    config = _load_config()
+    from batch_manifest import default_output_path
+    from job_queue import JobQueue
+    
+    options = {
+        'tempo_change': tempo,
+        'pitch_semitones': pitch,
+        'normalize': args.normalize,
+        'apply_highpass': args.highpass,
+        'add_noise': args.add_noise,
+        'clean_metadata': args.clean_metadata,
+    }
+    # Each job carries its destination, so a later run doesn't depend on --output-dir
+    output_config = {'processed_output_folder': args.output_dir}
+    output_paths = [default_output_path(output_config, path) for path in args.files]
+    queue = JobQueue(config)
+    return queue, queue.enqueue(args.files, options, output_paths)
+
+def run_queue(force=False, report_folder=None, batch_id=None):
+    """
+    Process queued jobs, resuming interrupted ones; returns the exit code
+    
+    batch_id limits the run to one batch (default: everything queued).
+    """
+    config = _load_config()
+    from batch_executor import BatchExecutor
+    from batch_failures import write_failure_report
+    from batch_manifest import BatchManifest
+    from content_store import ContentStore
+    from job_queue import JobQueue
+    
+    report_folder = report_folder or config.get('processed_output_folder', 'output/processed')
+    queue = JobQueue(config)
+    recovered = queue.recover()
+    if recovered:
+        print(f"♻️ Resuming {recovered} interrupted job(s)")
+    
+    def progress(overall, message=""):
+        print(f"\r   {overall * 100:5.1f}%  {message[:60]:<60}", end="", flush=True)
+    
+    executor = BatchExecutor(config)
+    manifest = BatchManifest(config)
+    store = ContentStore(config) if config.get('content_store', True) else None
+    
+    def run_batch(files, options, output_paths, file_callback):
+        return executor.run(
+            files, options, progress_callback=progress, file_callback=file_callback,
+            output_paths=output_paths, manifest=manifest, force=force, store=store
+        )
+    
+    try:
+        results = [result for _, result in queue.drain(run_batch, batch_id=batch_id)]
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        return 1
+    print()
+    queue.clear(batch_id=batch_id)
+    
+    skipped = sum(1 for result in results if result.skipped)
+    failures = [result.failure for result in results if result.failure]
+    for result in results:
+        if result.failure:
+            print(f"   ❌ {result.input_path}: {result.failure.stage}: {result.failure.message}")
+            continue
+        status = "⏭️ up to date" if result.skipped else f"✅ {result.seconds:.1f}s"
+        print(f"   {status}  {result.output_path}")
+    print(f"🎉 Processed {len(results) - skipped - len(failures)} file(s), skipped {skipped} unchanged")
+    if failures:
+        report_path = write_failure_report(failures, report_folder)
+        print(f"⚠️ {len(failures)} file(s) failed - details in {report_path}")
+        print("   Run 'queue retry' and 'queue run' to try them again")
+        return 1
+    return 0
+
+def process_files(args, pitch, tempo):
+    """Run a batch from the command line; returns the exit code"""
+    try:
+        _, batch_id = queue_files(args, pitch, tempo)
+    except Exception as e:
+        print(f"❌ Error: could not queue files: {e}")
+        return 1
+    # Only this batch: jobs queued elsewhere (e.g. from the GUI) are left alone
+    return run_queue(force=args.force, report_folder=args.output_dir, batch_id=batch_id)
+
+def queue_command(args):
+    """Handle the 'queue' subcommands; returns the exit code"""
+    config = _load_config()
+    from job_queue import JobQueue
+    queue = JobQueue(config)
+    
+    if args.queue_command == 'retry':
+        print(f"🔁 {queue.retry_failed()} failed job(s) queued again")
+    elif args.queue_command == 'clear':
+        statuses = ('done', 'failed') if args.failed else ('done',)
+        print(f"🧹 Removed {queue.clear(statuses)} job(s)")
+    else:
+        recovered = queue.recover()
+        counts = queue.counts()
+        print("📋 Job queue:")
+        print(f"   • Pending: {counts['pending']}" + (f" ({recovered} interrupted)" if recovered else ""))
+        print(f"   • Running: {counts['running']}")
+        print(f"   • Done:    {counts['done']}")
+        print(f"   • Failed:  {counts['failed']}")
+        for job in queue.jobs('failed'):
+            print(f"     ❌ {job.input_path}: {(job.error or {}).get('message', 'unknown error')}")
+    return 0
+
 def main():
     """Main CLI entry point"""
     parser = create_parser()
@@ -195,6 +361,7 @@ def main():
         try:
             pitch = validate_pitch_range(args.pitch)
             tempo = validate_tempo_range(args.tempo)
+            validate_output_options(args)
         except ValueError as e:
             print(f"❌ Error: {e}")
             sys.exit(1)
@@ -213,11 +380,28 @@ def main():
             print(f"   • Highpass filter: enabled")
         if args.clean_metadata:
             print(f"   • Metadata cleaning: enabled")
+        if args.force:
+            print(f"   • Reprocess all files: enabled")
         print()
         
-        # TODO: Implement actual processing logic
-        print("🚧 CLI processing not yet implemented. Please use the GUI interface.")
-        print("💡 Run 'python sunoready_cli.py gui' to launch the graphical interface.")
+        sys.exit(process_files(args, pitch, tempo))
+        
+    elif args.command == 'queue':
+        if args.queue_command == 'add':
+            try:
+                pitch = validate_pitch_range(args.pitch)
+                tempo = validate_tempo_range(args.tempo)
+                validate_output_options(args)
+                _, batch_id = queue_files(args, pitch, tempo)
+            except Exception as e:
+                print(f"❌ Error: {e}")
+                sys.exit(1)
+            print(f"📥 Queued {len(args.files)} file(s) as batch {batch_id}")
+            print("   Process them with 'queue run' (or from the GUI)")
+        elif args.queue_command == 'run':
+            sys.exit(run_queue(force=args.force))
+        else:
+            sys.exit(queue_command(args))
         
     elif args.command == 'download':
         print(f"⬇️ Downloading from: {args.url}")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the asyncio subprocess runner and bounded-queue pipeline
+"""
+
+import asyncio
+import gc
+import sys
+import time
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from async_runner import AsyncSubprocessRunner, AsyncPipeline
+
+
+def python_cmd(code):
+    return [sys.executable, "-c", code]
+
+
+class TestAsyncSubprocessRunner(unittest.TestCase):
+    """Test streaming and concurrency limits"""
+
+    def setUp(self):
+        self.runner = AsyncSubprocessRunner(limits={"python": 2})
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def test_streams_lines_incrementally(self):
+        seen = []
+        code = "import sys\nfor i in range(3): sys.stderr.write(f'frame={i}\\r'); sys.stderr.flush()\nprint('done')"
+
+        result = asyncio.run(self.runner.run(python_cmd(code), on_stderr=seen.append))
+
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(seen, ["frame=0\n", "frame=1\n", "frame=2\n"])
+        self.assertEqual(result.stdout, "done\n")
+
+    def test_passes_stdin(self):
+        code = "import sys; sys.stdout.write(sys.stdin.read().upper())"
+        result = asyncio.run(self.runner.run(python_cmd(code), input_data=b"abc"))
+        self.assertEqual(result.stdout, "ABC\n")
+
+    def test_limits_concurrent_processes(self):
+        cmd = python_cmd("import time; time.sleep(0.2)")
+
+        async def main():
+            start = time.monotonic()
+            await asyncio.gather(*(self.runner.run(cmd) for _ in range(4)))
+            return time.monotonic() - start
+
+        # Four 0.2 s jobs two at a time need at least two rounds
+        self.assertGreaterEqual(asyncio.run(main()), 0.4)
+
+    def test_run_blocking(self):
+        result = asyncio.run(self.runner.run_blocking(sum, [1, 2, 3]))
+        self.assertEqual(result, 6)
+
+    def test_blocking_pools_sized_per_tool(self):
+        runner = AsyncSubprocessRunner(limits={"cpu": 5, "yt-dlp": 1})
+        try:
+            # A download first must not size the pool CPU work runs on
+            asyncio.run(runner.run_blocking(sum, [1], tool="yt-dlp"))
+            asyncio.run(runner.run_blocking(sum, [1]))
+            self.assertEqual(runner._executors["yt-dlp"]._max_workers, 1)
+            self.assertEqual(runner._executors["cpu"]._max_workers, 5)
+        finally:
+            runner.shutdown()
+
+    def test_semaphores_released_with_their_loop(self):
+        async def use():
+            return self.runner.semaphore("cpu")
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(use())
+        self.assertEqual(len(self.runner._semaphores), 1)
+        loop.close()
+        del loop
+        gc.collect()
+        self.assertEqual(len(self.runner._semaphores), 0)
+
+
+class TestAsyncPipeline(unittest.TestCase):
+    """Test ordering, error capture and backpressure"""
+
+    def test_preserves_order_and_captures_errors(self):
+        async def decode(x):
+            await asyncio.sleep(0.01 * (5 - x))
+            return x * 10
+
+        async def encode(x):
+            if x == 30:
+                raise ValueError("bad item")
+            return x + 1
+
+        pipeline = AsyncPipeline([("decode", decode, 3), ("encode", encode, 2)], queue_size=2)
+        results = asyncio.run(pipeline.run(range(5)))
+
+        self.assertEqual(results[:3], [1, 11, 21])
+        self.assertIsInstance(results[3], ValueError)
+        self.assertEqual(results[4], 41)
+
+    def test_bounded_queue_limits_lead(self):
+        started = []
+        finished = []
+        lead = []
+
+        async def fast(x):
+            started.append(x)
+            lead.append(len(started) - len(finished))
+            return x
+
+        async def slow(x):
+            await asyncio.sleep(0.01)
+            finished.append(x)
+            return x
+
+        pipeline = AsyncPipeline([("fast", fast, 1), ("slow", slow, 1)], queue_size=2)
+        results = asyncio.run(pipeline.run(range(20)))
+
+        self.assertEqual(results, list(range(20)))
+        # queue of 2 plus one item in each stage's hands
+        self.assertLessEqual(max(lead), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Tests for the parallel batch executor
+"""
+
+import errno
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import soundfile as sf
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import batch_executor
+from batch_executor import BatchExecutor, BatchResult, _CompletionEmitter, _ProgressTracker
+from batch_manifest import BatchManifest
+from content_store import ContentStore
+from perf_monitor import PerfMonitor
+from scratch_space import JOB_PREFIX
+from worker_pool import WarmWorkerPool
+
+FFMPEG_AVAILABLE = shutil.which("ffmpeg") is not None
+
+
+class TestBatchHelpers(unittest.TestCase):
+    """Test progress merging and result delivery"""
+
+    def test_results_released_as_completed(self):
+        results = [BatchResult(i, f"{i}.mp3", "lightning") for i in range(4)]
+        emitted = []
+        emitter = _CompletionEmitter(results, lambda r: emitted.append(r.index))
+
+        # A short file finishing first is not held back by earlier ones
+        emitter.complete(2)
+        self.assertEqual(emitted, [2])
+        emitter.complete(0)
+        emitter.complete(2)
+        emitter.complete(3)
+        emitter.complete(1)
+        self.assertEqual(emitted, [2, 0, 3, 1])
+
+    def test_progress_is_merged_across_files(self):
+        updates = []
+        tracker = _ProgressTracker(["a.mp3", "b.mp3"], lambda p, m: updates.append(p))
+
+        tracker.update(0, 0.5)
+        tracker.update(1, 1.0)
+        tracker.update(0, 0.2)  # late, out-of-order message
+
+        self.assertEqual(updates, [0.25, 0.75, 0.75])
+
+    def test_start_reported_once_per_file(self):
+        started = []
+        tracker = _ProgressTracker(["a.mp3", "b.mp3"], None, start_callback=started.append)
+
+        tracker.update(1, 0.1)
+        tracker.update(1, 0.5)
+        tracker.update(0, 0.1)
+
+        self.assertEqual(started, [1, 0])
+
+
+@unittest.skipUnless(FFMPEG_AVAILABLE, "FFmpeg not available")
+class TestBatchExecutorFFmpeg(unittest.TestCase):
+    """Run a small batch through worker processes"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = {
+            "processed_output_folder": os.path.join(self.temp_dir, "out"),
+            "scratch_dir": os.path.join(self.temp_dir, "scratch"),
+        }
+        self.files = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir, f"tone_{i}.wav")
+            t = np.arange(44100) / 44100.0
+            sf.write(path, 0.3 * np.sin(2 * np.pi * (220 + 110 * i) * t), 44100)
+            self.files.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_pool_processes_all_files_in_order(self):
+        progress = []
+        emitted = []
+        executor = BatchExecutor(self.config, max_workers=2)
+
+        results = executor.run(
+            self.files, {"tempo_change": 110.0},
+            progress_callback=lambda p, m: progress.append(p),
+            file_callback=lambda r: emitted.append(r.input_path)
+        )
+
+        self.assertEqual([r.input_path for r in results], self.files)
+        self.assertEqual(sorted(emitted), sorted(self.files))
+        for result in results:
+            self.assertTrue(os.path.exists(result.output_path))
+            self.assertEqual(Path(result.output_path).stem, Path(result.input_path).stem + "_processed")
+        self.assertAlmostEqual(progress[-1], 1.0)
+
+    def test_persistent_pool_serves_several_batches(self):
+        pool = WarmWorkerPool(self.config, max_workers=2, warm=False)
+        try:
+            executor = BatchExecutor(self.config, pool=pool)
+            first = executor.run(self.files[:2], {"tempo_change": 110.0})
+            second = executor.run(self.files[2:], {"tempo_change": 90.0})
+            self.assertTrue(pool.running)
+        finally:
+            pool.shutdown()
+
+        for result in first + second:
+            self.assertTrue(os.path.exists(result.output_path))
+
+    def test_rerun_skips_up_to_date_outputs(self):
+        manifest = BatchManifest(self.config)
+        executor = BatchExecutor(self.config, max_workers=1)
+        executor.run(self.files[:2], {"tempo_change": 110.0}, manifest=manifest)
+
+        emitted = []
+        results = executor.run(self.files, {"tempo_change": 110.0}, manifest=BatchManifest(self.config),
+                               file_callback=lambda r: emitted.append(r.index))
+        self.assertEqual([r.skipped for r in results], [True, True, False])
+        self.assertEqual(emitted, [0, 1, 2])
+
+        forced = executor.run(self.files, {"tempo_change": 110.0}, manifest=BatchManifest(self.config),
+                              force=True)
+        self.assertFalse(any(r.skipped for r in forced))
+
+    def test_duplicate_inputs_processed_once(self):
+        duplicate = os.path.join(self.temp_dir, "copy_of_tone_0.wav")
+        shutil.copy(self.files[0], duplicate)
+        store = ContentStore(self.config)
+        executor = BatchExecutor(self.config, max_workers=1)
+
+        results = executor.run([self.files[0], duplicate], {"tempo_change": 110.0}, store=store)
+        self.assertEqual([r.skipped for r in results], [False, True])
+        self.assertEqual(os.stat(results[0].output_path).st_ino, os.stat(results[1].output_path).st_ino)
+
+        # A later batch reuses the stored result without processing
+        os.remove(results[0].output_path)
+        again = executor.run([self.files[0]], {"tempo_change": 110.0}, store=store)
+        self.assertTrue(again[0].skipped)
+        self.assertTrue(os.path.exists(again[0].output_path))
+
+    def test_failing_file_does_not_stop_batch(self):
+        bad = os.path.join(self.temp_dir, "corrupt.wav")
+        with open(bad, "wb") as f:
+            f.write(b"not audio")
+        files = [self.files[0], bad, self.files[1]]
+
+        for workers in (1, 2):
+            emitted = []
+            results = BatchExecutor(self.config, max_workers=workers).run(
+                files, {"tempo_change": 110.0}, file_callback=lambda r: emitted.append(r.index))
+            self.assertEqual(sorted(emitted), [0, 1, 2])
+            self.assertTrue(results[0].ok and results[2].ok)
+            self.assertTrue(os.path.exists(results[2].output_path))
+            self.assertFalse(results[1].ok)
+            self.assertEqual(results[1].failure.attempts, 1)
+            self.assertIn("Invalid data", results[1].failure.stderr_tail)
+
+    def test_transient_failure_is_retried(self):
+        calls = []
+        real_run_backend = batch_executor.run_backend
+
+        def flaky(processor, backend, input_path, *args):
+            calls.append(input_path)
+            if len(calls) == 1:
+                raise OSError(errno.EAGAIN, "Resource temporarily unavailable")
+            return real_run_backend(processor, backend, input_path, *args)
+
+        config = dict(self.config, retry_backoff=0.01)
+        with mock.patch.object(batch_executor, "run_backend", side_effect=flaky):
+            results = BatchExecutor(config, max_workers=1).run(self.files[:1], {"tempo_change": 110.0})
+        self.assertTrue(results[0].ok)
+        self.assertEqual(calls, [self.files[0]] * 2)
+
+        with mock.patch.object(batch_executor, "run_backend",
+                               side_effect=OSError(errno.EAGAIN, "Resource temporarily unavailable")):
+            results = BatchExecutor(config, max_workers=1).run(self.files[:1], {"tempo_change": 110.0})
+        self.assertEqual(results[0].failure.attempts, 3)
+        self.assertTrue(results[0].failure.transient)
+
+    def test_inline_staged_batch(self):
+        config = dict(self.config, default_backend="standard")
+        executor = BatchExecutor(config, max_workers=1)
+
+        results = executor.run(self.files, {"normalize": True})
+
+        self.assertEqual([r.input_path for r in results], self.files)
+        for result in results:
+            self.assertTrue(os.path.exists(result.output_path))
+        # Only the shared reservation ledger is left, no job directories
+        self.assertEqual([name for name in os.listdir(config["scratch_dir"]) if name.startswith(JOB_PREFIX)], [])
+
+    def test_monitor_receives_stages_and_completions(self):
+        for workers, backend, stages in ((1, "standard", {"decode", "dsp", "encode"}),
+                                         (2, "lightning", {"ffmpeg"})):
+            monitor = PerfMonitor(sampler=lambda: {"cpu": None})
+            config = dict(self.config, default_backend=backend)
+            BatchExecutor(config, max_workers=workers, monitor=monitor).run(
+                self.files, {"tempo_change": 110.0, "normalize": True})
+
+            snapshot = monitor.snapshot()
+            self.assertEqual(snapshot["processed"], 3)
+            self.assertEqual(set(snapshot["stages"]), stages)
+            self.assertEqual(snapshot["queue_depth"], 0)
+            self.assertEqual(snapshot["active_workers"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for batch failure classification and reporting
+"""
+
+import errno
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from batch_failures import BatchFailure, is_transient, retry_delay, stderr_tail, write_failure_report
+
+FFMPEG_ERROR = Exception(
+    "Lightning processing failed: FFmpeg error: ffmpeg version 7.0\n"
+    "  libavutil      59.  8.100\n"
+    "[in#0 @ 0x1] Error opening input: Invalid data found when processing input\n"
+    "Error opening input files: Invalid data found when processing input\n"
+)
+
+
+class TestBatchFailures(unittest.TestCase):
+    """Test transient detection, stderr tails and the JSON report"""
+
+    def test_transient_errors(self):
+        self.assertTrue(is_transient(OSError(errno.EAGAIN, "Resource temporarily unavailable")))
+        self.assertTrue(is_transient(BrokenProcessPool("worker died")))
+        self.assertTrue(is_transient(Exception("FFmpeg error: Cannot allocate memory")))
+        self.assertFalse(is_transient(FFMPEG_ERROR))
+        self.assertFalse(is_transient(FileNotFoundError(errno.ENOENT, "No such file")))
+
+    def test_wrapped_quota_error_is_transient(self):
+        from scratch_space import ScratchQuotaError
+        try:
+            try:
+                raise ScratchQuotaError("Scratch space exhausted: 10 bytes requested")
+            except Exception as e:
+                raise Exception(f"Lightning processing failed: {str(e)}") from e
+        except Exception as wrapped:
+            self.assertTrue(is_transient(wrapped))
+            self.assertTrue(BatchFailure("a.wav", "lightning", "processing", wrapped, 1).transient)
+
+    def test_stderr_tail_keeps_the_end(self):
+        tail = stderr_tail(FFMPEG_ERROR, lines=2)
+        self.assertEqual(tail.splitlines()[-1],
+                         "Error opening input files: Invalid data found when processing input")
+        self.assertEqual(len(tail.splitlines()), 2)
+
+    def test_failure_message_is_last_line(self):
+        failure = BatchFailure("bad.wav", "lightning", "Applying effects...", FFMPEG_ERROR, 1)
+        self.assertEqual(failure.message, "Error opening input files: Invalid data found when processing input")
+        self.assertFalse(failure.transient)
+
+    def test_retry_delay_backs_off(self):
+        self.assertEqual([retry_delay(n, base=0.5) for n in (1, 2, 3)], [0.5, 1.0, 2.0])
+
+    def test_report(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            self.assertIsNone(write_failure_report([], temp_dir))
+            failure = BatchFailure("bad.wav", "standard", "decode", FFMPEG_ERROR, 3)
+            path = write_failure_report([failure], temp_dir)
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+            self.assertEqual(report[0]["file"], "bad.wav")
+            self.assertEqual(report[0]["stage"], "decode")
+            self.assertEqual(report[0]["attempts"], 3)
+            self.assertIn("Invalid data", report[0]["stderr_tail"])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch manifest used to skip unchanged files
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import batch_manifest
+from batch_manifest import BatchManifest, options_hash
+
+
+class TestBatchManifest(unittest.TestCase):
+    """Test output validity checks and input hash caching"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = {"processed_output_folder": os.path.join(self.temp_dir, "out")}
+        os.makedirs(self.config["processed_output_folder"])
+        self.options = {"tempo_change": 110.0, "normalize": True}
+        self.inputs = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir, f"song_{i}.wav")
+            with open(path, "wb") as f:
+                f.write(os.urandom(2048))
+            self.inputs.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_output(self, manifest, input_path):
+        output_path = manifest.default_output_path(input_path)
+        with open(output_path, "wb") as f:
+            f.write(b"mp3 data")
+        manifest.record(input_path, output_path, self.options)
+        return output_path
+
+    def test_options_hash_is_normalised(self):
+        self.assertEqual(options_hash({"b": 1.0, "a": None, "c": True}), options_hash({"c": True, "b": 1}))
+        self.assertNotEqual(options_hash({"b": 1.0}), options_hash({"b": 1.5}))
+
+    def test_output_stays_current_across_runs(self):
+        manifest = BatchManifest(self.config)
+        output_path = self.make_output(manifest, self.inputs[0])
+        manifest.save()
+
+        reloaded = BatchManifest(self.config)
+        self.assertTrue(reloaded.is_current(self.inputs[0], output_path, self.options))
+        self.assertEqual(reloaded.find_current(self.inputs, self.options), {0: output_path})
+
+    def test_changes_invalidate_output(self):
+        manifest = BatchManifest(self.config)
+        output_path = self.make_output(manifest, self.inputs[0])
+
+        self.assertFalse(manifest.is_current(self.inputs[0], output_path, {"tempo_change": 120.0}))
+        self.assertFalse(BatchManifest(self.config, version="other").is_current(
+            self.inputs[0], output_path, self.options))
+
+        with open(output_path, "ab") as f:
+            f.write(b"edited")
+        self.assertFalse(manifest.is_current(self.inputs[0], output_path, self.options))
+
+        output_path = self.make_output(manifest, self.inputs[0])
+        with open(self.inputs[0], "r+b") as f:
+            f.write(b"changed")
+        os.utime(self.inputs[0], ns=(0, 10 ** 9))
+        self.assertFalse(manifest.is_current(self.inputs[0], output_path, self.options))
+
+        os.remove(output_path)
+        self.assertFalse(manifest.is_current(self.inputs[0], output_path, self.options))
+
+    def test_unchanged_inputs_are_not_rehashed(self):
+        manifest = BatchManifest(self.config)
+        for path in self.inputs:
+            self.make_output(manifest, path)
+        manifest.save()
+
+        reloaded = BatchManifest(self.config)
+        with mock.patch.object(batch_manifest, "hash_file", wraps=batch_manifest.hash_file) as hashed:
+            self.assertEqual(len(reloaded.find_current(self.inputs, self.options)), 3)
+            self.assertEqual(hashed.call_count, 0)
+
+            os.utime(self.inputs[1], ns=(0, 10 ** 9))  # touched, same content
+            self.assertEqual(len(reloaded.find_current(self.inputs, self.options)), 3)
+            self.assertEqual(hashed.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for batch ordering and ETA prediction
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from batch_scheduler import BatchScheduler, format_eta
+from processor_planner import ProcessorPlanner
+
+
+class TestBatchScheduler(unittest.TestCase):
+    """Test duration probing, policies and ETA"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.files = []
+        for name, seconds in (("medium", 2.0), ("long", 4.0), ("short", 1.0)):
+            path = os.path.join(self.temp_dir, f"{name}.wav")
+            sf.write(path, np.zeros(int(8000 * seconds)), 8000)
+            self.files.append(path)
+        planner = ProcessorPlanner(backends={"lightning": object()},
+                                   cost_file=os.path.join(self.temp_dir, "cost.json"))
+        # One second of work per second of audio, nothing fixed
+        planner.costs["lightning"] = {"startup": [0.0, 0.0], "encode": [0.0, 1.0]}
+        self.planner = planner
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_probes_durations(self):
+        schedule = BatchScheduler().schedule(self.files, {}, policy="fifo")
+        self.assertEqual([round(d, 2) for d in schedule.durations], [2.0, 4.0, 1.0])
+
+    def test_known_durations_are_not_probed_again(self):
+        known = {self.files[1]: 9.0}
+        schedule = BatchScheduler().schedule(self.files, {}, policy="fifo", known_durations=known)
+        self.assertEqual([round(d, 2) for d in schedule.durations], [2.0, 9.0, 1.0])
+
+    def test_policies(self):
+        scheduler = BatchScheduler(planner=self.planner)
+        self.assertEqual(scheduler.schedule(self.files, {}, policy="fifo").order, [0, 1, 2])
+        self.assertEqual(scheduler.schedule(self.files, {}, policy="sjf").order, [2, 0, 1])
+        self.assertEqual(scheduler.schedule(self.files, {}, policy="ljf").order, [1, 0, 2])
+        with self.assertRaises(ValueError):
+            scheduler.schedule(self.files, {}, policy="random")
+
+    def test_auto_policy(self):
+        scheduler = BatchScheduler(planner=self.planner)
+        self.assertEqual(scheduler.schedule(self.files, {}, workers=1).policy, "sjf")
+        self.assertEqual(scheduler.schedule(self.files, {}, workers=2).policy, "ljf")
+
+    def test_eta(self):
+        scheduler = BatchScheduler(planner=self.planner)
+        sjf = scheduler.schedule(self.files, {}, policy="sjf", workers=1)
+        self.assertAlmostEqual(sjf.eta(), 7.0, places=2)
+        self.assertAlmostEqual(sjf.first_result_eta(), 1.0, places=2)
+
+        # Longest first packs two workers best: [4] and [2, 1]
+        ljf = scheduler.schedule(self.files, {}, policy="ljf", workers=2)
+        self.assertAlmostEqual(ljf.eta(), 4.0, places=2)
+        fifo = scheduler.schedule(self.files, {}, policy="fifo", workers=2)
+        self.assertAlmostEqual(fifo.eta(), 4.0, places=2)
+        self.assertAlmostEqual(scheduler.schedule(self.files, {}, policy="sjf", workers=2).eta(), 5.0, places=2)
+
+    def test_eta_unknown_without_planner(self):
+        schedule = BatchScheduler().schedule(self.files, {})
+        self.assertIsNone(schedule.eta())
+        self.assertEqual(schedule.order, [2, 0, 1])
+
+    def test_format_eta(self):
+        self.assertEqual(format_eta(12.4), "12s")
+        self.assertEqual(format_eta(185), "3m 05s")
+        self.assertEqual(format_eta(3720), "1h 02m")
+        self.assertEqual(format_eta(None), "unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for adaptive batch concurrency
+"""
+
+import os
+import sys
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from concurrency_controller import ConcurrencyController, apply_thread_limits, ffmpeg_thread_args, thread_env
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestConcurrencyController(unittest.TestCase):
+    """Test the AIMD decisions with a scripted sampler and clock"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sample = {'cpu': 0.5, 'load': 0.5}
+        self.controller = ConcurrencyController(
+            {'initial_jobs': 2, 'concurrency_interval': 1.0}, max_jobs=8, cpu_count=8,
+            sampler=lambda: dict(self.sample), clock=self.clock)
+
+    def run_window(self, audio_seconds, jobs_done=None):
+        """Finish a window's worth of jobs over ten seconds"""
+        jobs_done = jobs_done or self.controller.jobs
+        self.clock.now += 10.0
+        for _ in range(jobs_done):
+            jobs = self.controller.record(audio_seconds / jobs_done, 1.0)
+        return jobs
+
+    def test_adds_jobs_while_cpu_has_headroom(self):
+        self.assertEqual(self.controller.threads_per_job(), 4)
+        self.assertEqual(self.run_window(100.0), 3)
+        # The new level is measured before it is built on
+        self.assertEqual(self.run_window(140.0), 3)
+        self.assertEqual(self.controller.history[-1]['reason'], 'settle')
+        self.assertEqual(self.run_window(140.0), 4)
+        self.assertEqual(self.controller.threads_per_job(), 2)
+        self.assertEqual(self.controller.history[-1]['reason'], 'headroom')
+
+    def test_holds_when_cpu_is_saturated(self):
+        self.sample = {'cpu': 0.97, 'load': 1.0}
+        self.assertEqual(self.run_window(100.0), 2)
+        self.assertEqual(self.controller.history[-1]['reason'], 'hold')
+
+    def test_halves_jobs_when_load_shows_thrashing(self):
+        self.run_window(100.0)
+        self.run_window(150.0)
+        self.run_window(150.0)
+        self.assertEqual(self.controller.jobs, 4)
+        self.sample = {'cpu': 1.0, 'load': 3.0}
+        # One busy window is smoothed away, a sustained one is not
+        self.assertEqual(self.run_window(150.0), 4)
+        self.assertEqual(self.run_window(150.0), 2)
+        self.assertEqual(self.controller.history[-1]['reason'], 'load')
+
+    def test_takes_back_increase_that_lowers_throughput(self):
+        self.run_window(100.0)
+        self.assertEqual(self.controller.jobs, 3)
+        self.run_window(60.0)
+        self.assertEqual(self.run_window(60.0), 2)
+        self.assertEqual(self.controller.history[-1]['reason'], 'throughput')
+        # No new probe straight away
+        self.assertEqual(self.run_window(60.0), 2)
+        self.assertEqual(self.controller.history[-1]['reason'], 'hold')
+
+    def test_throughput_dip_without_increase_is_ignored(self):
+        self.sample = {'cpu': 0.97, 'load': 1.0}
+        self.run_window(100.0)
+        self.assertEqual(self.run_window(40.0), 2)
+        self.assertEqual(self.controller.history[-1]['reason'], 'hold')
+
+    def test_waits_for_full_window(self):
+        self.controller.record(10.0, 1.0)
+        self.assertEqual(self.controller.jobs, 2)
+        self.controller.record(10.0, 1.0)  # enough jobs but interval not over
+        self.assertEqual(self.controller.jobs, 2)
+
+    def test_never_exceeds_max_jobs(self):
+        controller = ConcurrencyController({'initial_jobs': 2, 'concurrency_interval': 0}, max_jobs=2,
+                                           cpu_count=8, sampler=lambda: {'cpu': 0.1, 'load': 0.1})
+        for _ in range(10):
+            controller.record(10.0)
+        self.assertEqual(controller.jobs, 2)
+
+
+class TestThreadLimits(unittest.TestCase):
+    """Test per-job thread caps"""
+
+    def setUp(self):
+        self.saved_env = dict(os.environ)
+
+    def tearDown(self):
+        apply_thread_limits(None)
+        os.environ.clear()
+        os.environ.update(self.saved_env)
+
+    def test_thread_env(self):
+        env = thread_env(3)
+        self.assertEqual(env['OMP_NUM_THREADS'], '3')
+        self.assertEqual(env['OPENBLAS_NUM_THREADS'], '3')
+
+    def test_ffmpeg_args_follow_limit(self):
+        self.assertEqual(ffmpeg_thread_args(), [])
+        apply_thread_limits(2)
+        self.assertEqual(ffmpeg_thread_args(), ['-threads', '2'])
+        self.assertEqual(os.environ['OMP_NUM_THREADS'], '2')
+        apply_thread_limits(None)
+        self.assertEqual(ffmpeg_thread_args(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed output store
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import content_store
+from content_store import ContentStore
+
+
+class TestContentStore(unittest.TestCase):
+    """Test storing, linking and pruning results"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = {"processed_output_folder": os.path.join(self.temp_dir, "processed")}
+        os.makedirs(self.config["processed_output_folder"])
+        self.store = ContentStore(self.config)
+        self.key = self.store.key("abc123", {"tempo_change": 110.0})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def output(self, name, data=b"encoded audio"):
+        path = os.path.join(self.config["processed_output_folder"], name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_store_lives_next_to_output_folder(self):
+        self.assertEqual(self.store.root, os.path.join(self.temp_dir, ".sunoready_store"))
+
+    def test_key_depends_on_input_and_options(self):
+        self.assertEqual(self.key, self.store.key("abc123", {"tempo_change": 110}))
+        self.assertNotEqual(self.key, self.store.key("abc124", {"tempo_change": 110}))
+        self.assertNotEqual(self.key, self.store.key("abc123", {"tempo_change": 105}))
+
+    def test_adopt_and_link_share_one_copy(self):
+        first = self.output("a_processed.mp3")
+        stored = self.store.adopt(self.key, first)
+        self.assertEqual(self.store.lookup(self.key), stored)
+
+        second = os.path.join(self.config["processed_output_folder"], "b_processed.mp3")
+        self.assertEqual(self.store.link(stored, second), "hardlink")
+        self.assertEqual(os.stat(first).st_ino, os.stat(stored).st_ino)
+        self.assertEqual(os.stat(second).st_ino, os.stat(stored).st_ino)
+
+    def test_adopt_existing_result_replaces_output_with_link(self):
+        stored = self.store.adopt(self.key, self.output("a_processed.mp3"))
+        duplicate = self.output("b_processed.mp3", b"encoded audio")
+
+        self.assertEqual(self.store.adopt(self.key, duplicate), stored)
+        self.assertEqual(os.stat(duplicate).st_ino, os.stat(stored).st_ino)
+
+    def test_falls_back_to_copy(self):
+        stored = self.store.adopt(self.key, self.output("a_processed.mp3"))
+        target = os.path.join(self.config["processed_output_folder"], "c_processed.mp3")
+        with mock.patch.object(content_store.os, "link", side_effect=OSError("cross-device")), \
+                mock.patch.object(content_store, "_reflink", side_effect=OSError("unsupported")):
+            self.assertEqual(self.store.link(stored, target), "copy")
+        self.assertNotEqual(os.stat(target).st_ino, os.stat(stored).st_ino)
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), b"encoded audio")
+
+    def test_prune_removes_unreferenced_results(self):
+        output = self.output("a_processed.mp3")
+        stored = self.store.adopt(self.key, output)
+        self.assertEqual(self.store.prune(), 0)
+
+        os.remove(output)
+        self.assertEqual(self.store.prune(), 1)
+        self.assertFalse(os.path.exists(stored))
+
+    def test_prune_keeps_newest_results_within_limit(self):
+        paths = []
+        for i in range(3):
+            output = self.output(f"{i}_processed.mp3", b"x" * 1000)
+            paths.append(self.store.adopt(self.store.key(str(i), {}), output))
+            os.remove(output)
+            os.utime(paths[-1], (1000 + i, 1000 + i))
+
+        self.assertEqual(self.store.prune(max_bytes=2000), 1)
+        self.assertEqual([os.path.exists(p) for p in paths], [False, True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
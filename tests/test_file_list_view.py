@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the file list model behind the virtualised files view
+"""
+
+import os
+import sys
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from file_list_view import FileListModel, visible_range, QUEUED, RUNNING, DONE, FAILED
+
+
+class TestFileListModel(unittest.TestCase):
+
+    def test_extend_skips_duplicates(self):
+        model = FileListModel()
+        added = model.extend(["/music/a.mp3", "/music/b.mp3"])
+        added += model.extend(["/music/b.mp3", "/music/../music/a.mp3", "/music/c.mp3"])
+
+        self.assertEqual(added, ["/music/a.mp3", "/music/b.mp3", "/music/c.mp3"])
+        self.assertEqual(len(model), 3)
+        self.assertEqual(model.index_of("/music/c.mp3"), 2)
+
+    def test_rows_and_status(self):
+        model = FileListModel()
+        model.extend([os.path.join("music", "a.mp3"), os.path.join("music", "b.mp3")])
+        model.set_all(QUEUED)
+        version = model.version
+
+        self.assertTrue(model.set_status(os.path.join("music", "b.mp3"), RUNNING))
+        self.assertFalse(model.set_status("other.mp3", DONE))
+        self.assertGreater(model.version, version)
+        self.assertEqual(model.row(0), ("1. a.mp3", QUEUED))
+        self.assertEqual(model.row(1), ("2. b.mp3", RUNNING))
+
+    def test_counts_and_clear(self):
+        model = FileListModel()
+        paths = model.paths
+        model.extend([f"/music/{i}.mp3" for i in range(50000)])
+        model.set_status("/music/7.mp3", FAILED)
+
+        counts = model.counts()
+        self.assertEqual(counts[FAILED], 1)
+        self.assertEqual(counts[None], 49999)
+
+        model.clear()
+        self.assertEqual(len(model), 0)
+        # The list object is kept, so aliases see the change
+        self.assertIs(model.paths, paths)
+        self.assertEqual(model.counts(), {})
+
+
+class TestVisibleRange(unittest.TestCase):
+
+    def test_window_is_clamped(self):
+        self.assertEqual(visible_range(0, 4, 100), (0, 4))
+        self.assertEqual(visible_range(98, 4, 100), (96, 100))
+        self.assertEqual(visible_range(-5, 4, 100), (0, 4))
+        self.assertEqual(visible_range(3, 4, 2), (0, 2))
+        self.assertEqual(visible_range(0, 4, 0), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
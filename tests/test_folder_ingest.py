@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for background folder ingestion
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from folder_ingest import FolderIngest, format_probe, iter_audio_files, probe_audio
+
+
+class TestFolderIngest(unittest.TestCase):
+    """Test the directory walk, batching and probing"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.expected = []
+        for folder in ("", "b", os.path.join("b", "deep"), "a"):
+            os.makedirs(os.path.join(self.temp_dir, folder), exist_ok=True)
+            for i in range(3):
+                path = os.path.join(self.temp_dir, folder, f"song{i}.wav")
+                sf.write(path, np.zeros(8000 * (i + 1)), 8000)
+            with open(os.path.join(self.temp_dir, folder, "cover.jpg"), "wb") as f:
+                f.write(b"not audio")
+        # Files of a folder come before its subfolders, subfolders in name order
+        for folder in ("", "a", "b", os.path.join("b", "deep")):
+            self.expected += [os.path.join(self.temp_dir, folder, f"song{i}.wav") for i in range(3)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_walk_finds_audio_in_order(self):
+        self.assertEqual(list(iter_audio_files(self.temp_dir)), self.expected)
+
+    def test_unreadable_folder_is_reported(self):
+        errors = []
+        missing = os.path.join(self.temp_dir, "missing")
+        self.assertEqual(list(iter_audio_files(missing, on_error=lambda p, e: errors.append(p))), [])
+        self.assertEqual(errors, [missing])
+
+    def test_batches_and_probes(self):
+        batches, probes = [], {}
+        lock = threading.Lock()
+
+        def on_probed(path, info):
+            with lock:
+                probes[path] = info
+
+        ingest = FolderIngest({'ingest_batch_size': 5, 'ingest_batch_interval': 60, 'probe_workers': 3})
+        ingest.start(self.temp_dir, batches.append, on_probed)
+        self.assertTrue(ingest.wait(30))
+
+        self.assertEqual([len(batch) for batch in batches], [5, 5, 2])
+        self.assertEqual([path for batch in batches for path in batch], self.expected)
+        self.assertEqual(ingest.found, 12)
+        self.assertEqual(ingest.probed, 12)
+        self.assertAlmostEqual(probes[self.expected[2]]['duration'], 3.0, places=2)
+        self.assertEqual(probes[self.expected[2]]['format'], 'wav')
+
+    def test_cancel_stops_walk(self):
+        batches = []
+        ingest = FolderIngest({'ingest_batch_size': 1})
+        ingest.cancel()
+        ingest.run(self.temp_dir, batches.append)
+        self.assertEqual(batches, [])
+        self.assertTrue(ingest.done.is_set())
+
+    def test_format_probe(self):
+        info = probe_audio(self.expected[0])
+        self.assertTrue(format_probe(info).startswith("0:01 wav"))
+        self.assertEqual(format_probe({'duration': 192.0, 'format': 'mp3', 'bitrate': 320000}), "3:12 mp3 320k")
+
+
+if __name__ == '__main__':
+    unittest.main()
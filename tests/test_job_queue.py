@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for the durable job queue
+"""
+
+import os
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from batch_failures import BatchFailure
+from job_queue import JobQueue
+
+
+class _Result:
+    """Minimal stand-in for BatchResult"""
+
+    def __init__(self, index, output_path=None, failure=None):
+        self.index = index
+        self.output_path = output_path
+        self.failure = failure
+
+
+class TestJobQueue(unittest.TestCase):
+    """Test enqueueing, claiming, recovery and draining"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "queue.db")
+        self.queue = JobQueue(path=self.path)
+        self.options = {"tempo_change": 105.0, "pitch_semitones": 1.0}
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_database_uses_wal(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        finally:
+            conn.close()
+
+    def test_jobs_survive_reopening(self):
+        batch_id = self.queue.enqueue(["a.wav", "b.wav"], self.options)
+        reopened = JobQueue(path=self.path)
+        jobs = reopened.jobs(batch_id=batch_id)
+        self.assertEqual([os.path.basename(job.input_path) for job in jobs], ["a.wav", "b.wav"])
+        self.assertEqual(jobs[0].options, self.options)
+        self.assertEqual(reopened.counts()["pending"], 2)
+
+    def test_claim_complete_and_fail(self):
+        self.queue.enqueue(["a.wav", "b.wav", "c.wav"], self.options)
+        claimed = self.queue.claim(limit=2)
+        self.assertEqual(len(claimed), 2)
+        self.assertTrue(all(job.status == "running" and job.attempts == 1 for job in claimed))
+        # Claimed jobs are not handed out twice
+        self.assertEqual(len(self.queue.claim()), 1)
+        self.assertEqual(self.queue.claim(), [])
+
+        self.queue.complete(claimed[0].id, "out/a.mp3")
+        self.queue.fail(claimed[1].id, {"message": "Invalid data"})
+        counts = self.queue.counts()
+        self.assertEqual((counts["done"], counts["failed"], counts["running"]), (1, 1, 1))
+        failed = self.queue.jobs("failed")[0]
+        self.assertEqual(failed.error["message"], "Invalid data")
+
+        self.assertEqual(self.queue.retry_failed(), 1)
+        self.assertEqual(self.queue.counts()["pending"], 1)
+        self.assertEqual(self.queue.clear(), 1)
+
+    def test_recover_requeues_jobs_of_dead_processes(self):
+        self.queue.enqueue(["a.wav", "b.wav", "c.wav"], self.options)
+        # A process that has exited stands in for a crashed app
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        host = socket.gethostname()
+        self.queue.claim(limit=1, owner=f"{host}:{dead.pid}")
+        self.queue.claim(limit=1)
+        self.queue.claim(limit=1, owner="other-host:1")
+
+        self.assertEqual(self.queue.recover(), 1)
+        counts = self.queue.counts()
+        # Our own and other hosts' running jobs are left alone
+        self.assertEqual((counts["pending"], counts["running"]), (1, 2))
+
+    def test_drain_groups_by_options_and_records_results(self):
+        self.queue.enqueue(["a.wav", "b.wav"], self.options, output_paths=["x/a.mp3", "x/b.mp3"])
+        self.queue.enqueue(["c.wav"], {"tempo_change": 90.0})
+        calls = []
+
+        def run_batch(files, options, output_paths, file_callback):
+            calls.append(([os.path.basename(f) for f in files], options, output_paths))
+            results = []
+            for index, path in enumerate(files):
+                if path.endswith("b.wav"):
+                    error = RuntimeError("Error opening input files: Invalid data")
+                    result = _Result(index, failure=BatchFailure(path, "lightning", "encode", error, 1))
+                else:
+                    result = _Result(index, output_path=path + ".mp3")
+                file_callback(result)
+                results.append(result)
+            return results
+
+        processed = self.queue.drain(run_batch)
+        self.assertEqual(len(processed), 3)
+        self.assertEqual(calls[0], (["a.wav", "b.wav"], self.options, ["x/a.mp3", "x/b.mp3"]))
+        self.assertEqual(calls[1], (["c.wav"], {"tempo_change": 90.0}, None))
+        counts = self.queue.counts()
+        self.assertEqual((counts["pending"], counts["done"], counts["failed"]), (0, 2, 1))
+        self.assertEqual(self.queue.jobs("failed")[0].error["stage"], "encode")
+
+    def test_drain_one_batch_leaves_other_jobs_pending(self):
+        self.queue.enqueue(["gui.wav"], self.options)
+        batch_id = self.queue.enqueue(["cli.wav"], self.options)
+
+        def run_batch(files, options, output_paths, file_callback):
+            return [_Result(index, output_path=path + ".mp3") for index, path in enumerate(files)]
+
+        processed = self.queue.drain(run_batch, batch_id=batch_id)
+        self.assertEqual([os.path.basename(job.input_path) for job, _ in processed], ["cli.wav"])
+        self.assertEqual(self.queue.counts()["pending"], 1)
+        self.assertEqual(self.queue.counts(batch_id)["done"], 1)
+
+    def test_drain_fails_jobs_left_by_a_crashing_batch(self):
+        self.queue.enqueue(["a.wav", "b.wav"], self.options)
+
+        def run_batch(files, options, output_paths, file_callback):
+            file_callback(_Result(0, output_path="a.mp3"))
+            raise RuntimeError("executor crashed")
+
+        with self.assertRaises(RuntimeError):
+            self.queue.drain(run_batch)
+        counts = self.queue.counts()
+        self.assertEqual((counts["done"], counts["failed"], counts["running"]), (1, 1, 0))
+
+    def test_drain_returns_unstarted_groups_when_a_batch_crashes(self):
+        self.queue.enqueue(["a.wav"], self.options)
+        self.queue.enqueue(["b.wav"], dict(self.options, normalize=True))
+
+        def run_batch(files, options, output_paths, file_callback):
+            raise RuntimeError("executor crashed")
+
+        with self.assertRaises(RuntimeError):
+            self.queue.drain(run_batch)
+        counts = self.queue.counts()
+        self.assertEqual((counts["failed"], counts["pending"], counts["running"]), (1, 1, 0))
+        pending = self.queue.jobs("pending")[0]
+        self.assertEqual((pending.attempts, pending.owner), (0, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the MP3 bitstream editor (trim, tag stripping, concatenation)
+
+Unit tests work on synthetic Layer III frames; the integration tests use
+FFmpeg to encode and decode real files and are skipped if it is missing.
+"""
+
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import mp3_utils
+from mp3_utils import MP3Bitstream, MP3FormatError
+
+FFMPEG_AVAILABLE = shutil.which("ffmpeg") is not None
+
+
+def make_frame(main_data_begin=0, fill=0x00, sample_rate_bits=0x00):
+    """Build a 128 kbps MPEG-1 Layer III stereo frame (417 bytes)"""
+    header = bytes([0xFF, 0xFB, 0x90 | sample_rate_bits, 0x00])
+    frame = bytearray(header + bytes([fill]) * 413)
+    frame[4:36] = bytes(32)
+    frame[4] = (main_data_begin >> 1) & 0xFF
+    frame[5] = (main_data_begin & 1) << 7
+    return bytes(frame)
+
+
+def make_id3v2(payload=b"TIT2 test"):
+    size = len(payload)
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b"ID3\x03\x00\x00" + syncsafe + payload
+
+
+def make_ape(items=b"\x00" * 20):
+    footer = b"APETAGEX" + struct.pack("<IIII", 2000, len(items) + 32, 1, 0) + bytes(8)
+    return items + footer
+
+
+class TestMP3BitstreamUnit(unittest.TestCase):
+    """Unit tests on synthetic frames"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, name, data):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_parse_frame_header(self):
+        frame = mp3_utils.parse_frame_header(make_frame(main_data_begin=300), 0)
+        self.assertEqual(frame.size, 417)
+        self.assertEqual(frame.sample_rate, 44100)
+        self.assertEqual(frame.samples, 1152)
+        self.assertEqual(frame.channels, 2)
+        self.assertEqual(frame.main_data_begin, 300)
+        self.assertEqual(frame.main_data_size, 417 - 4 - 32)
+
+    def test_rejects_non_layer3(self):
+        self.assertIsNone(mp3_utils.parse_frame_header(b"\xFF\xFD\x90\x00" + bytes(100), 0))
+        with self.assertRaises(MP3FormatError):
+            MP3Bitstream(b"RIFF" + bytes(1000))
+
+    def test_strip_tags(self):
+        frames = b"".join(make_frame() for _ in range(10))
+        data = make_id3v2() + frames + make_ape() + b"TAG" + bytes(125)
+        path = self.write("tagged.mp3", data)
+
+        mp3_utils.strip_tags(path)
+
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), frames)
+
+    def test_skips_junk_between_tag_and_audio(self):
+        frames = b"".join(make_frame() for _ in range(5))
+        stream = MP3Bitstream(make_id3v2() + b"\x00\xFF\x12junk" + frames)
+        self.assertEqual(len(stream.frames), 5)
+
+    def test_trim_keeps_whole_frames(self):
+        stream = MP3Bitstream(b"".join(make_frame() for _ in range(100)))
+        duration = 1152 * 10 / 44100.0
+        trimmed = MP3Bitstream(stream.trim(duration=duration))
+        self.assertEqual(len(trimmed.frames), 10)
+
+    def test_trim_start_adds_priming_frame_for_reservoir(self):
+        frames = [make_frame(fill=i) for i in range(20)]
+        frames[10] = make_frame(main_data_begin=200, fill=10)
+        stream = MP3Bitstream(b"".join(frames))
+
+        out = MP3Bitstream(stream.render(first=10))
+
+        # One priming frame plus frames 10..19
+        self.assertEqual(len(out.frames), 11)
+        priming = out.frames[0]
+        raw = out.frame_bytes(priming)
+        self.assertEqual(priming.main_data_begin, 0)
+        self.assertEqual(raw[-200:], bytes([9]) * 200)
+        self.assertEqual(out.frame_bytes(out.frames[1]), frames[10])
+
+    def test_concatenate(self):
+        a = self.write("a.mp3", make_id3v2() + b"".join(make_frame() for _ in range(3)))
+        b = self.write("b.mp3", b"".join(make_frame(fill=1) for _ in range(4)))
+        out = os.path.join(self.temp_dir, "ab.mp3")
+
+        mp3_utils.concatenate([a, b], out)
+
+        self.assertEqual(len(MP3Bitstream.from_file(out).frames), 7)
+
+    def test_concatenate_rejects_mixed_sample_rates(self):
+        a = self.write("a.mp3", b"".join(make_frame() for _ in range(3)))
+        b = self.write("b.mp3", b"".join(make_frame(sample_rate_bits=0x04) for _ in range(3)))
+        with self.assertRaises(MP3FormatError):
+            mp3_utils.concatenate([a, b], os.path.join(self.temp_dir, "ab.mp3"))
+
+
+@unittest.skipUnless(FFMPEG_AVAILABLE, "FFmpeg not available")
+class TestMP3BitstreamFFmpeg(unittest.TestCase):
+    """Round-trip tests against FFmpeg's decoder"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.source = os.path.join(cls.temp_dir, "source.mp3")
+        subprocess.run([
+            "ffmpeg", "-y", "-v", "error", "-f", "lavfi", "-i", "sine=f=440:d=6",
+            "-ac", "2", "-metadata", "title=Test", "-c:a", "libmp3lame", "-q:a", "2",
+            cls.source
+        ], check=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+    def decoded_samples(self, path):
+        result = subprocess.run(
+            ["ffmpeg", "-v", "error", "-i", path, "-f", "s16le", "-ac", "1", "-"],
+            capture_output=True
+        )
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stderr, b"")
+        return len(result.stdout) // 2
+
+    def test_trim_is_sample_exact(self):
+        out = os.path.join(self.temp_dir, "trim.mp3")
+        mp3_utils.trim(self.source, out, 2.5)
+        self.assertEqual(self.decoded_samples(out), int(2.5 * 44100))
+
+    def test_trim_with_start_is_sample_exact(self):
+        out = os.path.join(self.temp_dir, "middle.mp3")
+        mp3_utils.trim(self.source, out, 1.0, start=2.2)
+        self.assertEqual(self.decoded_samples(out), 44100)
+
+    def test_strip_tags_keeps_audio(self):
+        out = os.path.join(self.temp_dir, "clean.mp3")
+        mp3_utils.strip_tags(self.source, out)
+        self.assertEqual(self.decoded_samples(out), self.decoded_samples(self.source))
+        with open(out, "rb") as f:
+            self.assertNotEqual(f.read(3), b"ID3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for segment-parallel MP3 encoding
+Checks segment planning and that the joined stream is gapless
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from parallel_encoder import ParallelMP3Encoder, OVERLAP_FRAMES
+
+FFMPEG_AVAILABLE = shutil.which("ffmpeg") is not None
+
+
+class TestSegmentPlanning(unittest.TestCase):
+    """Unit tests for segment boundaries"""
+
+    def test_segments_are_frame_aligned_and_contiguous(self):
+        encoder = ParallelMP3Encoder({'encode_segment_seconds': 5})
+        n_samples = 44100 * 23 + 123
+        segments = encoder.plan_segments(n_samples, 44100)
+
+        self.assertEqual(segments[0][0], 0)
+        self.assertEqual(segments[-1][1], n_samples)
+        for (_, end, _, _), (start, _, _, _) in zip(segments, segments[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(start % 1152, 0)
+
+    def test_segments_carry_overlap(self):
+        encoder = ParallelMP3Encoder({'encode_segment_seconds': 5})
+        segments = encoder.plan_segments(44100 * 20, 44100)
+        keep_start, keep_end, chunk_start, chunk_end = segments[1]
+        self.assertEqual(keep_start - chunk_start, OVERLAP_FRAMES * 1152)
+        self.assertEqual(chunk_end - keep_end, OVERLAP_FRAMES * 1152)
+
+    def test_short_buffers_are_not_split(self):
+        encoder = ParallelMP3Encoder({'parallel_encode_min_seconds': 300}, max_workers=8)
+        self.assertFalse(encoder.should_use(44100 * 60, 44100))
+        self.assertTrue(encoder.should_use(44100 * 600, 44100))
+
+
+@unittest.skipUnless(FFMPEG_AVAILABLE, "FFmpeg not available")
+class TestParallelEncodeFFmpeg(unittest.TestCase):
+    """Encode, decode and compare against the source PCM"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_joined_stream_is_gapless(self):
+        sr = 44100
+        t = np.arange(sr * 20) / sr
+        y = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+        output = os.path.join(self.temp_dir, "parallel.mp3")
+
+        encoder = ParallelMP3Encoder({'encode_segment_seconds': 4}, max_workers=3)
+        encoder.encode(y, sr, output)
+
+        result = subprocess.run(
+            ["ffmpeg", "-v", "warning", "-i", output, "-f", "f32le", "-"],
+            capture_output=True
+        )
+        decoded = np.frombuffer(result.stdout, dtype=np.float32)
+        self.assertEqual(result.stderr, b"")
+        self.assertEqual(len(decoded), len(y))
+        # No clicks or gaps at the segment seams
+        self.assertLess(np.max(np.abs(decoded - y)), 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for stage timing and the performance monitor
+"""
+
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from perf_monitor import PerfMonitor, StageCollector, format_bytes, record_stage, stage_timer
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStageCollector(unittest.TestCase):
+
+    def test_collects_only_own_thread(self):
+        def other_thread():
+            record_stage('decode', 5.0)
+
+        with StageCollector() as collector:
+            with stage_timer('dsp'):
+                pass
+            record_stage('encode', 0.5)
+            record_stage('encode', 0.25)
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+        record_stage('encode', 1.0)  # after the collector closed
+
+        self.assertEqual(set(collector.totals), {'dsp', 'encode'})
+        self.assertAlmostEqual(collector.totals['encode'], 0.75)
+
+
+class TestPerfMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.monitor = PerfMonitor({'perf_window': 60}, clock=self.clock, sampler=lambda: {'cpu': 0.5})
+
+    def test_throughput_and_realtime(self):
+        self.monitor.batch_started(10, workers=2)
+        self.monitor.set_active(2, queued=8)
+        for _ in range(4):
+            self.clock.now += 15.0
+            self.monitor.file_finished(30.0, audio_seconds=180.0, stages={'decode': 10.0, 'encode': 20.0})
+        self.monitor.file_finished(None, ok=False)
+
+        snapshot = self.monitor.snapshot()
+        self.assertAlmostEqual(snapshot['files_per_min'], 4.0)
+        self.assertAlmostEqual(snapshot['realtime'], 12.0)
+        self.assertEqual((snapshot['processed'], snapshot['failed']), (4, 1))
+        self.assertEqual((snapshot['active_workers'], snapshot['queue_depth'], snapshot['workers']), (2, 8, 2))
+        self.assertEqual(list(snapshot['stages']), ['encode', 'decode'])
+        self.assertAlmostEqual(snapshot['stages']['decode']['share'], 1 / 3)
+        self.assertEqual(snapshot['cpu'], 0.5)
+
+    def test_old_completions_leave_the_window(self):
+        self.monitor.batch_started(2, workers=1)
+        self.monitor.file_finished(1.0, audio_seconds=60.0)
+        self.clock.now += 120.0
+        snapshot = self.monitor.snapshot()
+        self.assertEqual(snapshot['files_per_min'], 0.0)
+        self.assertEqual(snapshot['processed'], 1)
+
+        self.monitor.batch_finished()
+        self.monitor.reset()
+        self.assertEqual(self.monitor.snapshot()['stages'], {})
+
+    def test_format_bytes(self):
+        self.assertEqual(format_bytes(512), "512 B")
+        self.assertEqual(format_bytes(3 * 1024 ** 3), "3.0 GB")
+        self.assertEqual(format_bytes(None), "n/a")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the step sequences shared by sync and async processor entry points
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from async_runner import AsyncSubprocessRunner
+from perf_monitor import StageCollector
+from pipeline_steps import Call, Command, run_steps, run_steps_async
+
+FFMPEG_AVAILABLE = shutil.which("ffmpeg") is not None
+
+
+def _steps(log):
+    """Echo through a child process, then pass the output to a function"""
+    try:
+        result = yield Command([sys.executable, "-c", "print('hello')"], "Echo failed", stage='echo')
+        length = yield Call(len, result.stdout.strip())
+        failed = yield Command([sys.executable, "-c", "import sys; sys.exit(3)"])
+        return length, failed.returncode
+    finally:
+        log.append("closed")
+
+
+def _failing_steps(log):
+    try:
+        yield Command([sys.executable, "-c", "import sys; sys.exit(1)"], "Step failed")
+        log.append("continued")
+    finally:
+        log.append("closed")
+
+
+class TestPipelineSteps(unittest.TestCase):
+    """Test that both drivers run a step generator the same way"""
+
+    def test_sync_and_async_give_the_same_result(self):
+        sync_log, async_log = [], []
+        self.assertEqual(run_steps(_steps(sync_log)), (5, 3))
+        runner = AsyncSubprocessRunner()
+        try:
+            self.assertEqual(asyncio.run(run_steps_async(_steps(async_log), runner)), (5, 3))
+        finally:
+            runner.shutdown()
+        self.assertEqual(sync_log, ["closed"])
+        self.assertEqual(async_log, ["closed"])
+
+    def test_failed_command_raises_and_closes_generator(self):
+        log = []
+        with self.assertRaisesRegex(Exception, "Step failed"):
+            run_steps(_failing_steps(log))
+        self.assertEqual(log, ["closed"])
+
+    def test_steps_are_timed(self):
+        with StageCollector() as collector:
+            run_steps(_steps([]))
+        self.assertIn('echo', collector.totals)
+
+
+@unittest.skipUnless(FFMPEG_AVAILABLE, "FFmpeg not available")
+class TestProcessorEntryPoints(unittest.TestCase):
+    """Test that the sync and async fast entry points run the same steps"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        sr = 22050
+        t = np.arange(2 * sr) / sr
+        self.input_path = os.path.join(self.temp_dir, "song.wav")
+        sf.write(self.input_path, (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32), sr)
+        self.config = {
+            'processed_output_folder': os.path.join(self.temp_dir, "out"),
+            'scratch_dir': os.path.join(self.temp_dir, "scratch"),
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_fast_sync_and_async_report_the_same_steps(self):
+        from fast_processor import FastAudioProcessor
+        processor = FastAudioProcessor(self.config)
+        options = {'fade_in': True, 'fade_in_duration': 0.5, 'normalize': True}
+
+        sync_messages, async_messages = [], []
+        sync_output = processor.process_audio_fast(
+            self.input_path, os.path.join(self.temp_dir, "sync.mp3"),
+            lambda progress, message: sync_messages.append(message), **options)
+        runner = AsyncSubprocessRunner()
+        try:
+            async_output = asyncio.run(processor.process_audio_fast_async(
+                self.input_path, os.path.join(self.temp_dir, "async.mp3"),
+                lambda progress, message: async_messages.append(message), runner=runner, **options))
+        finally:
+            runner.shutdown()
+
+        self.assertTrue(os.path.getsize(sync_output) > 0)
+        self.assertTrue(os.path.getsize(async_output) > 0)
+        self.assertEqual(sync_messages[-1], "Fast processing complete!")
+        self.assertEqual(sync_messages[-1], async_messages[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
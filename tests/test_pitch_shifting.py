@@ -300,6 +300,14 @@ class TestPitchShiftingIntegration(unittest.TestCase):
                         except:
                             pass
     
+    def test_ffmpeg_fallback_uses_input_sample_rate(self):
+        """Test the FFmpeg fallback filters at a 48 kHz input"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, "tone_48k.wav")
+            sf.write(input_path, np.zeros(4800, dtype=np.float32), 48000)
+            filters = self.lightning_processor._ffmpeg_pitch_filters(input_path, 12)
+        self.assertEqual(filters, ['asetrate=96000.000', 'aresample=48000', 'atempo=0.5'])
+    
     def get_dominant_frequency(self, y, sample_rate):
         """Get the dominant frequency from an audio signal"""
         # Apply FFT
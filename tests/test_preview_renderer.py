@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for excerpt previews
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+import wave
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from preview_renderer import PREVIEW_RATE, PreviewRenderer, choose_start, pitch_filters
+
+FFMPEG_AVAILABLE = shutil.which("ffmpeg") is not None
+
+
+class TestPreviewHelpers(unittest.TestCase):
+    """Test excerpt placement and the pitch filters"""
+
+    def test_start_a_third_in(self):
+        self.assertAlmostEqual(choose_start(90.0, 15.0), 30.0)
+
+    def test_start_keeps_excerpt_inside_file(self):
+        self.assertAlmostEqual(choose_start(20.0, 15.0), 5.0)
+        self.assertEqual(choose_start(10.0, 15.0), 0.0)
+        self.assertEqual(choose_start(None, 15.0), 0.0)
+
+    def test_no_pitch_no_filters(self):
+        self.assertEqual(pitch_filters(0), [])
+
+    def test_pitch_filters_keep_tempo(self):
+        filters = pitch_filters(12)
+        self.assertEqual(filters[0], f"asetrate={PREVIEW_RATE * 2:.3f}")
+        self.assertEqual(filters[2], "atempo=0.500000")
+        # Clamped to what a single atempo stage accepts
+        self.assertEqual(pitch_filters(24), filters)
+
+
+@unittest.skipUnless(FFMPEG_AVAILABLE, "FFmpeg not available")
+class TestPreviewRender(unittest.TestCase):
+    """Test rendering excerpts of a generated file"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        sr = 22050
+        t = np.arange(60 * sr) / sr
+        cls.input_path = str(Path(cls.temp_dir) / "song.wav")
+        sf.write(cls.input_path, (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32), sr)
+        cls.renderer = PreviewRenderer({'preview_folder': str(Path(cls.temp_dir) / "previews")})
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+    def test_render_writes_excerpt(self):
+        options = {'tempo_change': 100.0, 'pitch_semitones': 2.0, 'normalize': True, 'apply_highpass': True}
+        preview = self.renderer.render(self.input_path, options, duration=60.0)
+        self.assertAlmostEqual(preview.start, 20.0)
+        self.assertAlmostEqual(preview.duration, 15.0, delta=0.1)
+        with wave.open(preview.path, 'rb') as f:
+            self.assertEqual(f.getframerate(), PREVIEW_RATE)
+            self.assertEqual(f.getnchannels(), 2)
+
+    def test_length_is_clamped(self):
+        preview = self.renderer.render(self.input_path, {'tempo_change': 100.0}, start=0.0, seconds=60)
+        self.assertAlmostEqual(preview.duration, 20.0, delta=0.1)
+
+    def test_tempo_reads_more_source(self):
+        # 15 s heard at 120% tempo uses 18 s of source
+        preview = self.renderer.render(self.input_path, {'tempo_change': 120.0}, start=0.0, seconds=15)
+        self.assertAlmostEqual(preview.duration, 15.0, delta=0.1)
+
+    def test_start_past_end_fails(self):
+        with self.assertRaises(Exception):
+            self.renderer.render(self.input_path, {'tempo_change': 100.0}, start=120.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for cost-model-driven processor selection
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from processor_planner import (
+    ProcessorPlanner, backend_stages, requested_features, translate_options
+)
+
+
+class FakeProcessor:
+    """Stands in for a processor; records the keyword arguments it got"""
+
+    def __init__(self):
+        self.calls = []
+
+    def _record(self, input_path, output_path, progress_callback, **options):
+        self.calls.append(options)
+        return output_path
+
+    process_lightning_fast = process_audio_fast = process_audio_enhanced = _record
+
+
+class TestProcessorPlanner(unittest.TestCase):
+    """Test routing, option translation and cost fitting"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cost_file = os.path.join(self.temp_dir, "cost_model.json")
+        self.backends = {"lightning": FakeProcessor(), "fast": FakeProcessor(), "standard": FakeProcessor()}
+        self.planner = ProcessorPlanner(backends=self.backends, cost_file=self.cost_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_routes_to_backend_that_supports_options(self):
+        plan = self.planner.plan("song.mp3", {"add_noise": True, "normalize": True}, duration=60)
+        self.assertEqual(plan.backend, "standard")
+        self.assertNotIn("lightning", plan.estimates)
+
+        plan = self.planner.plan("song.mp3", {"fade_in": True}, duration=60)
+        self.assertEqual(set(plan.estimates), {"fast", "standard"})
+        self.assertEqual(plan.backend, min(plan.estimates, key=plan.estimates.get))
+
+    def test_routes_to_cheapest_backend(self):
+        self.planner.costs["fast"]["pitch"] = [0.0, 1.0]
+        plan = self.planner.plan("song.mp3", {"pitch_semitones": 2}, duration=60)
+        self.assertEqual(plan.backend, "lightning")
+
+        self.planner.costs["fast"]["pitch"] = [0.0, 0.01]
+        self.planner.costs["lightning"]["pitch"] = [0.0, 2.0]
+        plan = self.planner.plan("song.mp3", {"pitch_semitones": 2}, duration=60)
+        self.assertEqual(plan.backend, "fast")
+
+    def test_unsupported_options_raise(self):
+        planner = ProcessorPlanner(backends={"lightning": FakeProcessor()}, cost_file=self.cost_file)
+        with self.assertRaises(Exception):
+            planner.plan("song.mp3", {"add_noise": True}, duration=10)
+
+    def test_translates_option_names(self):
+        options = {"tempo_change": 110.0, "pitch_semitones": 3, "normalize": True}
+        self.assertEqual(translate_options("lightning", options)["tempo_change"], 110.0)
+        fast = translate_options("fast", options)
+        self.assertAlmostEqual(fast["tempo_stretch"], 1.1)
+        self.assertEqual(fast["pitch_shift"], 3)
+        self.assertNotIn("tempo_change", translate_options("standard", options))
+
+    def test_mp3_trim_only_uses_copy_stage(self):
+        features = requested_features({"trim_duration": 30, "tempo_change": 100.0})
+        self.assertEqual(backend_stages("lightning", features, ".mp3"), ["startup", "copy"])
+        self.assertEqual(backend_stages("lightning", features, ".wav"), ["startup", "encode"])
+
+    def test_fast_passes_end_with_encode(self):
+        # Fast's intermediates are VBR, so they are never published by copy
+        features = requested_features({"pitch_semitones": 2, "trim_duration": 30})
+        self.assertEqual(backend_stages("fast", features, ".mp3"), ["startup", "pitch", "encode"])
+
+    def test_fit_recovers_linear_costs_and_persists(self):
+        for duration in (10, 30, 60, 120, 240):
+            self.planner.record("fast", ["startup", "encode"], duration, 0.2 + 0.01 * duration)
+            self.planner.record("fast", ["startup", "copy"], duration, 0.1 + 0.001 * duration)
+        self.planner.fit(["fast"])
+
+        encode_only = self.planner.estimate("fast", ["startup", "encode"], 100)
+        self.assertAlmostEqual(encode_only, 1.2, places=2)
+
+        self.planner.save()
+        reloaded = ProcessorPlanner(backends=self.backends, cost_file=self.cost_file)
+        self.assertAlmostEqual(reloaded.estimate("fast", ["startup", "encode"], 100), encode_only)
+        with open(self.cost_file) as f:
+            self.assertEqual(len(json.load(f)["samples"]["fast"]), 10)
+
+    def test_execute_calls_backend_and_records_time(self):
+        plan = self.planner.plan("song.mp3", {"tempo_change": 120.0}, duration=5)
+        self.planner.execute(plan, "song.mp3", "out.mp3")
+        processor = self.backends[plan.backend]
+        self.assertEqual(len(processor.calls), 1)
+        self.assertEqual(len(self.planner.samples[plan.backend]), 1)
+
+
+@unittest.skipUnless(shutil.which("ffmpeg"), "FFmpeg not available")
+class TestFastPitchShift(unittest.TestCase):
+    """Test the fast backend's pitch shift on a non-44.1 kHz input"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_pitch_shift_at_48k(self):
+        import librosa
+        import numpy as np
+        import soundfile as sf
+        from fast_processor import FastAudioProcessor
+
+        sr = 48000
+        t = np.arange(5 * sr) / sr
+        input_path = os.path.join(self.temp_dir, "tone.wav")
+        sf.write(input_path, 0.3 * np.sin(2 * np.pi * 440 * t), sr)
+        processor = FastAudioProcessor({"processed_output_folder": self.temp_dir,
+                                        "scratch_dir": os.path.join(self.temp_dir, "scratch")})
+        output = processor.process_audio_fast(input_path, os.path.join(self.temp_dir, "out.mp3"),
+                                              pitch_shift=12)
+
+        y, out_sr = librosa.load(output, sr=None)
+        self.assertAlmostEqual(len(y) / out_sr, 5.0, delta=0.1)
+        peak = np.argmax(np.abs(np.fft.rfft(y))) * out_sr / len(y)
+        self.assertAlmostEqual(peak, 880.0, delta=5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
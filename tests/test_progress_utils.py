@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for rate-limited progress reporting
+"""
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from progress_utils import RateLimitedProgress, flush_progress, rate_limited
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimitedProgress(unittest.TestCase):
+    """Test coalescing, final updates and flushing"""
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.calls = []
+        self.progress = RateLimitedProgress(lambda *args: self.calls.append(args), max_rate=10,
+                                            clock=self.clock, timer=False)
+
+    def test_updates_are_limited_per_interval(self):
+        for i in range(1000):
+            self.clock.now = i * 0.001
+            self.progress(i / 1000, f"step {i}")
+        # One second of updates at 10 per second
+        self.assertEqual(len(self.calls), 10)
+        self.assertEqual(self.calls[0], (0.0, "step 0"))
+        self.assertEqual(self.calls[1], (0.1, "step 100"))
+
+    def test_final_update_is_always_delivered(self):
+        self.progress(0.5, "halfway")
+        self.progress(1.0, "done")
+        self.assertEqual(self.calls, [(0.5, "halfway"), (1.0, "done")])
+        self.progress("not a number", final=True)
+        self.assertEqual(self.calls[-1], ("not a number",))
+
+    def test_flush_delivers_only_the_newest_held_update(self):
+        self.progress(0.1, "decode")
+        self.progress(0.2, "effects")
+        self.progress(0.3, "encode")
+        self.assertTrue(self.progress.flush())
+        self.assertEqual(self.calls, [(0.1, "decode"), (0.3, "encode")])
+        self.assertEqual(self.progress.dropped, 1)
+        self.assertFalse(self.progress.flush())
+
+    def test_poll_delivers_held_update_once_interval_passed(self):
+        self.progress(0.1, "Initializing...")
+        self.clock.now = 0.01
+        self.progress(0.2, "Applying pitch shift...")
+        self.assertFalse(self.progress.poll())
+        self.clock.now = 0.1
+        self.assertTrue(self.progress.poll())
+        self.assertEqual(self.calls[-1], (0.2, "Applying pitch shift..."))
+        self.assertFalse(self.progress.poll())
+
+    def test_held_update_never_follows_final_update(self):
+        calls, release = [], threading.Event()
+
+        def callback(*args):
+            if args[1] == "Initializing...":
+                release.wait(5)  # keep the first delivery in progress
+            calls.append(args)
+
+        progress = RateLimitedProgress(callback, max_rate=10, clock=self.clock, timer=False)
+        first = threading.Thread(target=progress, args=(0.1, "Initializing..."))
+        first.start()
+        time.sleep(0.05)
+        self.clock.now = 0.01
+        progress(0.2, "Applying pitch shift...")
+        self.clock.now = 0.2
+        # poll() takes the held update, then waits for its turn to deliver
+        poller = threading.Thread(target=progress.poll)
+        poller.start()
+        time.sleep(0.05)
+        final = threading.Thread(target=progress, args=(1.0, "done"))
+        final.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in (first, poller, final):
+            thread.join(5)
+        self.assertEqual(calls[-1], (1.0, "done"))
+        self.assertEqual(len(calls) + progress.dropped, 3)
+
+    def test_timer_delivers_held_update_without_further_calls(self):
+        calls = []
+        progress = RateLimitedProgress(lambda *args: calls.append(args), max_rate=20)
+        progress(0.1, "Initializing...")
+        progress(0.2, "Applying pitch shift...")
+        deadline = time.monotonic() + 2.0
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(calls, [(0.1, "Initializing..."), (0.2, "Applying pitch shift...")])
+
+    def test_rate_limited_helper(self):
+        self.assertIsNone(rate_limited(None))
+        wrapped = rate_limited(print, config={'progress_rate': 4})
+        self.assertAlmostEqual(wrapped.interval, 0.25)
+        self.assertIs(rate_limited(wrapped), wrapped)
+        self.assertEqual(rate_limited(print, 0).interval, 0.0)
+        flush_progress(print)
+
+
+if __name__ == '__main__':
+    unittest.main()
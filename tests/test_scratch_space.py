@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the managed scratch space (job dirs, quota, orphans, commit)
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from scratch_space import ScratchSpace, ScratchQuotaError
+
+
+class TestScratchSpace(unittest.TestCase):
+    """Test the scratch space manager"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.temp_dir, "scratch")
+        self.space = ScratchSpace({"scratch_dir": self.root, "scratch_quota_mb": 1, "scratch_min_free_mb": 0})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_job_directory_is_removed_on_close(self):
+        with self.space.open_job("song") as job:
+            path = job.new_path(".wav")
+            with open(path, "wb") as f:
+                f.write(b"data")
+            self.assertTrue(path.startswith(job.path))
+            self.assertNotEqual(path, job.new_path(".wav"))
+        self.assertFalse(os.path.exists(job.path))
+
+    def test_commit_publishes_output(self):
+        output = os.path.join(self.temp_dir, "out", "song.mp3")
+        with self.space.open_job("song") as job:
+            path = job.new_path(".mp3")
+            with open(path, "wb") as f:
+                f.write(b"mp3")
+            job.commit(path, output)
+        with open(output, "rb") as f:
+            self.assertEqual(f.read(), b"mp3")
+
+    def test_quota_blocks_until_release(self):
+        quota = self.space.quota_bytes
+        first = self.space.open_job("a", reserve_bytes=quota)
+
+        with self.assertRaises(ScratchQuotaError):
+            self.space.open_job("b", reserve_bytes=quota // 2, timeout=0.05)
+
+        threading.Timer(0.1, first.close).start()
+        second = self.space.open_job("b", reserve_bytes=quota // 2, timeout=5)
+        second.close()
+
+    def test_oversized_job_admitted_when_idle(self):
+        job = self.space.open_job("big", reserve_bytes=self.space.quota_bytes * 10)
+        job.close()
+
+    def test_nested_job_inside_oversized_job(self):
+        # The parallel encoder opens a zero-reserve job inside an admitted one
+        with self.space.open_job("big", reserve_bytes=self.space.quota_bytes * 10):
+            nested = self.space.open_job("encode", timeout=1.0)
+            nested.close()
+
+    def test_quota_shared_between_processes(self):
+        # Another process (e.g. a batch worker) holds the whole quota
+        code = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "from scratch_space import ScratchSpace\n"
+            "space = ScratchSpace({'scratch_dir': %r, 'scratch_quota_mb': 1, 'scratch_min_free_mb': 0})\n"
+            "job = space.open_job('other', reserve_bytes=space.quota_bytes)\n"
+            "print('ready', flush=True)\n"
+            "sys.stdin.read()\n"
+            "job.close()\n"
+        ) % (str(src_path), self.root)
+        other = subprocess.Popen([sys.executable, "-c", code], stdin=subprocess.PIPE,
+                                 stdout=subprocess.PIPE, text=True)
+        try:
+            self.assertEqual(other.stdout.readline().strip(), "ready")
+            with self.assertRaises(ScratchQuotaError):
+                self.space.open_job("mine", reserve_bytes=self.space.quota_bytes // 2, timeout=0.3)
+
+            threading.Timer(0.2, other.stdin.close).start()
+            job = self.space.open_job("mine", reserve_bytes=self.space.quota_bytes // 2, timeout=5)
+            job.close()
+        finally:
+            other.wait(timeout=10)
+
+    def test_cleanup_removes_only_orphans(self):
+        live = self.space.open_job("live")
+
+        # A job directory whose owning process has exited
+        code = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "from scratch_space import ScratchSpace\n"
+            "job = ScratchSpace({'scratch_dir': %r}).open_job('dead')\n"
+            "print(job.path)\n"
+            "import os; os._exit(0)\n"
+        ) % (str(src_path), self.root)
+        dead_path = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                   check=True).stdout.strip()
+        self.assertTrue(os.path.isdir(dead_path))
+
+        self.assertEqual(self.space.cleanup_orphans(), 1)
+        self.assertFalse(os.path.exists(dead_path))
+        self.assertTrue(os.path.isdir(live.path))
+        live.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
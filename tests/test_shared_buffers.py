@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for shared-memory audio buffers
+"""
+
+import gc
+import multiprocessing
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from multiprocessing import shared_memory
+
+from shared_buffers import HEADER_BYTES, SharedBufferPool
+
+
+def _double_in_place(buffers, ref):
+    """Child process stage: modify the shared array and drop its reference"""
+    with buffers.view(ref) as samples:
+        samples *= 2.0
+    buffers.release(ref)
+
+
+class TestSharedBufferPool(unittest.TestCase):
+    """Test allocation, refcounting and cross-process hand-off"""
+
+    def setUp(self):
+        self.context = multiprocessing.get_context("spawn")
+        self.buffers = SharedBufferPool(self.context)
+
+    def test_put_and_take_round_trip(self):
+        audio = np.random.default_rng(0).standard_normal((2, 1000)).astype(np.float32)
+        ref = self.buffers.put(audio)
+
+        self.assertEqual(ref.shape, (2, 1000))
+        self.assertEqual(ref.nbytes, audio.nbytes)
+        with self.buffers.view(ref) as shared:
+            np.testing.assert_array_equal(shared, audio)
+
+        copy = self.buffers.take(ref)
+        np.testing.assert_array_equal(copy, audio)
+        self.assertEqual(self.buffers.refcount(ref), 0)
+
+    def test_block_freed_on_last_release(self):
+        ref = self.buffers.put(np.zeros(16))
+        self.buffers.retain(ref, 2)
+        self.assertEqual(self.buffers.refcount(ref), 3)
+
+        self.assertFalse(self.buffers.release(ref))
+        self.assertFalse(self.buffers.release(ref))
+        self.assertTrue(self.buffers.release(ref))
+        self.assertEqual(self.buffers.refcount(ref), 0)
+        self.assertFalse(self.buffers.release(ref))
+
+    def test_views_share_memory(self):
+        ref = self.buffers.allocate((4,), np.float64)
+        with self.buffers.view(ref) as first:
+            first[:] = [1, 2, 3, 4]
+        with self.buffers.view(ref) as second:
+            self.assertEqual(second.tolist(), [1, 2, 3, 4])
+        self.buffers.release(ref)
+
+    def test_block_survives_dropping_local_handles(self):
+        ref = self.buffers.put(np.arange(4, dtype=np.float64))
+        gc.collect()
+
+        # Reopen by name the way a consumer in another process would
+        shm = shared_memory.SharedMemory(name=ref.name)
+        try:
+            samples = np.ndarray(ref.shape, dtype=ref.dtype, buffer=shm.buf, offset=HEADER_BYTES)
+            self.assertEqual(samples.tolist(), [0, 1, 2, 3])
+            del samples
+        finally:
+            shm.close()
+        self.assertEqual(self.buffers.refcount(ref), 1)
+
+        self.assertTrue(self.buffers.release(ref))
+        self.assertNotIn(ref.name, self.buffers._owned)
+
+    def test_hand_off_to_another_process(self):
+        ref = self.buffers.put(np.arange(8, dtype=np.float32))
+        self.buffers.retain(ref)  # keep one reference to read the result
+
+        worker = self.context.Process(target=_double_in_place, args=(self.buffers, ref))
+        worker.start()
+        worker.join(timeout=60)
+        self.assertEqual(worker.exitcode, 0)
+
+        self.assertEqual(self.buffers.refcount(ref), 1)
+        np.testing.assert_array_equal(self.buffers.take(ref), np.arange(8) * 2.0)
+        self.assertEqual(self.buffers.refcount(ref), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
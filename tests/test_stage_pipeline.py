@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the staged decode / DSP / encode pipeline
+"""
+
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import CancelledError
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from stage_pipeline import StagePipeline
+
+
+class TestStagePipeline(unittest.TestCase):
+    """Test overlap, ordering, backpressure and error handling"""
+
+    def test_stages_overlap(self):
+        def slow(tag):
+            def stage(value):
+                time.sleep(0.1)
+                return value + [tag]
+            return stage
+
+        pipeline = StagePipeline([("decode", slow("d")), ("dsp", slow("p")), ("encode", slow("e"))])
+        start = time.monotonic()
+        results = pipeline.run([[i] for i in range(4)])
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(results, [[i, "d", "p", "e"] for i in range(4)])
+        # Sequential would take 1.2 s; pipelined needs about (4 + 2) * 0.1 s
+        self.assertLess(elapsed, 0.95)
+
+    def test_bounded_queues_limit_items_in_flight(self):
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0}
+
+        def decode(value):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            return value
+
+        def encode(value):
+            time.sleep(0.02)
+            with lock:
+                state["in_flight"] -= 1
+            return value
+
+        pipeline = StagePipeline([("decode", decode), ("encode", encode)], queue_size=1)
+        self.assertEqual(pipeline.run(range(20)), list(range(20)))
+        # One in each stage, one in the queue between them, one waiting to be put
+        self.assertLessEqual(state["peak"], 4)
+
+    def test_failure_stops_feeding(self):
+        def decode(value):
+            if value == 1:
+                raise ValueError("corrupt file")
+            time.sleep(0.05)
+            return value
+
+        pipeline = StagePipeline([("decode", decode), ("encode", lambda v: v)], queue_size=1)
+        results = pipeline.run(range(10))
+
+        self.assertEqual(results[0], 0)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertIsInstance(results[-1], CancelledError)
+
+    def test_continue_after_failure(self):
+        def decode(value):
+            if value == 1:
+                raise ValueError("corrupt file")
+            return value * 2
+
+        seen = []
+        pipeline = StagePipeline([("decode", decode)], stop_on_error=False)
+        results = pipeline.run(range(3), on_result=lambda i, v: seen.append(i))
+
+        self.assertEqual(results[0], 0)
+        self.assertEqual(results[2], 4)
+        self.assertEqual(sorted(seen), [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Tests that the GUI module starts without loading the audio stack
+"""
+
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+src_path = Path(__file__).parent.parent / "src"
+
+HEAVY_MODULES = ("librosa", "scipy", "yt_dlp", "mutagen", "audio_utils",
+                 "lightning_processor", "processor_planner", "batch_executor")
+
+
+class TestStartupImports(unittest.TestCase):
+    """Heavy modules are left to the background loader"""
+
+    def test_app_import_is_light(self):
+        code = (
+            "import json, sys; sys.path.insert(0, %r); import app; "
+            "print(json.dumps([m for m in %r if m in sys.modules]))" % (str(src_path), HEAVY_MODULES)
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=str(src_path.parent), timeout=60)
+        if result.returncode != 0:
+            self.skipTest(f"GUI toolkit not importable here: {result.stderr.strip()[-200:]}")
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(loaded, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
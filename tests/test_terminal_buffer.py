@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded terminal buffer and its windowed view
+"""
+
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from terminal_buffer import TerminalBuffer, TerminalView
+
+
+class _FakeTextbox:
+    """Line-based stand-in for a Tk textbox"""
+
+    def __init__(self):
+        self.text = ""
+        self.bottom = 1.0
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def insert(self, index, text):
+        self.text = self.text + text if index == "end" else text + self.text
+
+    def delete(self, first, last):
+        if last == "end":
+            self.text = ""
+            return
+        line = int(last.split(".")[0])
+        self.text = "".join(self.text.splitlines(keepends=True)[line - 1:])
+
+    def see(self, index):
+        pass
+
+    def yview(self):
+        return (0.0, self.bottom)
+
+    @property
+    def lines(self):
+        return self.text.splitlines()
+
+
+class TestTerminalBuffer(unittest.TestCase):
+    """Test capacity, windows and spilling"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_capacity_is_fixed(self):
+        buffer = TerminalBuffer(capacity=100)
+        for i in range(10):
+            buffer.append([f"line {i * 50 + j}" for j in range(50)])
+        self.assertEqual(len(buffer), 100)
+        self.assertEqual(buffer.total, 500)
+        self.assertEqual(buffer.first, 400)
+        self.assertEqual(buffer.spilled, 400)
+        self.assertEqual(buffer.tail(2), (498, ["line 498", "line 499"]))
+
+    def test_window_is_clipped_to_memory(self):
+        buffer = TerminalBuffer(capacity=10)
+        buffer.append([str(i) for i in range(30)])
+        start, lines = buffer.window(5, 10)
+        self.assertEqual(start, 20)
+        self.assertEqual(lines, [str(i) for i in range(20, 30)])
+        self.assertEqual(buffer.window(25, 100), (25, ["25", "26", "27", "28", "29"]))
+
+    def test_evicted_lines_spill_to_rotating_log(self):
+        log_path = os.path.join(self.temp_dir, "logs", "terminal.log")
+        buffer = TerminalBuffer(capacity=5, spill_path=log_path, max_bytes=200, backup_count=2)
+        buffer.append([f"line {i:03d}" for i in range(3)])
+        self.assertFalse(os.path.exists(log_path))
+        buffer.append([f"line {i:03d}" for i in range(3, 12)])
+        buffer.close()
+        with open(log_path, encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines(), [f"line {i:03d}" for i in range(7)])
+
+        buffer = TerminalBuffer(capacity=1, spill_path=log_path, max_bytes=200, backup_count=2)
+        for i in range(200):
+            buffer.append([f"spilled line {i:03d}"])
+        buffer.close()
+        # The log rotates instead of growing
+        files = glob.glob(log_path + "*")
+        self.assertLessEqual(len(files), 3)
+        self.assertTrue(all(os.path.getsize(path) <= 220 for path in files))
+
+
+class TestTerminalView(unittest.TestCase):
+    """Test the rendered window"""
+
+    def setUp(self):
+        self.textbox = _FakeTextbox()
+        self.buffer = TerminalBuffer(capacity=1000)
+        self.view = TerminalView(self.textbox, self.buffer, view_lines=50)
+
+    def test_following_view_keeps_a_bounded_window(self):
+        for i in range(40):
+            self.view.append([f"line {i * 5 + j}" for j in range(5)])
+        self.assertEqual(len(self.textbox.lines), 50)
+        self.assertEqual(self.textbox.lines[0], "line 150")
+        self.assertEqual(self.textbox.lines[-1], "line 199")
+        self.assertEqual((self.view.start, self.view.end), (150, 200))
+
+    def test_scrolled_view_is_left_alone(self):
+        self.view.append([f"line {i}" for i in range(60)])
+        self.textbox.bottom = 0.5
+        before = self.textbox.text
+        self.view.append(["new line"])
+        self.assertEqual(self.textbox.text, before)
+        self.assertFalse(self.view.following)
+
+    def test_render_pages_older_lines_in(self):
+        self.view.append([f"line {i}" for i in range(200)])
+        self.view.render(100)
+        self.assertEqual(self.textbox.lines[0], "line 50")
+        self.assertEqual(self.textbox.lines[-1], "line 99")
+        self.assertFalse(self.view.following)
+
+    def test_clear(self):
+        self.view.append(["a", "b"])
+        self.view.clear()
+        self.assertEqual(self.textbox.text, "")
+        self.view.append(["c"])
+        self.assertEqual(self.textbox.lines, ["c"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the UI event bus
+"""
+
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from ui_event_bus import UIEventBus
+
+
+class _FakeRoot:
+    """Records after() calls instead of running a Tk loop"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func):
+        self.scheduled.append((ms, func))
+        return len(self.scheduled)
+
+    def after_cancel(self, after_id):
+        self.scheduled[after_id - 1] = None
+
+
+class TestUIEventBus(unittest.TestCase):
+    """Test coalescing and delivery on pump"""
+
+    def setUp(self):
+        self.root = _FakeRoot()
+        self.bus = UIEventBus(self.root, interval_ms=20)
+        self.logged = []
+        self.progress = []
+        self.bus.on('log', self.logged.append)
+        self.bus.on('progress', self.progress.append)
+
+    def test_logs_are_batched_and_progress_coalesced(self):
+        for i in range(100):
+            self.bus.log(f"line {i}", "info")
+            self.bus.progress(i / 100)
+        self.bus.status("ignored without a handler")
+
+        self.assertEqual(self.bus.pump(), 201)
+        # One handler call per frame for all lines, in order
+        self.assertEqual(len(self.logged), 1)
+        self.assertEqual(self.logged[0][0], ("line 0", "info"))
+        self.assertEqual(self.logged[0][-1], ("line 99", "info"))
+        # Only the newest progress value reaches the widget
+        self.assertEqual(self.progress, [0.99])
+        self.assertEqual(self.bus.pump(), 0)
+
+    def test_frame_budget_leaves_the_rest_for_later(self):
+        bus = UIEventBus(self.root, max_events_per_frame=10)
+        lines = []
+        bus.on('log', lines.append)
+        for i in range(25):
+            bus.log(str(i))
+        self.assertEqual(bus.pump(), 10)
+        self.assertEqual(bus.pending, 15)
+        bus.pump()
+        bus.pump()
+        self.assertEqual([len(batch) for batch in lines], [10, 10, 5])
+
+    def test_calls_run_after_logs(self):
+        order = []
+        self.bus.on('log', lambda entries: order.append('log'))
+        self.bus.call(order.append, 'call')
+        self.bus.log("before the dialog")
+        self.bus.pump()
+        self.assertEqual(order, ['log', 'call'])
+
+    def test_posting_from_threads(self):
+        def produce():
+            for i in range(500):
+                self.bus.log(str(i))
+
+        threads = [threading.Thread(target=produce) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        while self.bus.pump():
+            pass
+        self.assertEqual(sum(len(batch) for batch in self.logged), 2000)
+
+    def test_pump_reschedules_itself(self):
+        self.bus.start()
+        self.assertEqual(self.root.scheduled[0][0], 20)
+        self.root.scheduled[0][1]()
+        self.assertEqual(len(self.root.scheduled), 2)
+        self.bus.stop()
+        self.assertIsNone(self.root.scheduled[1])
+
+    def test_handler_errors_do_not_stop_the_pump(self):
+        self.bus.on('log', lambda entries: 1 / 0)
+        self.bus.log("boom")
+        self.bus.progress(0.5)
+        self.bus.pump()
+        self.assertEqual(self.progress, [0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the JIT cache setup and background warm-up
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import warmup
+from warmup import WarmupService, configure_jit_cache
+
+
+class TestJitCache(unittest.TestCase):
+    """Test where numba's cache is pointed"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.saved = os.environ.pop('NUMBA_CACHE_DIR', None)
+
+    def tearDown(self):
+        os.environ.pop('NUMBA_CACHE_DIR', None)
+        if self.saved is not None:
+            os.environ['NUMBA_CACHE_DIR'] = self.saved
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_cache_dir_is_created_and_exported(self):
+        path = os.path.join(self.temp_dir, "cache", "numba")
+        self.assertEqual(configure_jit_cache({'numba_cache_dir': path}), path)
+        self.assertTrue(os.path.isdir(path))
+        self.assertEqual(os.environ['NUMBA_CACHE_DIR'], path)
+
+    def test_existing_environment_wins(self):
+        os.environ['NUMBA_CACHE_DIR'] = self.temp_dir
+        self.assertEqual(configure_jit_cache({'numba_cache_dir': '/elsewhere'}), self.temp_dir)
+
+    def test_empty_setting_disables_cache(self):
+        self.assertIsNone(configure_jit_cache({'numba_cache_dir': ''}))
+        self.assertNotIn('NUMBA_CACHE_DIR', os.environ)
+
+
+class TestWarmupService(unittest.TestCase):
+    """Test the background warm-up"""
+
+    def test_runs_once_in_background(self):
+        seconds = []
+        with mock.patch.object(warmup, 'warm_up_audio_stack', return_value=0.25) as warm:
+            service = WarmupService({'warmup_delay': 0})
+            service.start("processor", callback=seconds.append)
+            service.start("processor")
+            self.assertTrue(service.wait(5))
+        warm.assert_called_once_with("processor")
+        self.assertEqual(service.seconds, 0.25)
+        self.assertEqual(seconds, [0.25])
+
+    def test_disabled(self):
+        with mock.patch.object(warmup, 'warm_up_audio_stack') as warm:
+            service = WarmupService({'jit_warmup': False}).start()
+            self.assertTrue(service.wait(0))
+        warm.assert_not_called()
+
+    def test_warm_up_exercises_processor_paths(self):
+        processor = mock.Mock(sample_rate=44100)
+        processor.change_pitch.side_effect = lambda y, n: y
+        processor.change_tempo.side_effect = lambda y, rate: y
+        self.assertGreaterEqual(warmup.warm_up_audio_stack(processor), 0.0)
+        processor.change_pitch.assert_called_once()
+        processor.change_tempo.assert_called_once()
+        self.assertAlmostEqual(len(processor.change_pitch.call_args[0][0]), 44100 * 0.25, delta=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the waveform overview pyramid and its cache
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from waveform_cache import ThumbnailLoader, WaveformBuilder, WaveformCache, WaveformPyramid
+
+
+class TestWaveformPyramid(unittest.TestCase):
+    """Test building and querying the pyramid"""
+
+    def setUp(self):
+        # Silence, then a 0.5 amplitude square wave, each a whole number of coarse bins
+        self.sr = 8000
+        square = np.where(np.arange(8192) % 40 < 20, 0.5, -0.5)
+        self.y = np.concatenate([np.zeros(8192), square]).astype(np.float32)
+
+    def build(self, chunk=1000):
+        # Chunks don't line up with bins, as with a real decoder
+        builder = WaveformBuilder(base_bin=64, factor=4, min_bins=4)
+        for start in range(0, len(self.y), chunk):
+            builder.feed(self.y[start:start + chunk], self.sr)
+        return builder.finish()
+
+    def test_levels_shrink_by_factor(self):
+        pyramid = self.build()
+        self.assertEqual([len(level) for level in pyramid.levels], [256, 64, 16, 4])
+        self.assertAlmostEqual(pyramid.duration, 2.048)
+
+    def test_chunking_does_not_change_result(self):
+        a, b = self.build(chunk=1000), self.build(chunk=333)
+        np.testing.assert_allclose(a.levels[0], b.levels[0], atol=1e-6)
+
+    def test_overview_values(self):
+        mins, maxs, rms = self.build().overview(2)
+        np.testing.assert_allclose(maxs, [0.0, 0.5], atol=1e-6)
+        np.testing.assert_allclose(mins, [0.0, -0.5], atol=1e-6)
+        np.testing.assert_allclose(rms, [0.0, 0.5], atol=1e-3)
+
+    def test_overview_picks_coarse_level_and_zooms(self):
+        pyramid = self.build()
+        for pixels in (3, 40, 100, 600):
+            mins, maxs, rms = pyramid.overview(pixels)
+            self.assertEqual(len(maxs), pixels)
+        # Zoomed into the silent first second
+        mins, maxs, rms = pyramid.overview(50, start=0.0, end=1.0)
+        self.assertEqual(float(maxs.max()), 0.0)
+
+    def test_round_trip_quantised(self):
+        pyramid = self.build()
+        restored = WaveformPyramid.from_arrays(pyramid.to_arrays())
+        self.assertEqual(restored.n_samples, pyramid.n_samples)
+        np.testing.assert_allclose(restored.levels[1], pyramid.levels[1], atol=1.0 / 127)
+
+
+class TestWaveformCache(unittest.TestCase):
+    """Test storage by content hash"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = {'waveform_cache_dir': os.path.join(self.temp_dir, 'cache')}
+        self.path = os.path.join(self.temp_dir, 'tone.wav')
+        t = np.arange(22050) / 22050.0
+        sf.write(self.path, 0.25 * np.sin(2 * np.pi * 220 * t), 22050)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_built_once_and_shared_by_content(self):
+        cache = WaveformCache(self.config)
+        self.assertIsNone(cache.get(self.path, build=False))
+        pyramid = cache.get(self.path)
+        self.assertAlmostEqual(pyramid.duration, 1.0, places=2)
+        self.assertAlmostEqual(float(pyramid.overview(1)[1][0]), 0.25, places=2)
+
+        # A copy has the same content, so a new cache finds it on disk
+        copy = os.path.join(self.temp_dir, 'copy.wav')
+        shutil.copy(self.path, copy)
+        fresh = WaveformCache(self.config)
+        self.assertIsNotNone(fresh.get(copy, build=False))
+        self.assertIsNotNone(fresh.cached(copy))
+
+    def test_loader_builds_in_background(self):
+        ready = threading.Event()
+        loader = ThumbnailLoader(WaveformCache(self.config), on_ready=lambda path: ready.set())
+        self.assertIsNone(loader.thumbnail(self.path, 30))
+        self.assertTrue(ready.wait(30))
+        mins, maxs = loader.thumbnail(self.path, 30)
+        self.assertEqual(len(maxs), 30)
+        self.assertGreater(float(maxs.max()), 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent warm worker pool
+"""
+
+import os
+import queue
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from worker_pool import WarmWorkerPool, warm_up_audio_stack
+
+
+class TestWarmWorkerPool(unittest.TestCase):
+    """Test worker reuse, warm-up and progress routing"""
+
+    def test_workers_are_reused_across_batches(self):
+        pool = WarmWorkerPool({'pool_warm_backends': []}, max_workers=2, warm=False)
+        try:
+            pool.start(wait_ready=True, timeout=60)
+            self.assertEqual(len(pool.worker_info), 2)
+            first = {pool.submit(os.getpid).result(timeout=30) for _ in range(6)}
+            second = {pool.submit(os.getpid).result(timeout=30) for _ in range(6)}
+            self.assertTrue(first | second <= set(pool.worker_info))
+        finally:
+            pool.shutdown()
+        self.assertFalse(pool.running)
+
+    def test_warm_up_records_time(self):
+        pool = WarmWorkerPool({'pool_warm_backends': []}, max_workers=1, warm=True)
+        try:
+            pool.start(wait_ready=True, timeout=120)
+            self.assertEqual(len(pool.worker_info), 1)
+            self.assertGreater(list(pool.worker_info.values())[0], 0.0)
+        finally:
+            pool.shutdown()
+
+    def test_warm_up_in_process(self):
+        self.assertGreaterEqual(warm_up_audio_stack(), 0.0)
+
+    def test_progress_routed_by_token(self):
+        pool = WarmWorkerPool(max_workers=1)
+        pool.progress_queue = queue.Queue()
+        received = []
+        token = pool.register(lambda *args: received.append(args))
+        stale = pool.register(lambda *args: received.append(("stale",) + args))
+        pool.unregister(stale)
+
+        listener = threading.Thread(target=pool._dispatch)
+        listener.start()
+        pool.progress_queue.put((stale, 0, 0.5, "old batch"))
+        pool.progress_queue.put((token, 1, 0.25, "decoding"))
+        pool.progress_queue.put(None)
+        listener.join(timeout=5)
+
+        self.assertEqual(received, [(1, 0.25, "decoding")])
+
+
+if __name__ == "__main__":
+    unittest.main()